@@ -5,264 +5,517 @@ Provides admin dashboard data including costs, system health, and alerts
 """
 
 import json
-import boto3
 import logging
 import os
-import requests
+import random
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime, timezone, timedelta
-from botocore.exceptions import ClientError
+from mission_mischief.aggregates import AGGREGATES_TABLE, read_bounty_data, read_version
+from mission_mischief.aggregation import SUBMISSION_ATTRIBUTES, SubmissionRollup
+from mission_mischief.history import DAY, MetricHistory, month_key, trend
+from mission_mischief import clients
+from mission_mischief.posts import POSTS_TABLE, iter_day_bucket, time_keys
+from mission_mischief.projection import projection
+from mission_mischief.responses import compress_response, etag_matches, make_etag, not_modified, with_etag
+from mission_mischief.scanner import ParallelScan
+from mission_mischief import secrets as secrets_cache
+from mission_mischief.timekeys import day_bucket, epoch_millis, parse_timestamp
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# AWS clients
-secrets_manager = boto3.client('secretsmanager')
-cloudwatch = boto3.client('cloudwatch')
-ce = boto3.client('ce')  # Cost Explorer
-sns = boto3.client('sns')
-dynamodb = boto3.resource('dynamodb')
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+    'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
+}
+
+# Dashboard snapshot: rebuilt by a scheduled job, served as-is by GET
+DASHBOARD_SNAPSHOT_BUCKET = os.environ.get('DASHBOARD_SNAPSHOT_BUCKET')
+DASHBOARD_SNAPSHOT_KEY = os.environ.get('DASHBOARD_SNAPSHOT_KEY', 'admin-dashboard.json')
+
+# Metric history for trend charts: one binary object per month next to the snapshot
+HISTORY_KEY_PREFIX = os.environ.get('HISTORY_KEY_PREFIX', 'history/admin-metrics-')
+TREND_DAYS = (30, 90)
+
+_history_cache = {}  # month -> MetricHistory, only for months that are over
+
+# Batched direct submissions (offline sync)
+DIRECT_SUBMIT_BATCH_MAX = int(os.environ.get('DIRECT_SUBMIT_BATCH_MAX', '50'))
+BATCH_WRITE_CHUNK = 25  # BatchWriteItem limit per request
+BATCH_GET_CHUNK = 100  # BatchGetItem limit per request
+BATCH_WRITE_MAX_ATTEMPTS = int(os.environ.get('BATCH_WRITE_MAX_ATTEMPTS', '5'))
+BATCH_WRITE_BASE_DELAY_SECONDS = 0.05
+RETRYABLE_ERROR_CODES = (
+    'ProvisionedThroughputExceededException', 'ThrottlingException',
+    'RequestLimitExceeded', 'InternalServerError', 'ServiceUnavailable'
+)
+# Client-generated submissionId (a UUID from aws-submission-sync.js)
+SUBMISSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Dashboard collector scheduling
+COLLECTOR_MAX_WORKERS = int(os.environ.get('COLLECTOR_MAX_WORKERS', '5'))
+COLLECTOR_SAFETY_MARGIN_MS = int(os.environ.get('COLLECTOR_SAFETY_MARGIN_MS', '1500'))
+COLLECTOR_DEFAULT_BUDGET_MS = 25000  # Used when no Lambda context is available
+
+# Cost Explorer cache: in-container TTL in front of a persisted DynamoDB snapshot
+ADMIN_CACHE_TABLE = os.environ.get('ADMIN_CACHE_TABLE', 'mission-mischief-admin-cache')
+COST_CACHE_TTL_SECONDS = int(os.environ.get('COST_CACHE_TTL_SECONDS', '300'))
+COST_SNAPSHOT_MAX_AGE_SECONDS = int(os.environ.get('COST_SNAPSHOT_MAX_AGE_SECONDS', str(6 * 3600)))
+COST_GRANULARITY = 'MONTHLY'
+
+_cost_cache = {'key': None, 'costs': None, 'generated_at': None, 'cached_at': 0, 'hits': 0, 'misses': 0}
+_cost_cache_lock = threading.Lock()
+_cost_refresh_lock = threading.Lock()
+
+# Fleet health metrics (one batched GetMetricData per 5-minute period)
+MONITORED_FUNCTIONS = os.environ.get(
+    'MONITORED_FUNCTIONS',
+    'mission-mischief-premium-scraper,mission-mischief-admin,mission-mischief-research-data,'
+    'mission-mischief-license-validation,mission-mischief-cloud-save,mission-mischief-aggregates-stream'
+).split(',')
+MONITORED_TABLES = os.environ.get(
+    'MONITORED_TABLES',
+    'mission-mischief-posts,mission-mischief-users,mission-mischief-saves,mission-mischief-aggregates'
+).split(',')
+MONITORED_API_NAME = os.environ.get('MONITORED_API_NAME', 'mission-mischief-admin-api')
+MONITORED_API_STAGE = os.environ.get('MONITORED_API_STAGE', 'prod')
+LATENCY_PERCENTILES = ('p50', 'p90', 'p99')
+METRICS_CACHE_PERIOD_SECONDS = 300
+
+_metrics_cache = {}
+
+# Cost alerts: evaluated on a schedule, state kept in the admin cache table
+COST_ALERT_STATE_KEY = 'alerts#cost'
+ALERT_TOPIC_ARN = os.environ.get('ALERT_TOPIC_ARN')
 
 def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager"""
+    """Get secret from the container's Secrets Manager cache"""
     try:
-        response = secrets_manager.get_secret_value(SecretId=secret_name)
-        return json.loads(response['SecretString'])
+        return secrets_cache.get_secret(secret_name)
     except Exception as e:
         logger.error(f"Failed to get secret {secret_name}: {e}")
         return None
 
-def get_aws_costs():
-    """Get current AWS costs using Cost Explorer"""
+def get_billing_period(now):
+    """Current billing period start/end for Cost Explorer"""
+    start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return start_of_month, now
+
+def get_cost_cache_key(now):
+    """Snapshot key: one snapshot per billing period and granularity"""
+    start_of_month, _ = get_billing_period(now)
+    return f"costs#{COST_GRANULARITY}#{start_of_month.strftime('%Y-%m')}"
+
+def fetch_aws_costs():
+    """Get current AWS costs straight from Cost Explorer (billed per call)"""
+    # Get costs for current month
+    now = datetime.now(timezone.utc)
+    start_of_month, end = get_billing_period(now)
+    
+    response = clients.client('ce').get_cost_and_usage(
+        TimePeriod={
+            'Start': start_of_month.strftime('%Y-%m-%d'),
+            'End': end.strftime('%Y-%m-%d')
+        },
+        Granularity=COST_GRANULARITY,
+        Metrics=['BlendedCost'],
+        GroupBy=[
+            {
+                'Type': 'DIMENSION',
+                'Key': 'SERVICE'
+            }
+        ]
+    )
+    
+    total_cost = 0
+    service_costs = {}
+    
+    for result in response['ResultsByTime']:
+        for group in result['Groups']:
+            service = group['Keys'][0]
+            cost = float(group['Metrics']['BlendedCost']['Amount'])
+            service_costs[service] = cost
+            total_cost += cost
+    
+    return {
+        'total': total_cost,
+        'services': service_costs,
+        'period': f"{start_of_month.strftime('%Y-%m-%d')} to {end.strftime('%Y-%m-%d')}"
+    }
+
+def load_cost_snapshot(cache_key):
+    """Read the persisted cost snapshot for a billing period, or None"""
     try:
-        # Get costs for current month
-        now = datetime.now(timezone.utc)
-        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        response = ce.get_cost_and_usage(
-            TimePeriod={
-                'Start': start_of_month.strftime('%Y-%m-%d'),
-                'End': now.strftime('%Y-%m-%d')
-            },
-            Granularity='MONTHLY',
-            Metrics=['BlendedCost'],
-            GroupBy=[
-                {
-                    'Type': 'DIMENSION',
-                    'Key': 'SERVICE'
-                }
-            ]
-        )
-        
-        total_cost = 0
-        service_costs = {}
-        
-        for result in response['ResultsByTime']:
-            for group in result['Groups']:
-                service = group['Keys'][0]
-                cost = float(group['Metrics']['BlendedCost']['Amount'])
-                service_costs[service] = cost
-                total_cost += cost
-        
+        table = clients.table(ADMIN_CACHE_TABLE)
+        item = table.get_item(Key={'cache_key': cache_key}).get('Item')
+        if not item:
+            return None
         return {
-            'total': total_cost,
-            'services': service_costs,
-            'period': f"{start_of_month.strftime('%Y-%m-%d')} to {now.strftime('%Y-%m-%d')}"
+            'costs': json.loads(item['data']),
+            'generated_at': datetime.fromisoformat(item['generated_at'])
         }
+    except Exception as e:
+        logger.error(f"Failed to load cost snapshot {cache_key}: {e}")
+        return None
+
+def save_cost_snapshot(cache_key, costs, generated_at):
+    """Persist a cost snapshot so other containers skip Cost Explorer"""
+    try:
+        table = clients.table(ADMIN_CACHE_TABLE)
+        table.put_item(Item={
+            'cache_key': cache_key,
+            # Stored as a JSON string so floats don't need a Decimal round trip
+            'data': json.dumps(costs),
+            'generated_at': generated_at.isoformat(),
+            'ttl': int((generated_at + timedelta(days=45)).timestamp())
+        })
+    except Exception as e:
+        logger.error(f"Failed to save cost snapshot {cache_key}: {e}")
+
+def is_cost_snapshot_stale(generated_at, now):
+    """CE data refreshes a few times a day; also roll over at the UTC day boundary"""
+    age = (now - generated_at).total_seconds()
+    return age > COST_SNAPSHOT_MAX_AGE_SECONDS or generated_at.date() != now.date()
+
+def remember_costs(cache_key, costs, generated_at):
+    """Store costs in the in-container cache"""
+    with _cost_cache_lock:
+        _cost_cache['key'] = cache_key
+        _cost_cache['costs'] = costs
+        _cost_cache['generated_at'] = generated_at
+        _cost_cache['cached_at'] = time.monotonic()
+
+def refresh_cost_snapshot(cache_key):
+    """Fetch fresh costs from Cost Explorer and update both cache tiers"""
+    costs = fetch_aws_costs()
+    generated_at = datetime.now(timezone.utc)
+    save_cost_snapshot(cache_key, costs, generated_at)
+    remember_costs(cache_key, costs, generated_at)
+    return costs, generated_at
+
+def refresh_cost_snapshot_in_background(cache_key):
+    """Refresh a stale snapshot without blocking the dashboard; one refresh at a time"""
+    if not _cost_refresh_lock.acquire(blocking=False):
+        return False
+
+    def refresh():
+        try:
+            refresh_cost_snapshot(cache_key)
+            logger.info(f"Cost snapshot refreshed: {cache_key}")
+        except Exception as e:
+            logger.error(f"Background cost refresh failed: {e}")
+        finally:
+            _cost_refresh_lock.release()
+
+    threading.Thread(target=refresh, daemon=True).start()
+    return True
+
+def with_cache_info(costs, source, generated_at, now, refreshing=False):
+    """Attach cache age and hit/miss counters to a costs section"""
+    result = dict(costs)
+    result['cache'] = {
+        'source': source,
+        'age_seconds': int((now - generated_at).total_seconds()),
+        'generated_at': generated_at.isoformat(),
+        'refreshing': refreshing,
+        'hits': _cost_cache['hits'],
+        'misses': _cost_cache['misses']
+    }
+    return result
+
+def get_aws_costs():
+    """
+    Get current AWS costs, served from cache whenever possible.
+    Order: in-container cache (TTL), persisted snapshot (stale snapshots are
+    served while a background refresh runs), then Cost Explorer on a miss.
+    """
+    now = datetime.now(timezone.utc)
+    cache_key = get_cost_cache_key(now)
+
+    with _cost_cache_lock:
+        cached = _cost_cache['key'] == cache_key and _cost_cache['costs'] is not None
+        fresh = cached and time.monotonic() - _cost_cache['cached_at'] < COST_CACHE_TTL_SECONDS
+        if fresh:
+            _cost_cache['hits'] += 1
+            costs, generated_at = _cost_cache['costs'], _cost_cache['generated_at']
+
+    if fresh:
+        return with_cache_info(costs, 'memory', generated_at, now)
+
+    snapshot = load_cost_snapshot(cache_key)
+    if snapshot:
+        with _cost_cache_lock:
+            _cost_cache['hits'] += 1
+        remember_costs(cache_key, snapshot['costs'], snapshot['generated_at'])
+        refreshing = False
+        if is_cost_snapshot_stale(snapshot['generated_at'], now):
+            refreshing = refresh_cost_snapshot_in_background(cache_key)
+        return with_cache_info(snapshot['costs'], 'snapshot', snapshot['generated_at'], now, refreshing)
+
+    try:
+        with _cost_cache_lock:
+            _cost_cache['misses'] += 1
+        costs, generated_at = refresh_cost_snapshot(cache_key)
+        return with_cache_info(costs, 'cost_explorer', generated_at, now)
         
     except Exception as e:
         logger.error(f"Failed to get AWS costs: {e}")
-        return {'total': 0, 'services': {}, 'period': 'unknown'}
+        return get_fallback_costs()
+
+def get_fallback_costs():
+    """Fallback costs when Cost Explorer fails or times out"""
+    return {'total': 0, 'services': {}, 'period': 'unknown'}
+
+def metric_query(query_id, namespace, metric_name, dimensions, stat, period):
+    """One MetricDataQueries entry"""
+    return {
+        'Id': query_id,
+        'MetricStat': {
+            'Metric': {
+                'Namespace': namespace,
+                'MetricName': metric_name,
+                'Dimensions': [{'Name': name, 'Value': value} for name, value in dimensions]
+            },
+            'Period': period,
+            'Stat': stat
+        },
+        'ReturnData': True
+    }
+
+def build_fleet_metric_queries(period):
+    """
+    Every dashboard metric as one GetMetricData batch. Returns (queries, layout)
+    where layout maps query id -> (section, name, field).
+    """
+    queries = []
+    layout = {}
+
+    def add(query_id, section, name, field, namespace, metric_name, dimensions, stat):
+        queries.append(metric_query(query_id, namespace, metric_name, dimensions, stat, period))
+        layout[query_id] = (section, name, field)
+
+    for i, function_name in enumerate(MONITORED_FUNCTIONS):
+        dims = [('FunctionName', function_name)]
+        add(f"fn{i}_inv", 'functions', function_name, 'invocations', 'AWS/Lambda', 'Invocations', dims, 'Sum')
+        add(f"fn{i}_err", 'functions', function_name, 'errors', 'AWS/Lambda', 'Errors', dims, 'Sum')
+        add(f"fn{i}_thr", 'functions', function_name, 'throttles', 'AWS/Lambda', 'Throttles', dims, 'Sum')
+        for pct in LATENCY_PERCENTILES:
+            add(f"fn{i}_{pct}", 'functions', function_name, pct, 'AWS/Lambda', 'Duration', dims, pct)
+
+    for i, table_name in enumerate(MONITORED_TABLES):
+        dims = [('TableName', table_name)]
+        add(f"tb{i}_rthr", 'tables', table_name, 'read_throttles', 'AWS/DynamoDB', 'ReadThrottleEvents', dims, 'Sum')
+        add(f"tb{i}_wthr", 'tables', table_name, 'write_throttles', 'AWS/DynamoDB', 'WriteThrottleEvents', dims, 'Sum')
+        add(f"tb{i}_rcu", 'tables', table_name, 'consumed_rcu', 'AWS/DynamoDB', 'ConsumedReadCapacityUnits', dims, 'Sum')
+        add(f"tb{i}_wcu", 'tables', table_name, 'consumed_wcu', 'AWS/DynamoDB', 'ConsumedWriteCapacityUnits', dims, 'Sum')
+
+    dims = [('ApiName', MONITORED_API_NAME), ('Stage', MONITORED_API_STAGE)]
+    add('api_count', 'api', MONITORED_API_NAME, 'requests', 'AWS/ApiGateway', 'Count', dims, 'Sum')
+    add('api_4xx', 'api', MONITORED_API_NAME, 'errors_4xx', 'AWS/ApiGateway', '4XXError', dims, 'Sum')
+    add('api_5xx', 'api', MONITORED_API_NAME, 'errors_5xx', 'AWS/ApiGateway', '5XXError', dims, 'Sum')
+    for pct in LATENCY_PERCENTILES:
+        add(f"api_{pct}", 'api', MONITORED_API_NAME, pct, 'AWS/ApiGateway', 'Latency', dims, pct)
+
+    return queries, layout
+
+def fetch_fleet_metrics(start_time, end_time):
+    """Run the batched GetMetricData request (paginated) and group the results"""
+    period = int((end_time - start_time).total_seconds())
+    queries, layout = build_fleet_metric_queries(period)
+
+    sections = {'functions': {}, 'tables': {}, 'api': {}}
+    kwargs = {
+        'MetricDataQueries': queries,
+        'StartTime': start_time,
+        'EndTime': end_time,
+        'ScanBy': 'TimestampDescending'
+    }
+    while True:
+        response = clients.client('cloudwatch').get_metric_data(**kwargs)
+        for result in response.get('MetricDataResults', []):
+            section, name, field = layout[result['Id']]
+            values = result.get('Values', [])
+            if field in LATENCY_PERCENTILES:
+                # One period covers the window; take the latest value if it spans two
+                value = round(values[0], 1) if values else None
+            else:
+                value = sum(values)
+            sections[section].setdefault(name, {})[field] = value
+        if not response.get('NextToken'):
+            break
+        kwargs['NextToken'] = response['NextToken']
+
+    return sections
+
+def summarize_fleet_metrics(sections, start_time, end_time):
+    """Shape grouped metric values for the dashboard"""
+    functions = {}
+    for name, values in sections['functions'].items():
+        invocations = values.get('invocations', 0)
+        errors = values.get('errors', 0)
+        functions[name] = {
+            'invocations': invocations,
+            'errors': errors,
+            'throttles': values.get('throttles', 0),
+            'success_rate': ((invocations - errors) / invocations * 100) if invocations > 0 else 100,
+            'duration_ms': {pct: values.get(pct) for pct in LATENCY_PERCENTILES}
+        }
+
+    api = sections['api'].get(MONITORED_API_NAME, {})
+    total_invocations = sum(f['invocations'] for f in functions.values())
+    total_errors = sum(f['errors'] for f in functions.values())
+
+    return {
+        'invocations_24h': total_invocations,
+        'errors_24h': total_errors,
+        'throttles_24h': sum(f['throttles'] for f in functions.values()),
+        'success_rate': ((total_invocations - total_errors) / total_invocations * 100) if total_invocations > 0 else 100,
+        'functions': functions,
+        'tables': sections['tables'],
+        'api': {
+            'name': MONITORED_API_NAME,
+            'requests': api.get('requests', 0),
+            'errors_4xx': api.get('errors_4xx', 0),
+            'errors_5xx': api.get('errors_5xx', 0),
+            'latency_ms': {pct: api.get(pct) for pct in LATENCY_PERCENTILES}
+        },
+        'window': {'start': start_time.isoformat(), 'end': end_time.isoformat()}
+    }
 
 def get_system_metrics():
-    """Get system health metrics from CloudWatch"""
+    """
+    Get fleet health from CloudWatch: Lambda invocations/errors/throttles and
+    duration percentiles, DynamoDB throttles and consumed capacity, and API
+    Gateway latency percentiles, all in one GetMetricData batch. Results are
+    cached per 5-minute period since CloudWatch data doesn't move faster.
+    """
     try:
-        # Get Lambda metrics
-        end_time = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        # Align to the metrics period so every container in it shares one result
+        period_start = int(now.timestamp()) // METRICS_CACHE_PERIOD_SECONDS * METRICS_CACHE_PERIOD_SECONDS
+
+        cached = _metrics_cache.get(period_start)
+        if cached:
+            return dict(cached, cached=True)
+
+        end_time = datetime.fromtimestamp(period_start, tz=timezone.utc)
         start_time = end_time - timedelta(hours=24)
-        
-        # Lambda invocations
-        invocations = cloudwatch.get_metric_statistics(
-            Namespace='AWS/Lambda',
-            MetricName='Invocations',
-            Dimensions=[
-                {
-                    'Name': 'FunctionName',
-                    'Value': 'mission-mischief-premium-scraper'
-                }
-            ],
-            StartTime=start_time,
-            EndTime=end_time,
-            Period=3600,
-            Statistics=['Sum']
-        )
-        
-        # Lambda errors
-        errors = cloudwatch.get_metric_statistics(
-            Namespace='AWS/Lambda',
-            MetricName='Errors',
-            Dimensions=[
-                {
-                    'Name': 'FunctionName',
-                    'Value': 'mission-mischief-premium-scraper'
-                }
-            ],
-            StartTime=start_time,
-            EndTime=end_time,
-            Period=3600,
-            Statistics=['Sum']
-        )
-        
-        total_invocations = sum([dp['Sum'] for dp in invocations['Datapoints']])
-        total_errors = sum([dp['Sum'] for dp in errors['Datapoints']])
-        
-        return {
-            'invocations_24h': total_invocations,
-            'errors_24h': total_errors,
-            'success_rate': ((total_invocations - total_errors) / total_invocations * 100) if total_invocations > 0 else 100
-        }
+        metrics = summarize_fleet_metrics(fetch_fleet_metrics(start_time, end_time), start_time, end_time)
+
+        _metrics_cache.clear()
+        _metrics_cache[period_start] = metrics
+        return dict(metrics, cached=False)
         
     except Exception as e:
         logger.error(f"Failed to get system metrics: {e}")
-        return {'invocations_24h': 0, 'errors_24h': 0, 'success_rate': 100}
+        return get_fallback_system_metrics()
+
+def get_fallback_system_metrics():
+    """Fallback metrics when CloudWatch fails or times out"""
+    return {
+        'invocations_24h': 0,
+        'errors_24h': 0,
+        'throttles_24h': 0,
+        'success_rate': 100,
+        'functions': {},
+        'tables': {},
+        'api': {}
+    }
 
 def get_game_data():
-    """Get real game data from DynamoDB"""
+    """Get today's game data from DynamoDB via the day bucket index"""
     try:
-        table = dynamodb.Table('mission-mischief-posts')
-        
-        # Get today's posts
-        today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
-        
-        # Scan for recent posts (last 24 hours)
-        response = table.scan(
-            FilterExpression='begins_with(#pk, :today)',
-            ExpressionAttributeNames={'#pk': 'post_id'},
-            ExpressionAttributeValues={':today': today}
-        )
+        table = clients.wire_table(POSTS_TABLE)
         
-        posts = response.get('Items', [])
+        # Query only today's partition instead of scanning the whole table
+        today = day_bucket()
         
-        # Calculate metrics
-        active_players = len(set(post.get('username', '') for post in posts))
-        posts_today = len(posts)
-        
-        # Get geographic spread
+        active_players = set()
         cities = set()
-        for post in posts:
+        posts_today = 0
+        
+        for post in iter_day_bucket(table, today, **projection(('username', 'city'))):
+            posts_today += 1
+            active_players.add(post.get('username', ''))
             if post.get('city'):
                 cities.add(post.get('city'))
         
         return {
-            'active_players': active_players,
+            'active_players': len(active_players),
             'posts_today': posts_today,
             'verification_rate': 100,  # All scraped posts are verified
             'geographic_spread': len(cities),
-            'total_posts': len(posts)
+            'total_posts': posts_today
         }
         
     except Exception as e:
         logger.error(f"Failed to get game data: {e}")
-        return {
-            'active_players': 0,
-            'posts_today': 0,
-            'verification_rate': 100,
-            'geographic_spread': 0,
-            'total_posts': 0
-        }
+        return get_fallback_game_data()
+
+def get_fallback_game_data():
+    """Fallback game data when DynamoDB fails or times out"""
+    return {
+        'active_players': 0,
+        'posts_today': 0,
+        'verification_rate': 100,
+        'geographic_spread': 0,
+        'total_posts': 0
+    }
+
+def get_submissions_version():
+    """Cheap content version of /submissions (aggregates update counter), or None"""
+    try:
+        return read_version(clients.table(AGGREGATES_TABLE))
+    except Exception as e:
+        logger.error(f"Failed to read submissions version: {e}")
+        return None
 
-def get_all_submissions():
-    """Get all direct submissions for bounty hunter display"""
+def get_all_submissions(deadline=None):
+    """
+    Get bounty hunter data from the stream-maintained aggregates table.
+    Falls back to scanning every submission if the read model isn't built.
+    """
     try:
-        table = dynamodb.Table('mission-mischief-posts')
+        data = read_bounty_data(clients.table(AGGREGATES_TABLE))
+        if data is not None:
+            data['readModel'] = 'aggregates'
+            return data
+        logger.warning("Aggregates read model is empty, falling back to scan")
+    except Exception as e:
+        logger.error(f"Failed to read aggregates, falling back to scan: {e}")
+
+    data = scan_all_submissions(deadline)
+    data['readModel'] = 'scan'
+    return data
+
+def scan_all_submissions(deadline=None):
+    """
+    Get all direct submissions for bounty hunter display by scanning posts.
+    Items stream in from a paginated parallel scan; if the deadline passes
+    first, the rollup of what was read so far is returned with partial=True.
+    """
+    try:
+        table = clients.wire_table(POSTS_TABLE)
         
-        # Scan for all direct submissions
-        response = table.scan(
+        # Parallel scan for all direct submissions, following every page
+        submissions = ParallelScan(table, deadline=deadline, **projection(
+            SUBMISSION_ATTRIBUTES,
             FilterExpression='#source = :source',
             ExpressionAttributeNames={'#source': 'source'},
             ExpressionAttributeValues={':source': 'direct_submission'}
-        )
+        ))
         
-        submissions = response.get('Items', [])
+        # Single-pass rollup as pages arrive
+        rollup = SubmissionRollup().consume(submissions)
         
-        # Process submissions into bounty hunter format
-        processed_data = {
-            'topPlayers': [],
-            'geography': {},
-            'missionActivity': {},
-            'justiceCases': [],
-            'lastUpdated': datetime.now().isoformat()
-        }
-        
-        player_stats = {}
-        geo_data = {}
-        mission_activity = {}
-        
-        for sub in submissions:
-            username = sub.get('username', 'Unknown')
-            mission_id = int(sub.get('mission_id', 0))
-            points = int(sub.get('points', 0))
-            proof_url = sub.get('proof_url', '')
-            
-            # Build player stats with location data from submission
-            player_key = f"{username}"
-            if player_key not in player_stats:
-                player_stats[player_key] = {
-                    'handle': username,
-                    'points': 0,
-                    'city': sub.get('city', 'Unknown'),
-                    'state': sub.get('state', 'Unknown'),
-                    'country': sub.get('country', 'USA')
-                }
-            player_stats[player_key]['points'] += points
-            
-            # Build geography data from submission
-            state = sub.get('state', player_stats[player_key]['state'])
-            city = sub.get('city', player_stats[player_key]['city'])
-            
-            if state not in geo_data:
-                geo_data[state] = {}
-            if city not in geo_data[state]:
-                geo_data[state][city] = {
-                    'count': 0,
-                    'players': []
-                }
-            geo_data[state][city]['count'] += 1
-            
-            # Add player if not already there
-            existing_player = next((p for p in geo_data[state][city]['players'] if p['handle'] == username), None)
-            if not existing_player:
-                geo_data[state][city]['players'].append({
-                    'handle': username,
-                    'social_url': proof_url
-                })
-            
-            # Build mission activity
-            if mission_id not in mission_activity:
-                mission_activity[mission_id] = {
-                    'instagram': 0,
-                    'facebook': 0,
-                    'x': 0
-                }
-            
-            # Detect platform from proof URL
-            url_lower = proof_url.lower()
-            if 'instagram.com' in url_lower:
-                mission_activity[mission_id]['instagram'] += 1
-            elif 'facebook.com' in url_lower:
-                mission_activity[mission_id]['facebook'] += 1
-            elif 'x.com' in url_lower or 'twitter.com' in url_lower:
-                mission_activity[mission_id]['x'] += 1
-        
-        # Convert to final format
-        processed_data['topPlayers'] = sorted(
-            list(player_stats.values()),
-            key=lambda x: x['points'],
-            reverse=True
-        )[:10]
-        
-        processed_data['geography'] = geo_data
-        processed_data['missionActivity'] = mission_activity
+        processed_data = rollup.to_bounty_data()
+        processed_data['partial'] = not submissions.complete
         
         return processed_data
         
@@ -273,7 +526,8 @@ def get_all_submissions():
             'geography': {},
             'missionActivity': {},
             'justiceCases': [],
-            'lastUpdated': datetime.now().isoformat()
+            'lastUpdated': datetime.now().isoformat(),
+            'partial': True
         }
 
 def get_bright_data_usage():
@@ -289,7 +543,10 @@ def get_bright_data_usage():
         auth = (bright_data_creds['username'], bright_data_creds['password'])
         headers = {'Content-Type': 'application/json'}
         
-        response = requests.get(api_url, auth=auth, headers=headers, timeout=10)
+        # Only the dashboard collector calls out; keep requests off the cold start path
+        from mission_mischief import outbound
+        response = outbound.get_session().get(api_url, auth=auth, headers=headers)
+        logger.info(f"Outbound connection stats: {outbound.get_stats()}")
         
         if response.status_code == 200:
             usage_data = response.json()
@@ -321,98 +578,418 @@ def get_fallback_bright_data():
         'reset_date': '2025-12-01'
     }
 
-def check_cost_threshold():
-    """Check if costs exceed threshold and send alerts if needed"""
+def get_alert_state():
+    """Persisted cost alert state (also the dashboard's alerts read model)"""
+    table = clients.table(ADMIN_CACHE_TABLE)
+    item = table.get_item(Key={'cache_key': COST_ALERT_STATE_KEY}).get('Item')
+    return item or {'cache_key': COST_ALERT_STATE_KEY, 'revision': 0, 'subscriptions': []}
+
+def save_alert_state(state, expected_revision):
+    """Write alert state, refusing to overwrite a concurrent evaluator's update"""
+    table = clients.table(ADMIN_CACHE_TABLE)
+    state['revision'] = expected_revision + 1
+    condition = 'attribute_not_exists(cache_key) OR revision = :expected'
+    table.put_item(
+        Item=state,
+        ConditionExpression=condition,
+        ExpressionAttributeValues={':expected': expected_revision}
+    )
+
+def ensure_alert_topic(state, alert_config):
+    """
+    Resolve the alert topic and subscriptions once and remember them in state,
+    instead of calling create_topic/subscribe on every evaluation.
+    """
+    sns = clients.client('sns')
+    topic_arn = ALERT_TOPIC_ARN or state.get('topic_arn')
+    if not topic_arn:
+        topic_arn = sns.create_topic(Name='mission-mischief-alerts')['TopicArn']
+    state['topic_arn'] = topic_arn
+
+    subscribed = set(state.get('subscriptions') or [])
+    for protocol, key in (('sms', 'phone'), ('email', 'email')):
+        endpoint = alert_config.get(key)
+        if endpoint and f"{protocol}:{endpoint}" not in subscribed:
+            sns.subscribe(TopicArn=topic_arn, Protocol=protocol, Endpoint=endpoint)
+            subscribed.add(f"{protocol}:{endpoint}")
+            logger.info(f"Subscribed {protocol} endpoint to cost alerts")
+    state['subscriptions'] = sorted(subscribed)
+    return topic_arn
+
+def decide_cost_alert(state, total, threshold, alert_config, now):
+    """
+    Hysteresis for cost alerts. Returns the reason to alert, or None.
+    - first crossing of the threshold alerts once
+    - while over, re-alert only if the cost grew by another escalation step
+      and the minimum interval since the last alert has passed
+    - the alert re-arms once cost drops below the threshold minus the band
+      (which also happens naturally when a new billing month starts)
+    """
+    step = float(alert_config.get('escalation_step', threshold * 0.25))
+    rearm_band = float(alert_config.get('rearm_band', 0.1))
+    min_interval = timedelta(hours=float(alert_config.get('min_interval_hours', 24)))
+
+    if state.get('active') and total < threshold * (1 - rearm_band):
+        state['active'] = False
+        logger.info(f"Cost alert re-armed at ${total:.2f}")
+
+    if total <= threshold:
+        return None
+
+    if not state.get('active'):
+        return 'threshold_crossed'
+
+    last_amount = float(state.get('last_alerted_amount', 0))
+    last_alert_at = state.get('last_alert_at')
+    due = not last_alert_at or now - datetime.fromisoformat(last_alert_at) >= min_interval
+    if total >= last_amount + step and due:
+        return 'escalated'
+    return None
+
+def evaluate_cost_alerts():
+    """
+    Scheduled cost alert evaluation: compare the cached month-to-date cost with
+    the configured threshold and publish to SNS only on state transitions.
+    """
+    alert_config = get_secret('mission-mischief/alert-config')
+    if not alert_config:
+        return {'evaluated': False, 'reason': 'no alert config'}
+
+    now = datetime.now(timezone.utc)
+    costs = get_aws_costs()
+    # The fallback reports $0: evaluating it would clear an active alert
+    if 'cache' not in costs or costs.get('period') == 'unknown':
+        logger.warning('Cost data unavailable, skipping cost alert evaluation')
+        return {'evaluated': False, 'reason': 'cost data unavailable'}
+    total = float(costs['total'])
+    threshold = float(alert_config.get('cost_threshold', 75))
+
+    state = get_alert_state()
+    revision = int(state.get('revision', 0))
+    reason = decide_cost_alert(state, total, threshold, alert_config, now)
+
+    if reason:
+        topic_arn = ensure_alert_topic(state, alert_config)
+        message = f"🚨 Mission Mischief: Monthly cost ${total:.2f} exceeded ${threshold} threshold. Check admin dashboard."
+        clients.client('sns').publish(TopicArn=topic_arn, Subject='Mission Mischief Cost Alert', Message=message)
+        logger.info(f"Cost alert published ({reason}): ${total:.2f}")
+
+        state['active'] = True
+        state['last_alert_at'] = now.isoformat()
+        state['last_alerted_amount'] = str(round(total, 2))
+        state['last_alert_reason'] = reason
+        state['alerts_sent'] = int(state.get('alerts_sent', 0)) + 1
+
+    state['threshold'] = str(threshold)
+    state['last_total'] = str(round(total, 2))
+    state['last_check'] = now.isoformat()
+    save_alert_state(state, revision)
+
+    return {'evaluated': True, 'alert_sent': bool(reason), 'reason': reason, 'total': total}
+
+def get_alert_status():
+    """Dashboard alerts section: one GetItem on the evaluator's state"""
     try:
-        alert_config = get_secret('mission-mischief/alert-config')
-        if not alert_config:
-            return False
-            
-        costs = get_aws_costs()
-        threshold = alert_config.get('cost_threshold', 75)
-        
-        if costs['total'] > threshold:
-            # Send SMS alert
-            phone = alert_config.get('phone')
-            if phone:
-                message = f"🚨 Mission Mischief: Monthly cost ${costs['total']:.2f} exceeded ${threshold} threshold. Check admin dashboard."
-                
-                # Create SNS topic if it doesn't exist
-                try:
-                    topic_response = sns.create_topic(Name='mission-mischief-alerts')
-                    topic_arn = topic_response['TopicArn']
-                    
-                    # Subscribe phone number
-                    sns.subscribe(
-                        TopicArn=topic_arn,
-                        Protocol='sms',
-                        Endpoint=phone
-                    )
-                    
-                    # Send message
-                    sns.publish(
-                        TopicArn=topic_arn,
-                        Message=message
-                    )
-                    
-                    logger.info(f"Cost alert sent to {phone}")
-                    return True
-                    
-                except Exception as e:
-                    logger.error(f"Failed to send SMS alert: {e}")
-            
-            # Send email alert as backup
-            email = alert_config.get('email')
-            if email:
-                try:
-                    topic_response = sns.create_topic(Name='mission-mischief-alerts')
-                    topic_arn = topic_response['TopicArn']
-                    
-                    sns.subscribe(
-                        TopicArn=topic_arn,
-                        Protocol='email',
-                        Endpoint=email
-                    )
-                    
-                    sns.publish(
-                        TopicArn=topic_arn,
-                        Subject='Mission Mischief Cost Alert',
-                        Message=message
-                    )
-                    
-                    logger.info(f"Cost alert sent to {email}")
-                    return True
-                    
-                except Exception as e:
-                    logger.error(f"Failed to send email alert: {e}")
+        state = get_alert_state()
+        return {
+            'cost_alert_active': bool(state.get('active')),
+            'cost_alert_sent': bool(state.get('last_alert_at')),
+            'last_alert_at': state.get('last_alert_at'),
+            'last_alerted_amount': float(state['last_alerted_amount']) if state.get('last_alerted_amount') else None,
+            'threshold': float(state['threshold']) if state.get('threshold') else None,
+            'last_check': state.get('last_check')
+        }
+    except Exception as e:
+        logger.error(f"Failed to get alert status: {e}")
+        return get_fallback_alert_status()
+
+def get_fallback_alert_status():
+    """Fallback alerts section when the alert state can't be read"""
+    return {
+        'cost_alert_active': False,
+        'cost_alert_sent': False,
+        'last_alert_at': None,
+        'last_alerted_amount': None,
+        'threshold': None,
+        'last_check': None
+    }
+
+def handle_scheduled_event(event, context):
+    """EventBridge schedule targets pass {"job": ...} as constant input"""
+    job = event.get('job', 'cost_alerts')
+    try:
+        if job == 'cost_alerts':
+            result = evaluate_cost_alerts()
+        elif job == 'dashboard_snapshot':
+            result = refresh_dashboard_snapshot(context)
+        else:
+            logger.warning(f"Unknown scheduled job: {job}")
+            return {'success': False, 'error': f"Unknown job {job}"}
         
-        return False
+        logger.info(f"Scheduled job {job} finished: {result}")
+        return {'success': True, 'job': job, 'result': result}
         
     except Exception as e:
-        logger.error(f"Failed to check cost threshold: {e}")
-        return False
+        logger.error(f"Scheduled job {job} failed: {e}")
+        return {'success': False, 'job': job, 'error': str(e)}
+
+def get_collector_deadline(context):
+    """Monotonic deadline for dashboard collectors, leaving time to build the response"""
+    remaining_ms = COLLECTOR_DEFAULT_BUDGET_MS
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        remaining_ms = context.get_remaining_time_in_millis()
+    budget_ms = max(remaining_ms - COLLECTOR_SAFETY_MARGIN_MS, 0)
+    return time.monotonic() + budget_ms / 1000.0
+
+def run_collectors(collectors, deadline):
+    """
+    Run dashboard collectors concurrently on a bounded thread pool.
+
+    collectors is a list of (name, fn, fallback, timeout_seconds); each fn is
+    called with no arguments and returns its section's data. A collector
+    that misses its deadline or raises gets its fallback value and is
+    flagged in the returned status map; the other sections are unaffected.
+    """
+    executor = ThreadPoolExecutor(max_workers=COLLECTOR_MAX_WORKERS)
+    started = time.monotonic()
+    futures = {}
+    results = {}
+    status = {}
+
+    try:
+        for name, fn, fallback, timeout in collectors:
+            futures[name] = executor.submit(fn)
+
+        for name, fn, fallback, timeout in collectors:
+            section_deadline = min(deadline, started + timeout)
+            try:
+                results[name] = futures[name].result(timeout=max(section_deadline - time.monotonic(), 0))
+                status[name] = {'stale': False, 'timed_out': False}
+            except FuturesTimeoutError:
+                logger.warning(f"Collector {name} timed out, serving fallback")
+                results[name] = fallback()
+                status[name] = {'stale': True, 'timed_out': True}
+            except Exception as e:
+                logger.error(f"Collector {name} failed: {e}")
+                results[name] = fallback()
+                status[name] = {'stale': True, 'timed_out': False}
+            status[name]['elapsed_ms'] = int((time.monotonic() - started) * 1000)
+    finally:
+        # Don't wait on stragglers; their results are already replaced by fallbacks
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, status
+
+def collect_admin_data(context):
+    """Collect every admin dashboard section within the invocation's remaining time"""
+    collectors = [
+        ('costs', get_aws_costs, get_fallback_costs, 10),
+        ('system_metrics', get_system_metrics, get_fallback_system_metrics, 8),
+        ('game_data', get_game_data, get_fallback_game_data, 8),
+        ('brightdata_usage', get_bright_data_usage, get_fallback_bright_data, 12),
+        # Alerts are evaluated on a schedule; the dashboard only reads their state
+        ('alerts', get_alert_status, get_fallback_alert_status, 5)
+    ]
+
+    results, status = run_collectors(collectors, get_collector_deadline(context))
+
+    return {
+        'costs': results['costs'],
+        'system_metrics': results['system_metrics'],
+        'brightdata_usage': results['brightdata_usage'],
+        'game_data': results['game_data'],
+        'alerts': results['alerts'],
+        'collectors': status,
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    }
+
+def publish_dashboard_snapshot(admin_data):
+    """Write collected dashboard data to S3 as admin-dashboard.json"""
+    body = json.dumps(admin_data, default=str).encode('utf-8')
+    clients.client('s3').put_object(
+        Bucket=DASHBOARD_SNAPSHOT_BUCKET,
+        Key=DASHBOARD_SNAPSHOT_KEY,
+        Body=body,
+        ContentType='application/json',
+        CacheControl='no-cache'
+    )
+    logger.info(f"Published dashboard snapshot ({len(body)} bytes) to s3://{DASHBOARD_SNAPSHOT_BUCKET}/{DASHBOARD_SNAPSHOT_KEY}")
+    return len(body)
+
+def refresh_dashboard_snapshot(context):
+    """Scheduled job: run every collector and publish the result"""
+    if not DASHBOARD_SNAPSHOT_BUCKET:
+        return {'published': False, 'reason': 'DASHBOARD_SNAPSHOT_BUCKET is not set'}
+    started = time.monotonic()
+    admin_data = collect_admin_data(context)
+    try:
+        admin_data['trends'] = record_metric_history(admin_data)
+    except Exception as e:
+        logger.error(f"Failed to record metric history: {e}")
+    size = publish_dashboard_snapshot(admin_data)
+    return {
+        'published': True,
+        'bytes': size,
+        'generated_at': admin_data['timestamp'],
+        'elapsed_ms': int((time.monotonic() - started) * 1000)
+    }
+
+def load_metric_history(month):
+    """One month of metric history from S3, or None if nothing was recorded"""
+    if month in _history_cache:
+        return _history_cache[month]
+    try:
+        response = clients.client('s3').get_object(
+            Bucket=DASHBOARD_SNAPSHOT_BUCKET, Key=f"{HISTORY_KEY_PREFIX}{month}.bin"
+        )
+    except Exception as e:
+        if getattr(e, 'response', {}).get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+            return None
+        raise
+    history = MetricHistory.from_bytes(response['Body'].read())
+    if month < month_key(time.time()):
+        _history_cache[month] = history
+    return history
+
+def save_metric_history(month, history):
+    body = history.to_bytes()
+    clients.client('s3').put_object(
+        Bucket=DASHBOARD_SNAPSHOT_BUCKET,
+        Key=f"{HISTORY_KEY_PREFIX}{month}.bin",
+        Body=body,
+        ContentType='application/octet-stream'
+    )
+    return len(body)
+
+def extract_metric_sample(admin_data):
+    """History sample from collected dashboard data; sections served from fallbacks are left out"""
+    status = admin_data.get('collectors', {})
+    
+    def fresh(name):
+        return not status.get(name, {}).get('stale', True)
+    
+    sample = {}
+    if fresh('costs'):
+        sample['cost_month_to_date'] = admin_data['costs'].get('total')
+    if fresh('system_metrics'):
+        sample['invocations_24h'] = admin_data['system_metrics'].get('invocations_24h')
+        sample['errors_24h'] = admin_data['system_metrics'].get('errors_24h')
+    if fresh('game_data'):
+        sample['posts_today'] = admin_data['game_data'].get('posts_today')
+        sample['active_players'] = admin_data['game_data'].get('active_players')
+    return sample
+
+def get_metric_trends(now, current=None):
+    """30/90-day daily sparklines from the monthly history objects"""
+    months = sorted({month_key(ts) for ts in range(now - max(TREND_DAYS) * DAY, now + 1, DAY)} | {month_key(now)})
+    histories = []
+    for month in months:
+        history = current if current is not None and month == month_key(now) else load_metric_history(month)
+        if history is not None:
+            histories.append(history)
+    return {f"{days}d": trend(histories, days, now) for days in TREND_DAYS}
+
+def record_metric_history(admin_data):
+    """
+    Append this snapshot's numbers to the current month's history, apply the
+    downsampling policy and return the trend section for the snapshot.
+    """
+    now = int(time.time())
+    month = month_key(now)
+    history = load_metric_history(month)
+    
+    if history is None:
+        history = MetricHistory()
+        # First sample of a new month: collapse last month to daily for good
+        previous_month = month_key(now - datetime.fromtimestamp(now, timezone.utc).day * DAY)
+        previous = load_metric_history(previous_month)
+        if previous is not None:
+            save_metric_history(previous_month, previous.compact())
+    
+    sample = extract_metric_sample(admin_data)
+    if sample and (not len(history) or now > history.timestamps[-1]):
+        history.append(now, sample)
+    history.downsample(now)
+    size = save_metric_history(month, history)
+    logger.info(f"Metric history {month}: {len(history)} samples, {size} bytes")
+    
+    return get_metric_trends(now, current=history)
+
+def load_dashboard_snapshot():
+    """Latest published snapshot and its S3 ETag, or (None, None)"""
+    if not DASHBOARD_SNAPSHOT_BUCKET:
+        return None, None
+    try:
+        response = clients.client('s3').get_object(Bucket=DASHBOARD_SNAPSHOT_BUCKET, Key=DASHBOARD_SNAPSHOT_KEY)
+        return json.loads(response['Body'].read()), response.get('ETag', '').strip('"')
+    except Exception as e:
+        logger.warning(f"Dashboard snapshot unavailable: {e}")
+        return None, None
+
+def build_submission(event_body):
+    """
+    Posts item for one direct submission; raises ValueError when a field is
+    missing or malformed. post_id comes only from what the client sent (its
+    submissionId, else its timestamp in epoch milliseconds), so a resent
+    submission maps to the same item.
+    """
+    for field in ('username', 'missionId', 'points', 'timestamp'):
+        if event_body.get(field) in (None, ''):
+            raise ValueError(f"Missing {field}")
+    try:
+        mission_id = int(event_body['missionId'])
+        points = int(event_body['points'])
+    except (TypeError, ValueError):
+        raise ValueError('missionId and points must be integers')
+    
+    submission_id = event_body.get('submissionId')
+    if submission_id is not None and not SUBMISSION_ID_PATTERN.match(str(submission_id)):
+        raise ValueError('submissionId must be 1-64 letters, digits, - or _')
+    
+    # Index keys must be strings; clients occasionally send epoch numbers
+    submitted_at = parse_timestamp(event_body['timestamp'])
+    if submitted_at is None:
+        if submission_id is None:
+            raise ValueError('timestamp is not a recognised date')
+        submitted_at = datetime.now(timezone.utc)
+    timestamp = event_body['timestamp']
+    if not isinstance(timestamp, str):
+        timestamp = submitted_at.isoformat()
+    
+    client_key = submission_id if submission_id is not None else epoch_millis(submitted_at)
+    post_id = f"direct_{event_body['username']}_{mission_id}_{client_key}"
+    return {
+        'post_id': post_id,
+        'username': str(event_body['username']),
+        'mission_id': mission_id,
+        'points': points,
+        'proof_url': event_body.get('proofUrl'),
+        'timestamp': timestamp,
+        'day_bucket': day_bucket(submitted_at),
+        **time_keys(post_id, submitted_at),
+        'city': event_body.get('city', 'Unknown'),
+        'state': event_body.get('state', 'Unknown'),
+        'country': event_body.get('country', 'USA'),
+        'source': 'direct_submission',
+        'ttl': int((datetime.now() + timedelta(days=90)).timestamp())
+    }
 
 def handle_direct_submission(event_body):
     """Handle direct mission submission"""
     try:
-        table = dynamodb.Table('mission-mischief-posts')
+        table = clients.table(POSTS_TABLE)
         
         # Create submission record
-        submission = {
-            'post_id': f"direct_{event_body['username']}_{event_body['missionId']}_{int(datetime.now().timestamp())}",
-            'username': event_body['username'],
-            'mission_id': event_body['missionId'],
-            'points': event_body['points'],
-            'proof_url': event_body.get('proofUrl'),
-            'timestamp': event_body['timestamp'],
-            'city': event_body.get('city', 'Unknown'),
-            'state': event_body.get('state', 'Unknown'),
-            'country': event_body.get('country', 'USA'),
-            'source': 'direct_submission',
-            'ttl': int((datetime.now() + timedelta(days=90)).timestamp())
-        }
+        submission = build_submission(event_body)
         
-        table.put_item(Item=submission)
+        try:
+            table.put_item(Item=submission, ConditionExpression='attribute_not_exists(post_id)')
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+            # Resent after a lost response: already saved, nothing to write
+            logger.info(f"Direct submission already saved: {submission['post_id']}")
+            return {'success': True, 'submission_id': submission['post_id'], 'duplicate': True}
         logger.info(f"Direct submission saved: {submission['post_id']}")
         
         return {'success': True, 'submission_id': submission['post_id']}
@@ -421,20 +998,153 @@ def handle_direct_submission(event_body):
         logger.error(f"Failed to handle direct submission: {e}")
         return {'success': False, 'error': str(e)}
 
+def existing_post_ids(post_ids):
+    """
+    The post_ids already in the posts table (keys-only BatchGetItem, 100 per
+    request). Raises if DynamoDB keeps returning UnprocessedKeys, so a
+    batch is never written without knowing what it already holds.
+    """
+    dynamodb = clients.resource('dynamodb')
+    post_ids = list(post_ids)
+    found = set()
+    
+    for start in range(0, len(post_ids), BATCH_GET_CHUNK):
+        request = {POSTS_TABLE: {
+            'Keys': [{'post_id': post_id} for post_id in post_ids[start:start + BATCH_GET_CHUNK]],
+            'ProjectionExpression': 'post_id'
+        }}
+        for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(random.uniform(0, BATCH_WRITE_BASE_DELAY_SECONDS * 2 ** attempt))
+            response = dynamodb.batch_get_item(RequestItems=request)
+            found.update(item['post_id'] for item in response.get('Responses', {}).get(POSTS_TABLE, []))
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+        if request:
+            raise RuntimeError('BatchGetItem throttled, batch not written')
+    
+    return found
+
+def batch_write_posts(items):
+    """
+    Write posts with BatchWriteItem, 25 per request. UnprocessedItems and
+    throttled requests are retried with full-jitter exponential backoff.
+    Returns {post_id: (error, retryable)} for items that were not written.
+    """
+    dynamodb = clients.resource('dynamodb')
+    failed = {}
+    
+    for start in range(0, len(items), BATCH_WRITE_CHUNK):
+        pending = [{'PutRequest': {'Item': item}} for item in items[start:start + BATCH_WRITE_CHUNK]]
+        error = 'Throttled, not written'
+        
+        for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(random.uniform(0, BATCH_WRITE_BASE_DELAY_SECONDS * 2 ** attempt))
+            try:
+                response = dynamodb.batch_write_item(RequestItems={POSTS_TABLE: pending})
+                pending = response.get('UnprocessedItems', {}).get(POSTS_TABLE, [])
+            except Exception as e:
+                code = getattr(e, 'response', {}).get('Error', {}).get('Code')
+                if code not in RETRYABLE_ERROR_CODES:
+                    logger.error(f"BatchWriteItem failed: {e}")
+                    failed.update({r['PutRequest']['Item']['post_id']: (str(e), False) for r in pending})
+                    pending = []
+                    break
+                error = str(e)
+                logger.warning(f"BatchWriteItem throttled (attempt {attempt + 1}): {code}")
+            if not pending:
+                break
+        
+        for request in pending:
+            failed[request['PutRequest']['Item']['post_id']] = (error, True)
+    
+    return failed
+
+def handle_direct_submission_batch(event_body):
+    """
+    Handle a batch of direct submissions (offline sync): validate each one,
+    write the valid ones with BatchWriteItem and report a result per item.
+    Submissions whose post_id already exists (a batch resent after a lost
+    response) succeed as duplicates without being written again. A resend
+    racing the original past that check rewrites the same key, so it is
+    still one post.
+    """
+    submissions = event_body.get('submissions')
+    if not isinstance(submissions, list) or not submissions:
+        return {'success': False, 'error': 'submissions must be a non-empty list'}
+    if len(submissions) > DIRECT_SUBMIT_BATCH_MAX:
+        return {'success': False, 'error': f"At most {DIRECT_SUBMIT_BATCH_MAX} submissions per batch"}
+    
+    results = [None] * len(submissions)
+    items = []
+    indexes = {}
+    
+    for index, sub in enumerate(submissions):
+        try:
+            if not isinstance(sub, dict):
+                raise ValueError('Submission must be an object')
+            item = build_submission(sub)
+        except ValueError as e:
+            results[index] = {'index': index, 'success': False, 'error': str(e)}
+            continue
+        if item['post_id'] in indexes:
+            # The same submission queued twice; BatchWriteItem rejects
+            # duplicate keys in one request, so it is written once
+            results[index] = {'index': index, 'success': True, 'submission_id': item['post_id'], 'duplicate': True}
+            continue
+        indexes[item['post_id']] = index
+        items.append(item)
+    
+    existing = existing_post_ids(indexes) if items else set()
+    for post_id in existing:
+        index = indexes[post_id]
+        results[index] = {'index': index, 'success': True, 'submission_id': post_id, 'duplicate': True}
+    items = [item for item in items if item['post_id'] not in existing]
+    
+    failed = batch_write_posts(items) if items else {}
+    
+    for item in items:
+        index = indexes[item['post_id']]
+        if item['post_id'] in failed:
+            error, retryable = failed[item['post_id']]
+            results[index] = {'index': index, 'success': False, 'error': error, 'retryable': retryable}
+        else:
+            results[index] = {'index': index, 'success': True, 'submission_id': item['post_id']}
+    
+    saved = sum(1 for result in results if result['success'])
+    duplicates = sum(1 for result in results if result.get('duplicate'))
+    logger.info(f"Direct submission batch: {saved - duplicates} written, {duplicates} already saved, "
+                f"{len(submissions) - saved} failed")
+    
+    return {
+        'success': saved == len(submissions),
+        'written': saved - duplicates,
+        'duplicates': duplicates,
+        'failed': len(submissions) - saved,
+        'results': results
+    }
+
+def response_body(status_code, body_dict, event=None):
+    """JSON response with CORS headers, compressed when the client accepts it"""
+    response = {
+        'statusCode': status_code,
+        'headers': CORS_HEADERS,
+        'body': json.dumps(body_dict)
+    }
+    return compress_response(event, response)
+
 def lambda_handler(event, context):
-    """Main Lambda handler for admin dashboard and submissions"""
+    """Main Lambda handler for admin dashboard, submissions and scheduled jobs"""
+    
+    # Scheduled jobs (EventBridge) don't carry an httpMethod
+    if 'httpMethod' not in event and (event.get('job') or event.get('source') == 'aws.events'):
+        return handle_scheduled_event(event, context)
     
     # Handle CORS
     if event.get('httpMethod') == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-                'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
-            },
-            'body': ''
-        }
+        return {'statusCode': 200, 'headers': CORS_HEADERS, 'body': ''}
     
     # Handle POST requests (direct submissions)
     if event.get('httpMethod') == 'POST':
@@ -443,117 +1153,96 @@ def lambda_handler(event, context):
             
             if body.get('action') == 'direct_submit':
                 result = handle_direct_submission(body)
-                
-                return {
-                    'statusCode': 200 if result['success'] else 400,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps(result)
-                }
+                return response_body(200 if result['success'] else 400, result)
+            elif body.get('action') == 'direct_submit_batch':
+                result = handle_direct_submission_batch(body)
+                # Per-item outcomes are in the body; 400 only for a malformed batch
+                return response_body(200 if 'results' in result else 400, result)
             else:
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({'success': False, 'error': 'Unknown action'})
-                }
+                return response_body(400, {'success': False, 'error': 'Unknown action'})
                 
         except Exception as e:
             logger.error(f"POST request failed: {e}")
-            return {
-                'statusCode': 500,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'success': False, 'error': str(e)})
-            }
+            return response_body(500, {'success': False, 'error': str(e)})
     
     # Handle GET requests
     try:
         # Check if this is a submissions request
         path = event.get('path', '')
         if path.endswith('/submissions'):
+            version = get_submissions_version()
+            etag = make_etag('submissions', version) if version is not None else None
+            if etag_matches(event, etag):
+                logger.info("Submissions unchanged since the client's copy, returning 304")
+                return not_modified(CORS_HEADERS, etag)
+            
             logger.info("Getting all submissions for bounty hunter")
-            submissions_data = get_all_submissions()
+            submissions_data = get_all_submissions(get_collector_deadline(context))
             
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-                    'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
-                },
-                'body': json.dumps({
+            # Tag the body with the version it was built from; scan fallbacks have none
+            etag = None
+            if submissions_data.get('readModel') == 'aggregates':
+                etag = make_etag('submissions', submissions_data['version'])
+            
+            return with_etag(response_body(200, {
+                'success': True,
+                'data': submissions_data,
+                'source': 'aws_dynamodb',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }, event), etag)
+        
+        # Default admin dashboard request: serve the scheduled snapshot
+        # unless ?fresh=1 asks for a live rebuild
+        params = event.get('queryStringParameters') or {}
+        fresh = params.get('fresh') in ('1', 'true')
+        
+        if not fresh:
+            snapshot, s3_etag = load_dashboard_snapshot()
+            if snapshot is not None:
+                etag = make_etag('dashboard', s3_etag) if s3_etag else None
+                if etag_matches(event, etag):
+                    return not_modified(CORS_HEADERS, etag)
+                
+                generated_at = parse_timestamp(snapshot.get('timestamp'))
+                age = (datetime.now(timezone.utc) - generated_at).total_seconds() if generated_at else None
+                return with_etag(response_body(200, {
                     'success': True,
-                    'data': submissions_data,
-                    'source': 'aws_dynamodb',
+                    'data': snapshot,
+                    'snapshot': {'source': 's3', 'generated_at': snapshot.get('timestamp'), 'age_seconds': age},
                     'timestamp': datetime.now(timezone.utc).isoformat()
-                })
-            }
+                }, event), etag)
+            logger.info("No dashboard snapshot available, building live")
         
-        # Default admin dashboard request
         logger.info("Starting admin dashboard data collection")
         
-        # Get all admin data
-        costs = get_aws_costs()
-        metrics = get_system_metrics()
-        
-        # Check for alerts
-        cost_alert_sent = check_cost_threshold()
+        admin_data = collect_admin_data(context)
         
-        # Get real game data from DynamoDB
-        game_data = get_game_data()
+        logger.info(f"Admin data collected successfully")
         
-        # Get real Bright Data usage
-        brightdata_usage = get_bright_data_usage()
+        # A live rebuild is the newest data there is; let the next loads reuse it.
+        # It is off the 5-minute schedule, so it reads the history but doesn't append.
+        if DASHBOARD_SNAPSHOT_BUCKET:
+            try:
+                admin_data['trends'] = get_metric_trends(int(time.time()))
+            except Exception as e:
+                logger.error(f"Failed to read metric history: {e}")
+            try:
+                publish_dashboard_snapshot(admin_data)
+            except Exception as e:
+                logger.error(f"Failed to publish dashboard snapshot: {e}")
         
-        admin_data = {
-            'costs': costs,
-            'system_metrics': metrics,
-            'brightdata_usage': brightdata_usage,
-            'game_data': game_data,
-            'alerts': {
-                'cost_alert_sent': cost_alert_sent,
-                'last_check': datetime.now(timezone.utc).isoformat()
-            },
+        return response_body(200, {
+            'success': True,
+            'data': admin_data,
+            'snapshot': {'source': 'live', 'generated_at': admin_data['timestamp'], 'age_seconds': 0},
             'timestamp': datetime.now(timezone.utc).isoformat()
-        }
-        
-        logger.info(f"Admin data collected successfully")
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-                'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
-            },
-            'body': json.dumps({
-                'success': True,
-                'data': admin_data,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            })
-        }
+        }, event)
         
     except Exception as e:
         logger.error(f"Admin Lambda execution failed: {e}")
         
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            })
-        }
\ No newline at end of file
+        return response_body(500, {
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Aggregates Stream Lambda
+Consumes the mission-mischief-posts DynamoDB stream (NEW_AND_OLD_IMAGES)
+and applies each INSERT/MODIFY/REMOVE as a delta to the aggregates table
+
+Offline tools:
+    python aggregates-stream-lambda.py replay [--posts N] [--seed S]
+        Replays synthetic stream records through lambda_handler against an
+        in-memory store and checks the result against a from-scratch rebuild.
+    python aggregates-stream-lambda.py rebuild [--dry-run]
+        Recomputes every aggregate from the posts written before it started
+        and stores that cutoff as meta rebuilt_at, which also marks the
+        model seeded.
+
+Rebuild procedure (first deploy, or recovery after a stream outage or bug):
+    1. disable the event source mapping (the stream handler's writes
+       would be overwritten by the rebuild's puts)
+    2. python aggregates-stream-lambda.py rebuild
+    3. re-enable the mapping
+The handler skips records created before the cutoff, which the scan already
+counted, and applies the backlog created after it, so nothing written while
+the mapping was paused is lost or counted twice. Readers ignore the
+aggregates until the first rebuild has marked them and cut over by
+themselves. Not covered: an existing post edited or deleted (including TTL
+expiry) while the scan runs is counted in its new state by the scan if read
+after the change, and the stream applies the change again on top; rerun
+rebuild in a quiet period if that drift matters.
+"""
+
+import argparse
+import logging
+import random
+import time
+import uuid
+
+from mission_mischief.aggregates import (
+    AGGREGATES_TABLE, AGGREGATE_PARTITIONS, MALFORMED_POST_ERRORS, META_KEY, POST_DELTA_ATTRIBUTES, REBUILT_AT,
+    DynamoAggregateStore, MemoryAggregateStore, compute_aggregates, meta_counter_key, post_deltas, prune_deltas,
+    read_meta_counters
+)
+from mission_mischief.posts import POSTS_TABLE, query_all, written_at
+from mission_mischief.projection import projection
+from mission_mischief.scanner import ParallelScan
+from mission_mischief.wire import item_from_wire
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# The DynamoDB client is created on the first applied record, not at import
+aggregate_store = DynamoAggregateStore()
+
+def from_stream_image(image):
+    """Decode the attributes post_deltas reads from a stream image ({'S': ...}/{'N': ...} map)"""
+    return item_from_wire(image, POST_DELTA_ATTRIBUTES)
+
+def record_deltas(record):
+    """
+    Aggregate deltas for one stream record: remove the old image, add the new
+    one. A malformed image is logged and skipped, as rebuilds skip the post.
+    """
+    deltas = {}
+    change = record.get('dynamodb', {})
+
+    images = []
+    if record['eventName'] in ('MODIFY', 'REMOVE') and change.get('OldImage'):
+        images.append(('OldImage', -1))
+    if record['eventName'] in ('INSERT', 'MODIFY') and change.get('NewImage'):
+        images.append(('NewImage', 1))
+    for image, sign in images:
+        try:
+            post_deltas(from_stream_image(change[image]), sign, deltas)
+        except MALFORMED_POST_ERRORS as e:
+            logger.warning(f"Skipping malformed {image} of stream record {record.get('eventID')}: {e}")
+
+    deltas = prune_deltas(deltas)
+    if record['eventName'] in ('INSERT', 'MODIFY', 'REMOVE'):
+        # Version counter behind the read endpoints' ETags; bumped for every
+        # posts change, including edits that don't move any counter. Lands
+        # on the post's meta shard, like its other global counters.
+        post_id = item_from_wire(change.get('Keys', {})).get('post_id', '')
+        deltas.setdefault(meta_counter_key(post_id), {'add': {}, 'init': {}})['add']['updates'] = 1
+    return deltas
+
+def lambda_handler(event, context):
+    """
+    Apply a batch of stream records in order. On failure, report the failed
+    record and everything after it (ReportBatchItemFailures) so the retry
+    resumes there; records already applied by an earlier attempt are
+    recognised by their applied marker and not counted again.
+    Records created before the last rebuild's cutoff are already in the
+    rebuilt aggregates and are skipped.
+    """
+    records = event.get('Records', [])
+    applied = 0
+    skipped = 0
+    duplicates = 0
+    # Read per batch, not cached, so a rebuild takes effect on the next batch
+    cutoff = aggregate_store.rebuilt_at() if records else None
+
+    for index, record in enumerate(records):
+        created = record.get('dynamodb', {}).get('ApproximateCreationDateTime')
+        if cutoff is not None and created is not None and created < cutoff:
+            skipped += 1
+            continue
+        try:
+            if aggregate_store.apply(record_deltas(record), token=record.get('eventID')):
+                applied += 1
+            else:
+                duplicates += 1
+        except Exception as e:
+            logger.error(f"Failed to apply stream record {record.get('eventID')}: {e}")
+            return {
+                'batchItemFailures': [
+                    {'itemIdentifier': r.get('dynamodb', {}).get('SequenceNumber')}
+                    for r in records[index:]
+                ]
+            }
+
+    logger.info(f"Applied {applied} stream records to {AGGREGATES_TABLE}"
+                + (f" (skipped {skipped} from before the rebuild)" if skipped else '')
+                + (f" ({duplicates} already applied)" if duplicates else ''))
+    return {'batchItemFailures': []}
+
+# ---------------------------------------------------------------------------
+# Offline tools
+# ---------------------------------------------------------------------------
+
+def to_stream_image(item):
+    """Encode a plain post as a stream image"""
+    image = {}
+    for k, v in item.items():
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            image[k] = {'N': str(v)}
+        elif v is None:
+            image[k] = {'NULL': True}
+        else:
+            image[k] = {'S': str(v)}
+    return image
+
+def synthetic_post(rng, n):
+    """A direct submission or scraped post with realistic field spread"""
+    platform = rng.choice(['instagram.com', 'facebook.com', 'x.com', 'tiktok.com'])
+    state = rng.choice(['CA', 'TX', 'NY', 'WA', 'OR'])
+    post = {
+        'post_id': f"direct_player{rng.randrange(200)}_{n}",
+        'username': f"player{rng.randrange(200)}",
+        'mission_id': rng.randrange(1, 52),
+        'points': rng.choice([5, 10, 15, 25]),
+        'proof_url': f"https://{platform}/p/{n}",
+        'timestamp': f"2025-12-{rng.randrange(1, 29):02d}T{rng.randrange(24):02d}:00:00Z",
+        'city': f"{state}-city{rng.randrange(8)}",
+        'state': state,
+        'country': 'USA',
+        'source': 'direct_submission'
+    }
+    if rng.random() < 0.2:
+        post['source'] = 'scraper'
+        post['post_id'] = f"instagram#{n}"
+    return post
+
+def stream_record(event_name, old=None, new=None):
+    post = new if new is not None else old
+    change = {'SequenceNumber': uuid.uuid4().hex, 'Keys': {'post_id': {'S': post['post_id']}}}
+    if old is not None:
+        change['OldImage'] = to_stream_image(old)
+    if new is not None:
+        change['NewImage'] = to_stream_image(new)
+    return {'eventID': uuid.uuid4().hex, 'eventName': event_name, 'dynamodb': change}
+
+def comparable(items):
+    """
+    Counter values per aggregate item. First-seen attributes (a player's home
+    city, a social_url) legitimately differ between incremental and rebuilt
+    models when the first post was later removed, so they are not compared.
+    """
+    result = {}
+    for key, item in items.items():
+        counters = {
+            k: v for k, v in item.items()
+            if isinstance(v, int) and k not in ('mission_id', 'updates')
+        }
+        if any(counters.values()):
+            result[key] = counters
+    return result
+
+def replay(posts=2000, seed=7, batch_size=100):
+    """Replay synthetic INSERT/MODIFY/REMOVE records and verify against a rebuild"""
+    global aggregate_store
+
+    rng = random.Random(seed)
+    live = {}
+    records = []
+
+    for n in range(posts):
+        post = synthetic_post(rng, n)
+        live[post['post_id']] = post
+        records.append(stream_record('INSERT', new=post))
+
+        roll = rng.random()
+        if roll < 0.1 and live:
+            # Points correction on an existing post
+            old = live[rng.choice(list(live))]
+            new = dict(old, points=old['points'] + 5)
+            live[new['post_id']] = new
+            records.append(stream_record('MODIFY', old=old, new=new))
+        elif roll < 0.2 and live:
+            # TTL expiry / cleanup
+            old = live.pop(rng.choice(list(live)))
+            records.append(stream_record('REMOVE', old=old))
+
+    original_store = aggregate_store
+    aggregate_store = MemoryAggregateStore()
+    try:
+        for start in range(0, len(records), batch_size):
+            result = lambda_handler({'Records': records[start:start + batch_size]}, None)
+            assert not result['batchItemFailures'], result
+        incremental = comparable(aggregate_store.items)
+    finally:
+        aggregate_store = original_store
+
+    rebuilt = comparable(compute_aggregates(live.values()))
+    mismatched = [key for key in set(incremental) | set(rebuilt) if incremental.get(key) != rebuilt.get(key)]
+
+    print(f"Replayed {len(records)} records ({posts} inserts) into {len(incremental)} aggregate items")
+    if mismatched:
+        print(f"MISMATCH on {len(mismatched)} items, e.g. {sorted(mismatched)[:5]}")
+        return False
+    print("Incremental aggregates match a full rebuild")
+    return True
+
+def rebuild(dry_run=False):
+    """Recompute the aggregates table from a full parallel scan of the posts table"""
+    import boto3
+    from boto3.dynamodb.conditions import Key
+
+    dynamodb = boto3.resource('dynamodb')
+    aggregates_table = dynamodb.Table(AGGREGATES_TABLE)
+
+    # Posts written from the cutoff on reach the model through the stream
+    cutoff = int(time.time())
+    posts = ParallelScan(dynamodb.Table(POSTS_TABLE), **projection(POST_DELTA_ATTRIBUTES + ('ttl',)))
+    fresh = compute_aggregates(item for item in posts if (written_at(item) or 0) < cutoff)
+
+    # Counters live in the meta shards; meta/posts carries the version base
+    # (bumped past every shard's updates so cached ETags are invalidated)
+    fresh[META_KEY] = {
+        'pk': META_KEY[0],
+        'sk': META_KEY[1],
+        'updates': read_meta_counters(aggregates_table)['version'] + 1
+    }
+    # Readers start serving the model once this is written
+    fresh[META_KEY][REBUILT_AT] = cutoff
+
+    stale = []
+    for pk in AGGREGATE_PARTITIONS:
+        for item in query_all(aggregates_table, KeyConditionExpression=Key('pk').eq(pk),
+                              ProjectionExpression='pk, sk'):
+            if (item['pk'], item['sk']) not in fresh:
+                stale.append(item)
+
+    print(f"Scanned {posts.item_count} posts: {len(fresh)} aggregate items, {len(stale)} stale items")
+    if dry_run:
+        return
+
+    with aggregates_table.batch_writer() as batch:
+        for key, item in fresh.items():
+            if key != META_KEY:
+                batch.put_item(Item=item)
+        for item in stale:
+            batch.delete_item(Key={'pk': item['pk'], 'sk': item['sk']})
+    # Meta last: its rebuilt_at marker cuts readers over to a complete model
+    aggregates_table.put_item(Item=fresh[META_KEY])
+    print(f"Rebuilt {AGGREGATES_TABLE}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregates read model tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = commands.add_parser('replay', help='replay synthetic stream records locally')
+    replay_parser.add_argument('--posts', type=int, default=2000)
+    replay_parser.add_argument('--seed', type=int, default=7)
+
+    rebuild_parser = commands.add_parser('rebuild', help='recompute aggregates from the posts table')
+    rebuild_parser.add_argument('--dry-run', action='store_true')
+
+    args = parser.parse_args()
+    if args.command == 'replay':
+        raise SystemExit(0 if replay(args.posts, args.seed) else 1)
+    rebuild(dry_run=args.dry_run)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Day Bucket Backfill
+Adds the day_bucket attribute to existing mission-mischief-posts items so
+they show up in the day_bucket-timestamp-index GSI.
+
+Usage:
+    python backfill-day-bucket.py --create-index   # add the GSI (one-time)
+    python backfill-day-bucket.py --dry-run        # report what would change
+    python backfill-day-bucket.py                  # write missing buckets
+"""
+
+from mission_mischief.backfill import item_time, run_cli
+from mission_mischief.posts import DAY_BUCKET_INDEX
+from mission_mischief.timekeys import day_bucket
+
+
+def bucket_for_item(item):
+    """Day bucket from the item's timestamp, falling back to its write time"""
+    parsed = item_time(item)
+    if parsed is None:
+        return None
+    return {'day_bucket': day_bucket(parsed)}
+
+
+def main():
+    run_cli(
+        'Backfill day_bucket on mission-mischief-posts', DAY_BUCKET_INDEX,
+        ('day_bucket', 'S'), ('timestamp', 'S'), 'day_bucket', bucket_for_item
+    )
+
+
+if __name__ == '__main__':
+    main()
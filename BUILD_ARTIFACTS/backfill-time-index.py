@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Time Index Backfill
+Adds the numeric ts_ms sort key and time_shard to existing
+mission-mischief-posts items so they show up in the time_shard-ts_ms-index
+GSI. ts_ms is epoch milliseconds parsed from whatever timestamp format the
+writer used (tz-aware, naive, 'Z', epoch numbers), so the index orders posts
+correctly where the timestamp strings do not.
+
+Cutover:
+    python backfill-time-index.py --create-index   # add the GSI (one-time)
+    python backfill-time-index.py --dry-run        # report what would change
+    python backfill-time-index.py                  # write missing keys
+    then set RESEARCH_TIME_INDEX=true on the research API
+"""
+
+from mission_mischief.backfill import item_time, run_cli
+from mission_mischief.posts import TIME_INDEX, time_keys
+
+
+def keys_for_item(item):
+    """Time index keys from the item's timestamp, falling back to its write time"""
+    parsed = item_time(item)
+    if parsed is None:
+        return None
+    return time_keys(item['post_id'], parsed)
+
+
+def main():
+    run_cli(
+        'Backfill ts_ms/time_shard on mission-mischief-posts', TIME_INDEX,
+        ('time_shard', 'N'), ('ts_ms', 'N'), 'ts_ms', keys_for_item
+    )
+
+
+if __name__ == '__main__':
+    main()
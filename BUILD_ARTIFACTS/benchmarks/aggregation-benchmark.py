@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Aggregation Benchmark
+Compares the original bounty hunter rollup loop (linear city-player search
+plus a full sort for the top 10) with mission_mischief.aggregation on
+synthetic direct submissions.
+
+Usage:
+    python benchmarks/aggregation-benchmark.py [--sizes 10000,100000,1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mission_mischief.aggregation import SubmissionRollup
+
+
+def legacy_rollup(submissions):
+    """The rollup loop admin-lambda used before SubmissionRollup"""
+    player_stats = {}
+    geo_data = {}
+    mission_activity = {}
+
+    for sub in submissions:
+        username = sub.get('username', 'Unknown')
+        mission_id = int(sub.get('mission_id', 0))
+        points = int(sub.get('points', 0))
+        proof_url = sub.get('proof_url', '')
+
+        # Build player stats with location data from submission
+        player_key = f"{username}"
+        if player_key not in player_stats:
+            player_stats[player_key] = {
+                'handle': username,
+                'points': 0,
+                'city': sub.get('city', 'Unknown'),
+                'state': sub.get('state', 'Unknown'),
+                'country': sub.get('country', 'USA')
+            }
+        player_stats[player_key]['points'] += points
+
+        # Build geography data from submission
+        state = sub.get('state', player_stats[player_key]['state'])
+        city = sub.get('city', player_stats[player_key]['city'])
+
+        if state not in geo_data:
+            geo_data[state] = {}
+        if city not in geo_data[state]:
+            geo_data[state][city] = {
+                'count': 0,
+                'players': []
+            }
+        geo_data[state][city]['count'] += 1
+
+        # Add player if not already there
+        existing_player = next((p for p in geo_data[state][city]['players'] if p['handle'] == username), None)
+        if not existing_player:
+            geo_data[state][city]['players'].append({
+                'handle': username,
+                'social_url': proof_url
+            })
+
+        # Build mission activity
+        if mission_id not in mission_activity:
+            mission_activity[mission_id] = {
+                'instagram': 0,
+                'facebook': 0,
+                'x': 0
+            }
+
+        # Detect platform from proof URL
+        url_lower = proof_url.lower()
+        if 'instagram.com' in url_lower:
+            mission_activity[mission_id]['instagram'] += 1
+        elif 'facebook.com' in url_lower:
+            mission_activity[mission_id]['facebook'] += 1
+        elif 'x.com' in url_lower or 'twitter.com' in url_lower:
+            mission_activity[mission_id]['x'] += 1
+
+    return {
+        'topPlayers': sorted(
+            list(player_stats.values()),
+            key=lambda x: x['points'],
+            reverse=True
+        )[:10],
+        'geography': geo_data,
+        'missionActivity': mission_activity
+    }
+
+
+def synthetic_submissions(count, players, seed=42):
+    """Direct submissions from a pool of players spread over 50 cities"""
+    rng = random.Random(seed)
+    states = ['CA', 'TX', 'NY', 'WA', 'OR', 'FL', 'IL', 'CO', 'AZ', 'NV']
+    domains = ['instagram.com', 'facebook.com', 'x.com', 'tiktok.com']
+    homes = {}
+    for n in range(count):
+        handle = f"player{rng.randrange(players)}"
+        if handle not in homes:
+            state = rng.choice(states)
+            homes[handle] = (state, f"{state}-city{rng.randrange(5)}")
+        state, city = homes[handle]
+        yield {
+            'username': handle,
+            'mission_id': rng.randrange(1, 52),
+            'points': rng.choice([5, 10, 15, 25]),
+            'proof_url': f"https://{rng.choice(domains)}/p/{n}",
+            'city': city,
+            'state': state,
+            'country': 'USA'
+        }
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--players', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'posts':>10} {'legacy s':>10} {'rollup s':>10} {'merge s':>10} {'speedup':>8}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        submissions = list(synthetic_submissions(size, args.players))
+
+        legacy, legacy_s = timed(legacy_rollup, submissions)
+        rollup, rollup_s = timed(lambda items: SubmissionRollup().consume(items), submissions)
+
+        # Same rollup built as four scan segments and merged
+        def segmented(items):
+            parts = [SubmissionRollup().consume(items[i::4]) for i in range(4)]
+            merged = parts[0]
+            for part in parts[1:]:
+                merged.merge(part)
+            return merged
+        merged, merge_s = timed(segmented, submissions)
+
+        payload = rollup.to_bounty_data()
+        assert [p['points'] for p in payload['topPlayers']] == [p['points'] for p in legacy['topPlayers']]
+        assert payload['missionActivity'] == legacy['missionActivity']
+        assert {(s, c): d['count'] for s, cities in payload['geography'].items() for c, d in cities.items()} == \
+            {(s, c): d['count'] for s, cities in legacy['geography'].items() for c, d in cities.items()}
+        assert merged.to_bounty_data()['missionActivity'] == legacy['missionActivity']
+
+        print(f"{size:>10} {legacy_s:>10.3f} {rollup_s:>10.3f} {merge_s:>10.3f} {legacy_s / rollup_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Response Compression Benchmark
+Bytes saved and CPU cost of gzip/deflate on the two large JSON bodies:
+research-data-api's post list and the admin /submissions geography tree.
+
+Usage:
+    python benchmarks/compression-benchmark.py [--sizes 100,1000,10000,50000] [--levels 1,6,9]
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mission_mischief.aggregation import SubmissionRollup
+from mission_mischief.responses import compress_bytes
+
+STATES = ['CA', 'TX', 'NY', 'WA', 'OR', 'FL', 'IL', 'CO']
+PLATFORMS = ['instagram.com', 'facebook.com', 'x.com']
+
+
+def research_body(rng, posts):
+    """research-data-api body: one row per post"""
+    data = [{
+        'timestamp': f"2026-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}T{rng.randrange(24):02d}:"
+                     f"{rng.randrange(60):02d}:{rng.randrange(60):02d}Z",
+        'user': f"player{rng.randrange(5000)}",
+        'mission_id': rng.randrange(1, 52),
+        'platform': rng.choice(PLATFORMS).split('.')[0],
+        'points': rng.choice([5, 10, 15, 25]),
+        'city': f"city{rng.randrange(40)}",
+        'state': rng.choice(STATES),
+        'country': 'USA',
+        'post_url': f"https://{rng.choice(PLATFORMS)}/p/{rng.getrandbits(40):x}"
+    } for _ in range(posts)]
+    return json.dumps({'success': True, 'data': data, 'count': len(data)})
+
+
+def submissions_body(rng, posts):
+    """admin /submissions body: bounty hunter rollup over direct submissions"""
+    rollup = SubmissionRollup()
+    for _ in range(posts):
+        state = rng.choice(STATES)
+        rollup.add({
+            'username': f"player{rng.randrange(5000)}",
+            'mission_id': rng.randrange(1, 52),
+            'points': rng.choice([5, 10, 15, 25]),
+            'proof_url': f"https://{rng.choice(PLATFORMS)}/p/{rng.getrandbits(40):x}",
+            'city': f"{state}-city{rng.randrange(40)}",
+            'state': state
+        })
+    return json.dumps({'success': True, 'data': rollup.to_bounty_data(), 'source': 'aws_dynamodb'})
+
+
+def timed_compress(raw, encoding, level, repeat=5):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressed = compress_bytes(raw, encoding, level)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return compressed, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000,50000')
+    parser.add_argument('--levels', default='1,6,9')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(',')]
+    print(f"{'body':<12} {'posts':>7} {'raw KB':>9} {'coding':>8} {'lvl':>4} {'out KB':>8} "
+          f"{'b64 KB':>8} {'ratio':>6} {'ms':>8} {'MB/s':>7}")
+    for name, builder in (('research', research_body), ('submissions', submissions_body)):
+        for posts in [int(size) for size in args.sizes.split(',')]:
+            raw = builder(random.Random(args.seed), posts).encode('utf-8')
+            for encoding in ('gzip', 'deflate'):
+                for level in levels:
+                    compressed, elapsed = timed_compress(raw, encoding, level)
+                    wire = len(base64.b64encode(compressed))
+                    print(
+                        f"{name:<12} {posts:>7} {len(raw) / 1024:>9.1f} {encoding:>8} {level:>4} "
+                        f"{len(compressed) / 1024:>8.1f} {wire / 1024:>8.1f} {len(raw) / len(compressed):>5.1f}x "
+                        f"{elapsed * 1000:>8.2f} {len(raw) / elapsed / 1e6:>7.1f}"
+                    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Import Benchmark
+Measures the cold start import cost of each Lambda handler. Every run imports
+the handler in a fresh interpreter with boto3/botocore replaced by a stub
+that counts client/resource construction (optionally charging a simulated
+cost per client), so no AWS credentials or network are needed and eager
+clients or heavy imports show up as regressions.
+
+Usage:
+    python benchmarks/import-benchmark.py [--runs 5] [--client-cost-ms 0]
+                                          [--handlers admin-lambda,cloud-save-lambda]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+HANDLERS = (
+    'admin-lambda',
+    'cloud-save-lambda',
+    'license-validation-lambda',
+    'research-data-api',
+    'aggregates-stream-lambda'
+)
+
+# Runs inside the child interpreter: install the stub, import the handler, report
+CHILD = r'''
+import importlib.abc, importlib.machinery, importlib.util, json, sys, time, types
+
+root, handler, client_cost = sys.argv[1], sys.argv[2], float(sys.argv[3]) / 1000
+sys.path.insert(0, root)
+created = []
+
+class Stub(types.ModuleType):
+    """Any attribute is another stub; calling one records client/resource creation"""
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        stub = Stub(f"{self.__name__}.{name}")
+        setattr(self, name, stub)
+        return stub
+    def __call__(self, *args, **kwargs):
+        if self.__name__ in ('boto3.client', 'boto3.resource'):
+            created.append(f"{self.__name__.split('.')[1]}:{args[0] if args else ''}")
+            time.sleep(client_cost)
+        return Stub(f"{self.__name__}()")
+    def __mro_entries__(self, bases):
+        return (object,)
+
+class StubFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def find_spec(self, name, path, target=None):
+        if name.split('.')[0] in ('boto3', 'botocore'):
+            return importlib.machinery.ModuleSpec(name, self, is_package=True)
+        return None
+    def create_module(self, spec):
+        return Stub(spec.name)
+    def exec_module(self, module):
+        module.__path__ = []
+
+sys.meta_path.insert(0, StubFinder())
+before = set(sys.modules)
+
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location(handler.replace('-', '_'), f"{root}/{handler}.py")
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - started
+
+loaded = set(sys.modules) - before
+print(json.dumps({
+    'import_ms': elapsed * 1000,
+    'clients': created,
+    'modules': len(loaded),
+    'boto3': 'boto3' in loaded,
+    'requests': 'requests' in loaded
+}))
+'''
+
+
+def measure(handler, client_cost_ms):
+    """Import one handler in a fresh interpreter and return its report"""
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD, ROOT, handler, str(client_cost_ms)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--client-cost-ms', type=float, default=0,
+                        help='simulated construction cost per boto3 client/resource')
+    parser.add_argument('--handlers', default=','.join(HANDLERS))
+    args = parser.parse_args()
+
+    print(f"{'handler':<28} {'median ms':>10} {'min ms':>8} {'clients':>8} {'modules':>8} {'boto3':>6} {'requests':>9}")
+    for handler in args.handlers.split(','):
+        reports = [measure(handler, args.client_cost_ms) for _ in range(args.runs)]
+        timings = [r['import_ms'] for r in reports]
+        last = reports[-1]
+        print(
+            f"{handler:<28} {statistics.median(timings):>10.1f} {min(timings):>8.1f} "
+            f"{len(last['clients']):>8} {last['modules']:>8} "
+            f"{'yes' if last['boto3'] else 'no':>6} {'yes' if last['requests'] else 'no':>9}"
+        )
+        if last['clients']:
+            print(f"{'':<28} eager: {', '.join(last['clients'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Projection Benchmark
+Whole items vs projected reads for each posts reader (research API, admin
+game data, submissions scan, aggregates rebuild) against a local stand-in
+for DynamoDB: wire-format JSON pages of up to 1 MB, ConsumedCapacity as the
+service computes it, and client-side parse + deserialize time per item.
+
+Capacity is charged on the size of the items read, before projection, so
+the stand-in reports it unchanged; what shrinks is the response on the
+wire, the JSON the SDK parses and the objects the Lambda holds.
+
+Usage:
+    python benchmarks/projection-benchmark.py [--posts 20000] [--text-bytes 1200]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mission_mischief.aggregates import POST_DELTA_ATTRIBUTES
+from mission_mischief.aggregation import SUBMISSION_ATTRIBUTES
+from mission_mischief.projection import projection
+
+try:
+    from boto3.dynamodb.types import TypeDeserializer
+except ImportError:
+    TypeDeserializer = None
+
+PAGE_BYTES = 1024 * 1024
+READ_UNIT_BYTES = 4096
+
+READERS = {
+    'research-data-api': (
+        'timestamp', 'user_handle', 'mission_id', 'platform', 'points', 'city', 'state', 'country', 'post_url'
+    ),
+    'get_game_data': ('username', 'city'),
+    'scan_all_submissions': SUBMISSION_ATTRIBUTES,
+    'aggregates rebuild': POST_DELTA_ATTRIBUTES
+}
+
+WORDS = ('mission', 'mischief', 'justice', 'beer', 'bounty', 'city', 'proof', 'tonight', 'legend', 'crew')
+STATES = ('CA', 'TX', 'NY', 'WA', 'OR', 'FL', 'IL', 'CO')
+PLATFORMS = ('instagram', 'facebook', 'x')
+
+
+class LocalDeserializer:
+    """Used only when boto3 is not installed; same types as TypeDeserializer"""
+
+    def deserialize(self, value):
+        (kind, raw), = value.items()
+        if kind == 'S':
+            return raw
+        if kind == 'N':
+            return Decimal(raw)
+        if kind == 'M':
+            return {k: self.deserialize(v) for k, v in raw.items()}
+        if kind == 'L':
+            return [self.deserialize(v) for v in raw]
+        if kind == 'BOOL':
+            return raw
+        return None
+
+
+def make_post(rng, i, text_bytes):
+    """One posts item in DynamoDB wire format, shaped like the scraper's writes"""
+    state = rng.choice(STATES)
+    platform = rng.choice(PLATFORMS)
+    day = f"2026-{rng.randrange(8, 11):02d}-{rng.randrange(1, 29):02d}"
+    text = ' '.join(rng.choice(WORDS) for _ in range(text_bytes // 7))[:text_bytes]
+    handle = f"player{rng.randrange(5000)}"
+    return {
+        'post_id': {'S': f"{platform}_{rng.getrandbits(48):x}_{i}"},
+        'timestamp': {'S': f"{day}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}Z"},
+        'day_bucket': {'S': day},
+        'user_handle': {'S': handle},
+        'username': {'S': handle},
+        'mission_id': {'N': str(rng.randrange(1, 52))},
+        'platform': {'S': platform},
+        'points': {'N': str(rng.choice([5, 10, 15, 25]))},
+        'city': {'S': f"{state}-city{rng.randrange(40)}"},
+        'state': {'S': state},
+        'country': {'S': 'USA'},
+        'post_url': {'S': f"https://{platform}.com/p/{rng.getrandbits(40):x}"},
+        'proof_url': {'S': f"https://{platform}.com/p/{rng.getrandbits(40):x}"},
+        'source': {'S': rng.choice(['scraper', 'scraper', 'direct_submission'])},
+        'text': {'S': text},
+        'hashtags': {'L': [{'S': f"#{rng.choice(WORDS)}"} for _ in range(rng.randrange(2, 8))]},
+        'likes': {'N': str(rng.randrange(5000))},
+        'ttl': {'N': str(1790000000 + rng.randrange(10 ** 6))}
+    }
+
+
+def value_size(value):
+    """Approximate DynamoDB attribute value size in bytes"""
+    (kind, raw), = value.items()
+    if kind == 'S':
+        return len(raw.encode('utf-8'))
+    if kind == 'N':
+        return math.ceil(len(raw.lstrip('-').replace('.', '')) / 2) + 1
+    if kind == 'M':
+        return 3 + sum(len(k.encode('utf-8')) + value_size(v) + 1 for k, v in raw.items())
+    if kind == 'L':
+        return 3 + sum(value_size(v) + 1 for v in raw)
+    return 1
+
+
+def item_size(item):
+    return sum(len(name.encode('utf-8')) + value_size(value) for name, value in item.items())
+
+
+class LocalTable:
+    """
+    Scan stand-in: reads up to 1 MB of items per page, applies
+    ProjectionExpression, returns the wire JSON and the capacity consumed
+    (eventually consistent: half a unit per 4 KB read, per page).
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.sizes = [item_size(item) for item in items]
+
+    def scan_pages(self, **kwargs):
+        names = kwargs.get('ExpressionAttributeNames') or {}
+        wanted = None
+        if 'ProjectionExpression' in kwargs:
+            wanted = [names.get(part.strip(), part.strip()) for part in kwargs['ProjectionExpression'].split(',')]
+
+        start = 0
+        while start < len(self.items):
+            read_bytes = 0
+            end = start
+            while end < len(self.items) and read_bytes < PAGE_BYTES:
+                read_bytes += self.sizes[end]
+                end += 1
+            page = self.items[start:end]
+            if wanted is not None:
+                page = [{name: item[name] for name in wanted if name in item} for item in page]
+            capacity = math.ceil(read_bytes / READ_UNIT_BYTES) * 0.5
+            yield json.dumps({'Items': page, 'Count': len(page), 'ConsumedCapacity': {'CapacityUnits': capacity}})
+            start = end
+
+
+def run(table, deserializer, scan_kwargs):
+    wire_bytes = 0
+    capacity = 0.0
+    items = 0
+    started = time.perf_counter()
+    for body in table.scan_pages(**scan_kwargs):
+        wire_bytes += len(body)
+        response = json.loads(body)
+        capacity += response['ConsumedCapacity']['CapacityUnits']
+        for item in response['Items']:
+            {name: deserializer.deserialize(value) for name, value in item.items()}
+            items += 1
+    elapsed = time.perf_counter() - started
+    return wire_bytes, capacity, elapsed / items * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--posts', type=int, default=20000)
+    parser.add_argument('--text-bytes', type=int, default=1200, help='size of the raw post text body')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    table = LocalTable([make_post(rng, i, args.text_bytes) for i in range(args.posts)])
+    deserializer = TypeDeserializer() if TypeDeserializer else LocalDeserializer()
+    print(f"{args.posts} posts, avg item {sum(table.sizes) / len(table.sizes):.0f} bytes, "
+          f"deserializer: {'boto3' if TypeDeserializer else 'local'}")
+
+    full_bytes, full_capacity, full_us = run(table, deserializer, {})
+    print(f"{'reader':<22} {'attrs':>5} {'wire MB':>8} {'vs full':>8} {'RCU':>8} {'us/item':>8} {'vs full':>8}")
+    print(f"{'(whole items)':<22} {'all':>5} {full_bytes / 1e6:>8.2f} {'':>8} {full_capacity:>8.1f} {full_us:>8.2f}")
+    for reader, attributes in READERS.items():
+        wire, capacity, per_item = run(table, deserializer, projection(attributes))
+        print(
+            f"{reader:<22} {len(attributes):>5} {wire / 1e6:>8.2f} {wire / full_bytes:>7.0%} "
+            f"{capacity:>8.1f} {per_item:>8.2f} {per_item / full_us:>7.0%}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Save Format Benchmark
+Cloud save item size and handler CPU per save format, for realistic game
+states (a few missions up to every mission with submissions, badges and
+beer debts):
+
+    map    sanitize_for_dynamo -> nested M attribute; load via item_from_wire
+    blob   encode_blob -> one B attribute; load via decode_save
+
+Item bytes follow DynamoDB's item size rules (names + values, 1 byte per
+nested element, 3 per map/list); WCU is per started KB written, RCU per
+started 4 KB for a strongly consistent read. Save timings include building
+the wire attribute (a local TypeSerializer equivalent), load timings the
+wire decode, so both match what the handler pays besides the network.
+
+Usage:
+    python benchmarks/save-format-benchmark.py [--repeat 2000]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mission_mischief.saves import SAVE_BLOB_FORMAT, decode_save, encode_blob
+from mission_mischief.wire import item_from_wire
+
+PLATFORMS = ('instagram', 'facebook', 'x')
+
+
+def sanitize_for_dynamo(obj):
+    """cloud-save-lambda's float -> Decimal pass"""
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    if isinstance(obj, dict):
+        return {k: sanitize_for_dynamo(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [sanitize_for_dynamo(i) for i in obj]
+    return obj
+
+
+def serialize(value):
+    """What boto3's TypeSerializer sends for the value types saves contain"""
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, (int, Decimal)):
+        return {'N': str(value)}
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, bytes):
+        return {'B': value}
+    if isinstance(value, dict):
+        return {'M': {k: serialize(v) for k, v in value.items()}}
+    return {'L': [serialize(v) for v in value]}
+
+
+def value_size(value):
+    (kind, raw), = value.items()
+    if kind == 'S':
+        return len(raw.encode('utf-8'))
+    if kind == 'B':
+        return len(raw)
+    if kind == 'N':
+        digits = len(raw.lstrip('-').replace('.', '').strip('0')) or 1
+        return math.ceil(digits / 2) + 1
+    if kind in ('BOOL', 'NULL'):
+        return 1
+    if kind == 'M':
+        return 3 + sum(len(k.encode('utf-8')) + value_size(v) + 1 for k, v in raw.items())
+    return 3 + sum(value_size(v) + 1 for v in raw)
+
+
+def item_size(item):
+    return sum(len(name.encode('utf-8')) + value_size(value) for name, value in item.items())
+
+
+def game_state(rng, missions):
+    """A save shaped like storage.js's defaultUser after `missions` submissions"""
+    ids = rng.sample(range(1, 52), missions)
+    submissions, points = {}, {}
+    for mission_id in ids:
+        score = rng.choice([5, 10, 15, 25])
+        submissions[str(mission_id)] = {
+            'timestamp': f"2026-{rng.randrange(6, 11):02d}-{rng.randrange(1, 29):02d}T{rng.randrange(24):02d}:15:00.000Z",
+            'points': score,
+            'proofUrl': f"https://{rng.choice(PLATFORMS)}.com/p/{rng.getrandbits(48):x}",
+            'status': 'submitted',
+            'source': 'direct'
+        }
+        points[str(mission_id)] = score
+    return {
+        'userName': 'Player One',
+        'userHandle': '@playerone',
+        'completedMissions': ids,
+        'badges': [f"badge_{i}" for i in range(missions // 3)],
+        'badgeStates': {f"badge_{i}": {'earned': True, 'seen': i % 2 == 0} for i in range(missions // 3)},
+        'completedBuyIns': [f"buyin_{i}" for i in range(missions // 10)],
+        'fafoCompleted': True,
+        'fafoCompletedDate': '2026-06-01T12:00:00.000Z',
+        'honorScore': 87.5,
+        'exposedBy': [f"@rival{i}" for i in range(missions // 8)],
+        'currentBuyIn': None,
+        'joinDate': '2026-06-01T11:58:00.000Z',
+        'submissions': submissions,
+        'totalPoints': sum(points.values()),
+        'missionPoints': points,
+        'beerDebts': [{
+            'creditor': f"@rival{i}", 'amount': rng.choice([1, 2, 3]), 'reason': 'Lost the trial vote',
+            'created': '2026-07-04T20:00:00.000Z', 'status': 'pending'
+        } for i in range(missions // 6)],
+        'licenseKey': 'MM-ABCD-EFGH-IJKL',
+        'keyValidated': True,
+        'keyValidatedDate': '2026-06-01T12:05:00.000Z',
+        'cloudSaveEnabled': True
+    }
+
+
+def map_save(state):
+    return {
+        'license_key': {'S': state['licenseKey']},
+        'user_data': serialize(sanitize_for_dynamo(state)),
+        'saved_at': {'S': '2026-10-18T12:00:00+00:00'},
+        'version': {'N': '1790000000'}
+    }
+
+
+def blob_save(state):
+    return {
+        'license_key': {'S': state['licenseKey']},
+        'user_blob': {'B': encode_blob(state)},
+        'save_format': {'S': SAVE_BLOB_FORMAT},
+        'saved_at': {'S': '2026-10-18T12:00:00+00:00'},
+        'version': {'N': '1790000000'}
+    }
+
+
+def per_call(fn, repeat):
+    best = None
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = (time.perf_counter() - started) / repeat
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'save':<10} {'format':<6} {'item B':>8} {'WCU':>4} {'RCU':>4} {'save us':>8} {'load us':>8}")
+    for label, missions in (('new', 3), ('active', 20), ('veteran', 51)):
+        state = game_state(rng, missions)
+        for name, build in (('map', map_save), ('blob', blob_save)):
+            item = build(state)
+            assert decode_save(item_from_wire(item)) == state, f"{name} round trip differs"
+            size = item_size(item)
+            save_us = per_call(lambda: build(state), args.repeat) * 1e6
+            load_us = per_call(lambda: decode_save(item_from_wire(item)), args.repeat) * 1e6
+            print(f"{label:<10} {name:<6} {size:>8} {math.ceil(size / 1024):>4} {math.ceil(size / 4096):>4} "
+                  f"{save_us:>8.1f} {load_us:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
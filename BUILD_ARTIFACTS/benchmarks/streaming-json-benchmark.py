@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Streaming JSON Benchmark
+Peak Python heap (tracemalloc) of the research "everything" dump as the post
+count grows, from day index pages (newest first) to a response body:
+
+    collect    list every item -> sort -> reshape -> json.dumps -> compress_response
+    stream     pages -> format_post -> iter_json, output discarded (pipeline alone)
+    stream+gz  pages -> format_post -> iter_json -> stream_response (gzip body)
+
+The stream pipeline holds one Query page at a time, so its peak stays flat;
+stream+gz grows only by the compressed body it has to return. Pages are
+generated lazily in index order, standing in for WireTable Query pages.
+
+Usage:
+    python benchmarks/streaming-json-benchmark.py [--rows 10000 40000 160000]
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# The gzip paths measure compressed bodies; handlers only compress with the flag set
+os.environ.setdefault('RESPONSE_COMPRESSION', 'true')
+
+from mission_mischief.jsonstream import iter_json
+from mission_mischief.responses import compress_response, stream_response
+
+PAGE_SIZE = 1000  # posts per Query page (1 MB pages hold roughly this many projected posts)
+STATES = ('CA', 'TX', 'NY', 'WA', 'OR', 'FL', 'IL', 'CO')
+PLATFORMS = ('instagram', 'facebook', 'x')
+EVENT = {'headers': {'Accept-Encoding': 'gzip'}}
+HEADERS = {'Content-Type': 'application/json'}
+NO_LIMIT = 1 << 62
+
+
+def format_post(item):
+    """research-data-api's row shape"""
+    return {
+        'timestamp': item.get('timestamp', ''),
+        'user': item.get('user_handle', 'Unknown'),
+        'mission_id': item.get('mission_id', 0),
+        'platform': item.get('platform', 'unknown'),
+        'points': item.get('points', 0),
+        'city': item.get('city', 'Unknown'),
+        'state': item.get('state', 'Unknown'),
+        'country': item.get('country', 'Unknown'),
+        'post_url': item.get('post_url', '#')
+    }
+
+
+def index_pages(rows, seed, per_day=2000):
+    """Decoded Query pages, newest day first and newest post first within a day"""
+    rng = random.Random(seed)
+    first_day = date(2026, 10, 18)
+    emitted = 0
+    day = 0
+    while emitted < rows:
+        bucket = (first_day - timedelta(days=day)).isoformat()
+        in_day = min(per_day, rows - emitted)
+        page = []
+        for n in range(in_day):
+            seconds = 86399 - n * 86399 // in_day
+            state = rng.choice(STATES)
+            platform = rng.choice(PLATFORMS)
+            page.append({
+                'timestamp': f"{bucket}T{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}Z",
+                'user_handle': f"player{rng.randrange(5000)}",
+                'mission_id': rng.randrange(1, 52),
+                'platform': platform,
+                'points': rng.choice([5, 10, 15, 25]),
+                'city': f"{state}-city{rng.randrange(40)}",
+                'state': state,
+                'country': 'USA',
+                'post_url': f"https://{platform}.com/p/{rng.getrandbits(40):x}"
+            })
+            if len(page) == PAGE_SIZE:
+                yield page
+                page = []
+        if page:
+            yield page
+        emitted += in_day
+        day += 1
+
+
+def collect_path(rows, seed):
+    items = [item for page in index_pages(rows, seed) for item in page]
+    items.sort(key=lambda item: item['timestamp'], reverse=True)
+    data = [format_post(item) for item in items]
+    body = json.dumps({'success': True, 'data': data, 'count': len(data), 'next_cursor': None})
+    return compress_response(EVENT, {'statusCode': 200, 'headers': HEADERS, 'body': body})
+
+
+def stream_rows(rows, seed):
+    for page in index_pages(rows, seed):
+        for item in page:
+            yield format_post(item)
+
+
+def trailer(count):
+    return {'count': count, 'next_cursor': None}
+
+
+def stream_discard_path(rows, seed):
+    size = 0
+    for chunk in iter_json({'success': True}, stream_rows(rows, seed), trailer=trailer):
+        size += len(chunk)
+    return size
+
+
+def stream_gzip_path(rows, seed):
+    chunks = iter_json({'success': True}, stream_rows(rows, seed), trailer=trailer)
+    return stream_response(EVENT, 200, HEADERS, chunks, limit=NO_LIMIT)
+
+
+def decoded(response):
+    return json.loads(gzip.decompress(base64.b64decode(response['body'])))
+
+
+def measure(fn, rows, seed):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(rows, seed)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 40000, 160000])
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    paths = (('collect', collect_path), ('stream', stream_discard_path), ('stream+gz', stream_gzip_path))
+    print(f"{'rows':>8} " + ' '.join(f"{name + ' MB':>13} {'s':>6}" for name, _ in paths))
+    for rows in args.rows:
+        results = [measure(fn, rows, args.seed) for _, fn in paths]
+        collected, streamed = results[0][2], results[2][2]
+        assert decoded(collected) == decoded(streamed), 'stream+gz body differs from collect'
+        print(f"{rows:>8} " + ' '.join(f"{peak / 1e6:>13.1f} {elapsed:>6.2f}" for peak, elapsed, _ in results))
+
+
+if __name__ == '__main__':
+    main()
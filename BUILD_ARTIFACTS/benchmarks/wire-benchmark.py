@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Wire Codec Benchmark
+Client-level scan pages to a JSON response body, old path vs wire codec:
+
+    resource   TypeDeserializer (Decimal) -> reshape -> json.dumps(default=decimal_default)
+    wire       item_from_wire (int/float) -> reshape -> json.dumps
+    wire+proj  item_from_wire(item, attributes) -> reshape -> json.dumps
+
+plus the cloud save load path (nested user_data map) with restore_from_dynamo.
+Uses boto3's TypeDeserializer when installed, otherwise a local copy of it.
+
+Usage:
+    python benchmarks/wire-benchmark.py [--items 100000] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from decimal import Clamped, Context, Decimal, Inexact, Overflow, Rounded, Underflow
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mission_mischief.wire import item_from_wire
+
+try:
+    from boto3.dynamodb.types import TypeDeserializer
+except ImportError:
+    TypeDeserializer = None
+
+RESEARCH_ATTRIBUTES = (
+    'timestamp', 'user_handle', 'mission_id', 'platform', 'points', 'city', 'state', 'country', 'post_url'
+)
+STATES = ('CA', 'TX', 'NY', 'WA', 'OR', 'FL', 'IL', 'CO')
+PLATFORMS = ('instagram', 'facebook', 'x')
+
+DYNAMODB_CONTEXT = Context(
+    Emin=-128, Emax=126, prec=38, traps=[Clamped, Overflow, Inexact, Rounded, Underflow]
+)
+
+
+class LocalTypeDeserializer:
+    """Same dispatch and Decimal context as boto3.dynamodb.types.TypeDeserializer"""
+
+    def deserialize(self, value):
+        (kind, raw), = value.items()
+        return getattr(self, f"_deserialize_{kind.lower()}")(raw)
+
+    def _deserialize_s(self, value):
+        return value
+
+    def _deserialize_n(self, value):
+        return DYNAMODB_CONTEXT.create_decimal(value)
+
+    def _deserialize_bool(self, value):
+        return value
+
+    def _deserialize_null(self, value):
+        return None
+
+    def _deserialize_ss(self, value):
+        return set(value)
+
+    def _deserialize_ns(self, value):
+        return set(map(self._deserialize_n, value))
+
+    def _deserialize_l(self, value):
+        return [self.deserialize(v) for v in value]
+
+    def _deserialize_m(self, value):
+        return {k: self.deserialize(v) for k, v in value.items()}
+
+
+def decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def restore_from_dynamo(obj):
+    """cloud-save-lambda's second pass before the wire codec"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == int(obj) else float(obj)
+    if isinstance(obj, dict):
+        return {k: restore_from_dynamo(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [restore_from_dynamo(i) for i in obj]
+    return obj
+
+
+def format_post(item):
+    return {
+        'timestamp': item.get('timestamp', ''),
+        'user': item.get('user_handle', 'Unknown'),
+        'mission_id': item.get('mission_id', 0),
+        'platform': item.get('platform', 'unknown'),
+        'points': item.get('points', 0),
+        'city': item.get('city', 'Unknown'),
+        'state': item.get('state', 'Unknown'),
+        'country': item.get('country', 'Unknown'),
+        'post_url': item.get('post_url', '#')
+    }
+
+
+def wire_post(rng, i):
+    state = rng.choice(STATES)
+    platform = rng.choice(PLATFORMS)
+    day = f"2026-{rng.randrange(8, 11):02d}-{rng.randrange(1, 29):02d}"
+    return {
+        'post_id': {'S': f"{platform}_{i}"},
+        'timestamp': {'S': f"{day}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00Z"},
+        'day_bucket': {'S': day},
+        'user_handle': {'S': f"player{rng.randrange(5000)}"},
+        'mission_id': {'N': str(rng.randrange(1, 52))},
+        'platform': {'S': platform},
+        'points': {'N': str(rng.choice([5, 10, 15, 25]))},
+        'city': {'S': f"{state}-city{rng.randrange(40)}"},
+        'state': {'S': state},
+        'country': {'S': 'USA'},
+        'post_url': {'S': f"https://{platform}.com/p/{rng.getrandbits(40):x}"},
+        'likes': {'N': str(rng.randrange(5000))},
+        'engagement': {'N': f"{rng.random():.4f}"},
+        'ttl': {'N': str(1790000000 + i)}
+    }
+
+
+def wire_save(rng):
+    """A cloud save item: user_data is a nested map of game state"""
+    completed = {'L': [{'M': {
+        'mission_id': {'N': str(m)},
+        'points': {'N': str(rng.choice([5, 10, 15, 25]))},
+        'completed_at': {'N': str(1790000000 + m)},
+        'proof_url': {'S': f"https://x.com/p/{m}"}
+    }} for m in range(1, 52)]}
+    return {
+        'license_key': {'S': 'ABC-123'},
+        'user_data': {'M': {
+            'userName': {'S': 'player1'},
+            'points': {'N': '1275'},
+            'multiplier': {'N': '1.5'},
+            'completedMissions': completed,
+            'settings': {'M': {'sound': {'BOOL': True}, 'volume': {'N': '0.8'}}}
+        }},
+        'saved_at': {'S': '2026-10-18T12:00:00Z'}
+    }
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--saves', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = [wire_post(rng, i) for i in range(args.items)]
+    deserializer = TypeDeserializer() if TypeDeserializer else LocalTypeDeserializer()
+
+    def resource_path():
+        rows = [format_post({k: deserializer.deserialize(v) for k, v in item.items()}) for item in items]
+        return json.dumps({'success': True, 'data': rows}, default=decimal_default)
+
+    def wire_path():
+        rows = [format_post(item_from_wire(item)) for item in items]
+        return json.dumps({'success': True, 'data': rows})
+
+    def wire_projected_path():
+        rows = [format_post(item_from_wire(item, RESEARCH_ATTRIBUTES)) for item in items]
+        return json.dumps({'success': True, 'data': rows})
+
+    print(f"{args.items} scanned items, deserializer: {'boto3' if TypeDeserializer else 'local copy'}")
+    print(f"{'path':<12} {'total ms':>9} {'us/item':>8} {'speedup':>8}")
+    baseline = expected = None
+    for name, fn in (('resource', resource_path), ('wire', wire_path), ('wire+proj', wire_projected_path)):
+        elapsed, body = timed(fn, args.repeat)
+        if baseline is None:
+            baseline, expected = elapsed, body
+        assert json.loads(body) == json.loads(expected), f"{name} body differs"
+        print(f"{name:<12} {elapsed * 1000:>9.1f} {elapsed / args.items * 1e6:>8.2f} {baseline / elapsed:>7.2f}x")
+
+    saves = [wire_save(rng) for _ in range(args.saves)]
+
+    def save_resource():
+        return [json.dumps(restore_from_dynamo(deserializer.deserialize(s['user_data']))) for s in saves]
+
+    def save_wire():
+        return [json.dumps(item_from_wire(s, ('user_data',))['user_data']) for s in saves]
+
+    print(f"\n{args.saves} cloud save loads (51 completed missions each)")
+    baseline = expected = None
+    for name, fn in (('resource', save_resource), ('wire', save_wire)):
+        elapsed, bodies = timed(fn, args.repeat)
+        if baseline is None:
+            baseline, expected = elapsed, bodies
+        assert bodies == expected, f"{name} save bodies differ"
+        print(f"{name:<12} {elapsed * 1000:>9.1f} {elapsed / args.saves * 1e6:>8.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
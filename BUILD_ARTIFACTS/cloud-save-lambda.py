@@ -3,19 +3,40 @@
 Mission Mischief - Cloud Save Lambda
 Cross-device game state sync keyed by license key
 Routes: POST /save, GET /load
+
+Saves carry a version counter. A client that knows the version it last
+saved or loaded can send a patch against it instead of the whole state:
+
+    {"key": ..., "base_version": 7, "patch": [
+        {"op": "replace", "path": ["totalPoints"], "value": 40},
+        {"op": "add", "path": ["completedMissions", "-"], "value": 12},
+        {"op": "remove", "path": ["submissions", "12"]}]}
+
+Paths are segment lists (strings are map keys, integers list indices, a
+final "-" appends) so they map onto DynamoDB document paths without
+reading the item. The patch is one conditional UpdateItem on version; a
+stale base_version (another device saved) or a patch the stored state
+can't take returns 409 and the client falls back to a full save.
+
+Patches shrink the request, not the write: UpdateItem is billed on the
+full item size either way. With SAVE_FORMAT=blob the item itself shrinks
+(zlib JSON in one Binary attribute); blob saves are patched by reading,
+patching and writing back under the same version condition.
 """
 
 import json
-import boto3
 import logging
+import os
 from datetime import datetime, timezone
 from decimal import Decimal
+from mission_mischief import clients
+from mission_mischief.projection import projection
+from mission_mischief.responses import compress_response
+from mission_mischief.saves import SAVE_BLOB_FORMAT, decode_save, encode_blob
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
-
 CORS_HEADERS = {
     'Content-Type': 'application/json',
     'Access-Control-Allow-Origin': '*',
@@ -23,11 +44,26 @@ CORS_HEADERS = {
     'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
 }
 
+SAVES_TABLE = 'mission-mischief-saves'
+
+# Longer patches are cheaper to send as a full save (UpdateExpression is capped at 4 KB)
+SAVE_PATCH_MAX_OPS = int(os.environ.get('SAVE_PATCH_MAX_OPS', '100'))
+
+# Storage format for new saves: 'map' (nested user_data map) or 'blob'
+# (zlib JSON, see mission_mischief.saves). Loads read either.
+SAVE_FORMAT = os.environ.get('SAVE_FORMAT', 'map')
+
+# Never stored in the cloud: the QR code is a large base64 image players re-upload
+EXCLUDED_FIELDS = ('qrCodeData',)
+
+class PatchRejected(Exception):
+    """The stored save is not at base_version, or the patch does not apply to it"""
+
 def key_exists(license_key):
     """Verify license key is registered before allowing save/load"""
     try:
-        table = dynamodb.Table('mission-mischief-users')
-        response = table.get_item(Key={'license_key': license_key})
+        table = clients.table('mission-mischief-users')
+        response = table.get_item(**projection(('status',), Key={'license_key': license_key}))
         item = response.get('Item')
         return item is not None and item.get('status') == 'active'
     except Exception as e:
@@ -47,47 +83,229 @@ def sanitize_for_dynamo(obj):
         return [sanitize_for_dynamo(i) for i in obj]
     return obj
 
-def restore_from_dynamo(obj):
-    """Convert Decimal back to float/int for JSON serialization"""
-    if isinstance(obj, Decimal):
-        return int(obj) if obj == int(obj) else float(obj)
-    if isinstance(obj, dict):
-        return {k: restore_from_dynamo(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [restore_from_dynamo(i) for i in obj]
-    return obj
+def parse_patch(patch):
+    """
+    Validated patch ops as (kind, segments, append, value); ops on excluded
+    fields are dropped. Raises ValueError for a malformed patch.
+    """
+    if not isinstance(patch, list) or not patch:
+        raise ValueError('patch must be a non-empty list')
+    if len(patch) > SAVE_PATCH_MAX_OPS:
+        raise ValueError(f"patch has more than {SAVE_PATCH_MAX_OPS} operations")
+
+    ops = []
+    for op in patch:
+        kind = op.get('op') if isinstance(op, dict) else None
+        path = op.get('path') if isinstance(op, dict) else None
+        if kind not in ('add', 'replace', 'remove'):
+            raise ValueError('op must be add, replace or remove')
+        if not isinstance(path, list) or not path or not isinstance(path[0], str):
+            raise ValueError('path must be a list starting with a field name')
+        if path[0] in EXCLUDED_FIELDS:
+            continue
+
+        append = kind == 'add' and path[-1] == '-'
+        segments = path[:-1] if append else path
+        for segment in segments:
+            if isinstance(segment, bool) or not isinstance(segment, (str, int)):
+                raise ValueError('path segments must be strings or integers')
+            if isinstance(segment, int) and segment < 0:
+                raise ValueError('list indices must not be negative')
+        if kind != 'remove' and 'value' not in op:
+            raise ValueError(f"{kind} needs a value")
+        if kind == 'add' and not append and isinstance(segments[-1], int):
+            # DynamoDB can replace or append list elements but not insert between them
+            raise ValueError('add into a list must append (path ending in "-")')
+        ops.append((kind, segments, append, op.get('value')))
+    return ops
+
+def patch_update(ops, base_version, saved_at):
+    """UpdateItem kwargs applying parsed ops to a map-format save when the stored version is base_version"""
+    names = {'#data': 'user_data'}
+    values = {':base': base_version, ':one': 1, ':saved_at': saved_at}
+    sets, removes = [], []
+    for kind, segments, append, value in ops:
+        expression = '#data'
+        for segment in segments:
+            if isinstance(segment, int):
+                expression += f"[{segment}]"
+            else:
+                name = f"#p{len(names)}"
+                names[name] = segment
+                expression += f".{name}"
+
+        if kind == 'remove':
+            removes.append(expression)
+            continue
+        placeholder = f":v{len(values)}"
+        if append:
+            values[placeholder] = [sanitize_for_dynamo(value)]
+            sets.append(f"{expression} = list_append({expression}, {placeholder})")
+        else:
+            values[placeholder] = sanitize_for_dynamo(value)
+            sets.append(f"{expression} = {placeholder}")
+
+    sets += ['saved_at = :saved_at', 'version = version + :one']
+    update = 'SET ' + ', '.join(sets)
+    if removes:
+        update += ' REMOVE ' + ', '.join(removes)
+    return {
+        'UpdateExpression': update,
+        'ConditionExpression': 'version = :base',
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values,
+        'ReturnValues': 'UPDATED_NEW'
+    }
+
+def apply_ops(state, ops):
+    """Apply parsed ops to a decoded state in place, as UpdateItem would; PatchRejected if a path is missing"""
+    for kind, segments, append, value in ops:
+        target = state
+        try:
+            for segment in segments[:-1]:
+                target = target[segment]
+            last = segments[-1]
+            if append:
+                target[last].append(value)
+            elif kind == 'remove':
+                del target[last]
+            elif isinstance(last, int) and not 0 <= last < len(target):
+                raise IndexError(last)
+            else:
+                target[last] = value
+        except (KeyError, IndexError, TypeError, AttributeError):
+            raise PatchRejected(f"{kind} {segments} does not apply")
+
+def apply_patch(table, license_key, update):
+    """
+    Run a patch_update; returns the new version. Raises PatchRejected when
+    the stored save moved past base_version or the patch doesn't fit it.
+    """
+    from botocore.exceptions import ClientError
+
+    try:
+        response = table.update_item(Key={'license_key': license_key}, **update)
+    except ClientError as e:
+        code = e.response['Error']['Code']
+        # ValidationException: a path the stored document doesn't have (or overlapping paths)
+        if code in ('ConditionalCheckFailedException', 'ValidationException'):
+            raise PatchRejected(code)
+        raise
+    return int(response['Attributes']['version'])
+
+def write_blob(table, license_key, state, base_version=None):
+    """
+    Store state in the blob format (dropping any map-format user_data) and
+    bump the version; conditional on base_version when given. Returns the
+    new version.
+    """
+    from botocore.exceptions import ClientError
+
+    kwargs = {
+        'UpdateExpression': (
+            'SET user_blob = :blob, save_format = :format, saved_at = :saved_at, '
+            'version = if_not_exists(version, :zero) + :one REMOVE user_data'
+        ),
+        'ExpressionAttributeValues': {
+            ':blob': encode_blob(state),
+            ':format': SAVE_BLOB_FORMAT,
+            ':saved_at': datetime.now(timezone.utc).isoformat(),
+            ':zero': 0,
+            ':one': 1
+        },
+        'ReturnValues': 'UPDATED_NEW'
+    }
+    if base_version is not None:
+        kwargs['ConditionExpression'] = 'version = :base'
+        kwargs['ExpressionAttributeValues'][':base'] = base_version
+    try:
+        response = table.update_item(Key={'license_key': license_key}, **kwargs)
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            raise PatchRejected('ConditionalCheckFailedException')
+        raise
+    return int(response['Attributes']['version'])
+
+def patch_blob(table, license_key, ops, base_version):
+    """
+    Blob saves can't be patched by document path: read the save (either
+    format), apply the ops here and write the blob back conditional on the
+    version that was read. Returns the new version.
+    """
+    item = clients.wire_table(SAVES_TABLE).get_item(
+        Key={'license_key': license_key}, ConsistentRead=True
+    ).get('Item')
+    if not item or item.get('version') != base_version:
+        raise PatchRejected('ConditionalCheckFailedException')
+    state = decode_save(item)
+    apply_ops(state, ops)
+    return write_blob(table, license_key, state, base_version)
+
+def save_full(table, license_key, save_data):
+    """Overwrite the whole save (last writer wins) and bump its version; returns the new version"""
+    if SAVE_FORMAT == 'blob':
+        return write_blob(table, license_key, save_data)
+    response = table.update_item(
+        Key={'license_key': license_key},
+        UpdateExpression=(
+            'SET user_data = :data, saved_at = :saved_at, version = if_not_exists(version, :zero) + :one '
+            'REMOVE user_blob, save_format'
+        ),
+        ExpressionAttributeValues={
+            ':data': sanitize_for_dynamo(save_data),
+            ':saved_at': datetime.now(timezone.utc).isoformat(),
+            ':zero': 0,
+            ':one': 1
+        },
+        ReturnValues='UPDATED_NEW'
+    )
+    return int(response['Attributes']['version'])
 
 def handle_save(body):
-    """POST /save — save full user state to DynamoDB"""
+    """POST /save — save full user state, or a patch against base_version"""
     license_key = body.get('key', '').strip()
     user_data = body.get('data', {})
+    patch = body.get('patch')
 
     if not license_key:
         return response_body(400, {'success': False, 'error': 'License key required'})
 
+    if patch is not None:
+        try:
+            base_version = int(body.get('base_version'))
+        except (TypeError, ValueError):
+            return response_body(400, {'success': False, 'error': 'base_version must be an integer'})
+        try:
+            ops = parse_patch(patch)
+        except ValueError as e:
+            return response_body(400, {'success': False, 'error': str(e)})
+    elif not user_data:
+        return response_body(400, {'success': False, 'error': 'No data provided'})
+
     if not key_exists(license_key):
         return response_body(403, {'success': False, 'error': 'Invalid or unregistered key'})
 
-    if not user_data:
-        return response_body(400, {'success': False, 'error': 'No data provided'})
-
     try:
-        table = dynamodb.Table('mission-mischief-saves')
-
-        # Strip the QR code image data before saving to DynamoDB
-        # It's large (base64 image) and doesn't need to be in the cloud
-        # Players re-upload QR on new devices
-        save_data = {k: v for k, v in user_data.items() if k != 'qrCodeData'}
-
-        table.put_item(Item={
-            'license_key': license_key,
-            'user_data': sanitize_for_dynamo(save_data),
-            'saved_at': datetime.now(timezone.utc).isoformat(),
-            'version': int(datetime.now().timestamp())
-        })
+        table = clients.table(SAVES_TABLE)
+
+        if patch is not None:
+            try:
+                if SAVE_FORMAT == 'blob':
+                    version = patch_blob(table, license_key, ops, base_version)
+                else:
+                    update = patch_update(ops, base_version, datetime.now(timezone.utc).isoformat())
+                    version = apply_patch(table, license_key, update)
+            except PatchRejected as e:
+                logger.info(f"Cloud save patch rejected for key: {license_key[:8]}... ({e})")
+                return response_body(409, {'success': False, 'error': 'Save is out of date; send the full state'})
+            logger.info(f"Cloud save patch ({len(patch)} ops) for key: {license_key[:8]}...")
+            return response_body(200, {'success': True, 'version': version})
+
+        save_data = {k: v for k, v in user_data.items() if k not in EXCLUDED_FIELDS}
+        version = save_full(table, license_key, save_data)
 
         logger.info(f"Cloud save successful for key: {license_key[:8]}...")
-        return response_body(200, {'success': True})
+        return response_body(200, {'success': True, 'version': version})
 
     except Exception as e:
         logger.error(f"Cloud save failed: {e}")
@@ -104,20 +322,22 @@ def handle_load(query_params):
         return response_body(403, {'success': False, 'error': 'Invalid or unregistered key'})
 
     try:
-        table = dynamodb.Table('mission-mischief-saves')
+        # Wire reader: numbers come back as int/float, ready for json.dumps
+        table = clients.wire_table(SAVES_TABLE)
         response = table.get_item(Key={'license_key': license_key})
         item = response.get('Item')
 
         if not item:
             return response_body(200, {'success': True, 'user': None})
 
-        user_data = restore_from_dynamo(item.get('user_data', {}))
+        user_data = decode_save(item)
 
         logger.info(f"Cloud load successful for key: {license_key[:8]}...")
         return response_body(200, {
             'success': True,
             'user': user_data,
-            'saved_at': item.get('saved_at')
+            'saved_at': item.get('saved_at'),
+            'version': item.get('version')
         })
 
     except Exception as e:
@@ -146,7 +366,8 @@ def lambda_handler(event, context):
 
         if path.endswith('/load') and method == 'GET':
             params = event.get('queryStringParameters')
-            return handle_load(params)
+            # Saved game state is the one large body this handler returns
+            return compress_response(event, handle_load(params))
 
         return response_body(404, {'error': 'Not found'})
 
@@ -6,20 +6,16 @@ Routes: POST /validate-key, POST /webhook
 """
 
 import json
-import boto3
 import logging
 import hmac
 import hashlib
-import requests
 from datetime import datetime, timezone
-from botocore.exceptions import ClientError
+from mission_mischief import clients
+from mission_mischief.secrets import get_secret
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-secrets_manager = boto3.client('secretsmanager')
-dynamodb = boto3.resource('dynamodb')
-
 CORS_HEADERS = {
     'Content-Type': 'application/json',
     'Access-Control-Allow-Origin': '*',
@@ -28,12 +24,9 @@ CORS_HEADERS = {
 }
 
 def get_ls_credentials():
-    """Get Lemon Squeezy credentials from Secrets Manager"""
+    """Get Lemon Squeezy credentials (cached in the container across invocations)"""
     try:
-        response = secrets_manager.get_secret_value(
-            SecretId='mission-mischief/lemon-squeezy'
-        )
-        return json.loads(response['SecretString'])
+        return get_secret('mission-mischief/lemon-squeezy')
     except Exception as e:
         logger.error(f"Failed to get LS credentials: {e}")
         return None
@@ -47,8 +40,13 @@ def validate_ls_key(license_key, instance_name):
     if not creds:
         return {'valid': False, 'error': 'Configuration error'}
 
+    # Webhooks never call out, so requests is only loaded on the validate route
+    import requests
+    from mission_mischief import outbound
+
     try:
-        response = requests.post(
+        # Keep-alive session: warm invocations skip the TCP + TLS handshake
+        response = outbound.get_session().post(
             'https://api.lemonsqueezy.com/v1/licenses/validate',
             headers={
                 'Authorization': f"Bearer {creds['api_key']}",
@@ -58,12 +56,11 @@ def validate_ls_key(license_key, instance_name):
             json={
                 'license_key': license_key,
                 'instance_name': instance_name or 'unknown'
-            },
-            timeout=10
+            }
         )
 
         data = response.json()
-        logger.info(f"LS validate response status: {response.status_code}")
+        logger.info(f"LS validate response status: {response.status_code}, connections: {outbound.get_stats()}")
 
         if response.status_code == 200 and data.get('valid'):
             return {
@@ -86,7 +83,7 @@ def validate_ls_key(license_key, instance_name):
 def get_user_by_key(license_key):
     """Check if a license key already has a registered user in DynamoDB"""
     try:
-        table = dynamodb.Table('mission-mischief-users')
+        table = clients.table('mission-mischief-users')
         response = table.get_item(Key={'license_key': license_key})
         return response.get('Item')
     except Exception as e:
@@ -96,7 +93,7 @@ def get_user_by_key(license_key):
 def store_validated_key(license_key, username, activation_id):
     """Store validated key registration in DynamoDB"""
     try:
-        table = dynamodb.Table('mission-mischief-users')
+        table = clients.table('mission-mischief-users')
         table.put_item(Item={
             'license_key': license_key,
             'username': username or '',
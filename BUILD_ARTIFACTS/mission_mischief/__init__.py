@@ -0,0 +1,4 @@
+"""
+Mission Mischief shared Lambda helpers
+Bundled next to each handler in its deployment package
+"""
@@ -0,0 +1,396 @@
+"""
+Mission Mischief - aggregates read model
+Player totals, state/city counts and mission x platform counts kept in
+mission-mischief-aggregates, maintained incrementally from the posts stream
+
+Item layout (pk / sk):
+    player     / <handle>                    points, posts, city, state, country
+    geo        / <state>#<city>              count, state, city
+    geo_player / <state>#<city>#<handle>     count, handle, social_url
+    mission    / <mission_id>#<platform>     count, mission_id, platform
+    meta       / posts                       updates, rebuilt_at (written by rebuilds only)
+    meta       / posts#<shard>               posts_total, direct_submissions, updates
+    meta       / day#<YYYY-MM-DD>#<shard>    count, day_bucket
+    applied    / <stream eventID>            ttl (applied-record marker, expires)
+
+The stream only carries changes made after it was enabled, so the model is
+complete only once a rebuild has seeded it from the posts table. The
+rebuild marks meta/posts with rebuilt_at, and the readers treat the model
+as missing (None, callers fall back to scanning) until that marker exists.
+rebuilt_at is also the rebuild's cutoff: it counts posts written before it,
+and the stream applies only records created from it on.
+
+Every stream record bumps the global counters, so they are split over
+META_SHARDS items by post_id (meta_shard) instead of one item every
+transaction would update; readers sum meta/posts and its shards, and the
+day shards per day. Items from before sharding (meta/posts counters,
+unsharded day#<YYYY-MM-DD>) are summed the same way until a rebuild
+replaces them.
+"""
+
+import heapq
+import os
+import time
+import zlib
+from datetime import datetime, timezone
+
+from mission_mischief import clients
+from mission_mischief.aggregation import PLATFORMS, TOP_PLAYERS, detect_platform
+from mission_mischief.posts import query_all
+from mission_mischief.timekeys import day_bucket
+
+AGGREGATES_TABLE = os.environ.get('AGGREGATES_TABLE', 'mission-mischief-aggregates')
+
+AGGREGATE_PARTITIONS = ('player', 'geo', 'geo_player', 'mission', 'meta')
+META_KEY = ('meta', 'posts')
+# Shards of the meta counters; may be changed freely, readers sum every shard
+META_SHARDS = int(os.environ.get('AGGREGATE_META_SHARDS', '8'))
+# Markers of applied stream records; kept past the stream's 24 hour retention
+APPLIED_PK = 'applied'
+APPLIED_MARKER_DAYS = 3
+
+# Set on META_KEY by a rebuild (epoch seconds cutoff); absent means not yet seeded
+REBUILT_AT = 'rebuilt_at'
+
+# What post_deltas raises for a post it can't count (mission_id/points not integers)
+MALFORMED_POST_ERRORS = (TypeError, ValueError, ArithmeticError)
+
+# Post attributes post_deltas reads
+POST_DELTA_ATTRIBUTES = (
+    'post_id', 'day_bucket', 'timestamp', 'source', 'username', 'mission_id', 'points', 'proof_url', 'state', 'city', 'country'
+)
+
+
+def _add(deltas, key, adds, init=None):
+    """Accumulate counter increments and first-seen attributes for one aggregate item"""
+    delta = deltas.setdefault(key, {'add': {}, 'init': {}})
+    for attr, amount in adds.items():
+        delta['add'][attr] = delta['add'].get(attr, 0) + amount
+    for attr, value in (init or {}).items():
+        if value is not None:
+            delta['init'].setdefault(attr, value)
+
+
+def meta_shard(post_id):
+    """Meta counter shard of a post (crc32, not hash(): the same in every process)"""
+    return zlib.crc32(str(post_id).encode('utf-8')) % META_SHARDS
+
+
+def meta_counter_key(post_id):
+    """meta/posts#<shard> item holding a post's share of the global counters"""
+    return (META_KEY[0], f"{META_KEY[1]}#{meta_shard(post_id)}")
+
+
+def post_deltas(item, sign, deltas=None):
+    """
+    Aggregate deltas contributed by one post: sign=+1 when it appears,
+    -1 when it goes away. Returns {(pk, sk): {'add': {...}, 'init': {...}}}.
+    Raises one of MALFORMED_POST_ERRORS, before adding anything to
+    `deltas`, for a direct submission whose mission_id or points isn't a
+    number; callers skip such posts so they are never counted.
+    """
+    deltas = {} if deltas is None else deltas
+    direct = item.get('source') == 'direct_submission'
+    if direct:
+        mission_id = int(item.get('mission_id', 0))
+        points = int(item.get('points', 0))
+    bucket = item.get('day_bucket') or day_bucket(item.get('timestamp'))
+    counters = meta_counter_key(item.get('post_id', ''))
+
+    _add(deltas, counters, {'posts_total': sign})
+    _add(deltas, ('meta', f"day#{bucket}#{meta_shard(item.get('post_id', ''))}"), {'count': sign}, {
+        'day_bucket': bucket
+    })
+
+    if not direct:
+        return deltas
+
+    username = item.get('username', 'Unknown')
+    proof_url = item.get('proof_url') or ''
+    state = item.get('state', 'Unknown')
+    city = item.get('city', 'Unknown')
+    platform = detect_platform(proof_url)
+
+    _add(deltas, counters, {'direct_submissions': sign})
+    _add(deltas, ('player', username), {'points': sign * points, 'posts': sign}, {
+        'handle': username,
+        'city': city,
+        'state': state,
+        'country': item.get('country', 'USA')
+    })
+    _add(deltas, ('geo', f"{state}#{city}"), {'count': sign}, {'state': state, 'city': city})
+    _add(deltas, ('geo_player', f"{state}#{city}#{username}"), {'count': sign}, {
+        'state': state,
+        'city': city,
+        'handle': username,
+        'social_url': proof_url
+    })
+    _add(deltas, ('mission', f"{mission_id}#{platform}"), {'count': sign}, {
+        'mission_id': mission_id,
+        'platform': platform
+    })
+    return deltas
+
+
+def prune_deltas(deltas):
+    """Drop zero increments (e.g. a MODIFY that didn't change a counted field)"""
+    pruned = {}
+    for key, delta in deltas.items():
+        adds = {attr: amount for attr, amount in delta['add'].items() if amount}
+        if adds:
+            pruned[key] = {'add': adds, 'init': delta['init']}
+    return pruned
+
+
+def _to_wire(value):
+    """Encode a plain Python value as a DynamoDB attribute value"""
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, (int, float)):
+        return {'N': str(value)}
+    return {'S': str(value)}
+
+
+def build_update(table_name, key, delta):
+    """Transact Update for one aggregate item: ADD counters, SET first-seen attributes"""
+    names = {}
+    values = {}
+    set_parts = []
+    add_parts = []
+
+    for i, (attr, value) in enumerate(delta['init'].items()):
+        names[f"#s{i}"] = attr
+        values[f":s{i}"] = _to_wire(value)
+        set_parts.append(f"#s{i} = if_not_exists(#s{i}, :s{i})")
+
+    for i, (attr, amount) in enumerate(delta['add'].items()):
+        names[f"#a{i}"] = attr
+        values[f":a{i}"] = {'N': str(amount)}
+        add_parts.append(f"#a{i} :a{i}")
+
+    expression = f"ADD {', '.join(add_parts)}"
+    if set_parts:
+        expression = f"SET {', '.join(set_parts)} {expression}"
+
+    return {
+        'Update': {
+            'TableName': table_name,
+            'Key': {'pk': {'S': key[0]}, 'sk': {'S': key[1]}},
+            'UpdateExpression': expression,
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': values
+        }
+    }
+
+
+class DynamoAggregateStore:
+    """Applies deltas to the aggregates table, one transaction per stream record"""
+
+    def __init__(self, client=None, table_name=AGGREGATES_TABLE):
+        self._client = client
+        self.table_name = table_name
+
+    @property
+    def client(self):
+        """The given client, or the shared DynamoDB client created on first use"""
+        if self._client is None:
+            self._client = clients.client('dynamodb')
+        return self._client
+
+    def apply(self, deltas, token=None):
+        """
+        Apply one record's deltas atomically. With a token (the stream
+        eventID) the transaction also writes an applied marker that must not
+        exist yet, so a record redelivered by a retried batch is applied
+        once. Returns False if the marker showed it was already applied.
+        """
+        updates = [build_update(self.table_name, key, delta) for key, delta in deltas.items()]
+        if not updates:
+            return True
+        if token:
+            updates.append({
+                'Put': {
+                    'TableName': self.table_name,
+                    'Item': {
+                        'pk': {'S': APPLIED_PK},
+                        'sk': {'S': token},
+                        'ttl': {'N': str(int(time.time()) + APPLIED_MARKER_DAYS * 86400)}
+                    },
+                    'ConditionExpression': 'attribute_not_exists(pk)'
+                }
+            })
+        try:
+            self.client.transact_write_items(TransactItems=updates)
+        except self.client.exceptions.TransactionCanceledException as e:
+            reasons = e.response.get('CancellationReasons') or []
+            if token and reasons and reasons[-1].get('Code') == 'ConditionalCheckFailed':
+                return False
+            raise
+        return True
+
+    def rebuilt_at(self):
+        """Cutoff of the last rebuild (epoch seconds), None if never rebuilt"""
+        item = self.client.get_item(
+            TableName=self.table_name,
+            Key={'pk': {'S': META_KEY[0]}, 'sk': {'S': META_KEY[1]}},
+            ProjectionExpression='#rebuilt',
+            ExpressionAttributeNames={'#rebuilt': REBUILT_AT}
+        ).get('Item', {})
+        if REBUILT_AT not in item:
+            return None
+        return int(item[REBUILT_AT]['N'])
+
+
+class MemoryAggregateStore:
+    """In-memory stand-in with the same apply semantics, for replay and rebuilds"""
+
+    def __init__(self):
+        self.items = {}
+        self.applied = set()
+
+    def apply(self, deltas, token=None):
+        if token:
+            if token in self.applied:
+                return False
+            self.applied.add(token)
+        for key, delta in deltas.items():
+            item = self.items.setdefault(key, {'pk': key[0], 'sk': key[1]})
+            for attr, value in delta['init'].items():
+                item.setdefault(attr, value)
+            for attr, amount in delta['add'].items():
+                item[attr] = item.get(attr, 0) + amount
+        return True
+
+    def rebuilt_at(self):
+        return self.items.get(META_KEY, {}).get(REBUILT_AT)
+
+
+def compute_aggregates(items):
+    """Build the aggregate items from scratch for a set of posts, skipping malformed ones"""
+    store = MemoryAggregateStore()
+    for item in items:
+        try:
+            store.apply(post_deltas(item, 1))
+        except MALFORMED_POST_ERRORS:
+            # Skipped by the stream handler too, so both models agree
+            continue
+    return store.items
+
+
+def read_meta_counters(table, with_days=False):
+    """
+    Global counters summed over meta/posts and its shards, in one Query of
+    the meta partition: {'seeded', 'posts_total', 'direct_submissions',
+    'version', 'days'}. 'days' (per-day counts, days with no live posts
+    omitted) is only filled with_days; otherwise the Query stops at the
+    posts items.
+    """
+    from boto3.dynamodb.conditions import Key
+
+    condition = Key('pk').eq(META_KEY[0])
+    if not with_days:
+        condition = condition & Key('sk').begins_with(META_KEY[1])
+
+    totals = {'posts_total': 0, 'direct_submissions': 0, 'updates': 0}
+    days = {}
+    seeded = False
+    for item in query_all(table, KeyConditionExpression=condition):
+        sk = item['sk']
+        if sk == META_KEY[1] or sk.startswith(f"{META_KEY[1]}#"):
+            seeded = seeded or REBUILT_AT in item
+            for attr in totals:
+                totals[attr] += int(item.get(attr, 0))
+        elif sk.startswith('day#'):
+            day = sk[4:14]
+            days[day] = days.get(day, 0) + int(item.get('count', 0))
+
+    return {
+        'seeded': seeded,
+        'posts_total': totals['posts_total'],
+        'direct_submissions': totals['direct_submissions'],
+        'version': totals['updates'],
+        'days': {day: count for day, count in days.items() if count > 0}
+    }
+
+
+def read_version(table):
+    """
+    Update counter of the read model (one small Query), bumped for every
+    applied posts stream record. None until a rebuild has seeded the model.
+    """
+    meta = read_meta_counters(table)
+    return meta['version'] if meta['seeded'] else None
+
+
+def read_post_counts(table):
+    """
+    Post counters from the meta partition in one Query: totals plus the
+    per-day counts (days with no live posts omitted). None until a
+    rebuild has seeded the model.
+    """
+    meta = read_meta_counters(table, with_days=True)
+    if not meta['seeded']:
+        return None
+
+    return {
+        'posts_total': meta['posts_total'],
+        'direct_submissions': meta['direct_submissions'],
+        'version': meta['version'],
+        'days': meta['days']
+    }
+
+
+def read_bounty_data(table, top_players=TOP_PLAYERS):
+    """
+    Serve the bounty hunter payload from the aggregates table in a few Queries.
+    Returns None until a rebuild has seeded the model.
+    """
+    from boto3.dynamodb.conditions import Key
+
+    meta = read_meta_counters(table)
+    if not meta['seeded']:
+        return None
+
+    def partition(pk):
+        return query_all(table, KeyConditionExpression=Key('pk').eq(pk))
+
+    players = (
+        {
+            'handle': item['handle'],
+            'points': int(item.get('points', 0)),
+            'city': item.get('city', 'Unknown'),
+            'state': item.get('state', 'Unknown'),
+            'country': item.get('country', 'USA')
+        }
+        for item in partition('player') if int(item.get('posts', 0)) > 0
+    )
+    top = heapq.nlargest(top_players, players, key=lambda p: p['points'])
+
+    geography = {}
+    for item in partition('geo'):
+        count = int(item.get('count', 0))
+        if count > 0:
+            geography.setdefault(item['state'], {})[item['city']] = {'count': count, 'players': []}
+    for item in partition('geo_player'):
+        city = geography.get(item['state'], {}).get(item['city'])
+        if city is not None and int(item.get('count', 0)) > 0:
+            city['players'].append({'handle': item['handle'], 'social_url': item.get('social_url', '')})
+
+    mission_activity = {}
+    for item in partition('mission'):
+        count = int(item.get('count', 0))
+        if count <= 0:
+            continue
+        activity = mission_activity.setdefault(int(item['mission_id']), dict.fromkeys(PLATFORMS, 0))
+        if item['platform'] in activity:
+            activity[item['platform']] += count
+
+    return {
+        'topPlayers': top,
+        'geography': geography,
+        'missionActivity': mission_activity,
+        'justiceCases': [],
+        'lastUpdated': datetime.now(timezone.utc).isoformat(),
+        'partial': False,
+        'version': meta['version']
+    }
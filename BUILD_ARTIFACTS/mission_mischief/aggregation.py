@@ -0,0 +1,148 @@
+"""
+Mission Mischief - submission rollups
+Single-pass aggregation of direct submissions into the bounty hunter
+sections (top players, state -> city geography, mission x platform activity)
+"""
+
+import heapq
+from datetime import datetime
+
+PLATFORMS = ('instagram', 'facebook', 'x')
+TOP_PLAYERS = 10
+
+# Post attributes SubmissionRollup.add reads
+SUBMISSION_ATTRIBUTES = ('username', 'mission_id', 'points', 'proof_url', 'city', 'state', 'country')
+
+
+def detect_platform(proof_url):
+    """Detect the social platform from a proof URL"""
+    url_lower = (proof_url or '').lower()
+    if 'instagram.com' in url_lower:
+        return 'instagram'
+    if 'facebook.com' in url_lower:
+        return 'facebook'
+    if 'x.com' in url_lower or 'twitter.com' in url_lower:
+        return 'x'
+    return 'other'
+
+
+class SubmissionRollup:
+    """
+    Rollup of direct submissions, built in one pass over any iterable of items.
+
+    City players are kept in a dict keyed by handle (insertion ordered, first
+    social_url wins), so each post costs O(1) instead of a search through the
+    city's player list. Top players are picked with heapq.nlargest. Two
+    rollups over disjoint items (e.g. parallel scan segments) can be merged.
+    """
+
+    def __init__(self):
+        self.players = {}
+        self.geography = {}
+        self.mission_activity = {}
+        self.count = 0
+
+    def add(self, sub):
+        """Fold one submission into the rollup"""
+        username = sub.get('username', 'Unknown')
+        mission_id = int(sub.get('mission_id', 0))
+        points = int(sub.get('points', 0))
+        proof_url = sub.get('proof_url') or ''
+
+        # Player stats keep the location from the player's first submission
+        player = self.players.get(username)
+        if player is None:
+            player = self.players[username] = {
+                'handle': username,
+                'points': 0,
+                'city': sub.get('city', 'Unknown'),
+                'state': sub.get('state', 'Unknown'),
+                'country': sub.get('country', 'USA')
+            }
+        player['points'] += points
+
+        state = sub.get('state', player['state'])
+        city = sub.get('city', player['city'])
+        cities = self.geography.get(state)
+        if cities is None:
+            cities = self.geography[state] = {}
+        city_data = cities.get(city)
+        if city_data is None:
+            city_data = cities[city] = {'count': 0, 'players': {}}
+        city_data['count'] += 1
+        if username not in city_data['players']:
+            city_data['players'][username] = proof_url
+
+        activity = self.mission_activity.get(mission_id)
+        if activity is None:
+            activity = self.mission_activity[mission_id] = dict.fromkeys(PLATFORMS, 0)
+        platform = detect_platform(proof_url)
+        if platform in activity:
+            activity[platform] += 1
+
+        self.count += 1
+
+    def consume(self, items):
+        """Fold every item of an iterable (e.g. a scan generator); returns self"""
+        add = self.add
+        for sub in items:
+            add(sub)
+        return self
+
+    def merge(self, other):
+        """Fold another rollup over disjoint submissions into this one; returns self"""
+        for handle, theirs in other.players.items():
+            mine = self.players.get(handle)
+            if mine is None:
+                self.players[handle] = dict(theirs)
+            else:
+                mine['points'] += theirs['points']
+
+        for state, cities in other.geography.items():
+            my_cities = self.geography.setdefault(state, {})
+            for city, theirs in cities.items():
+                mine = my_cities.get(city)
+                if mine is None:
+                    my_cities[city] = {'count': theirs['count'], 'players': dict(theirs['players'])}
+                    continue
+                mine['count'] += theirs['count']
+                for handle, social_url in theirs['players'].items():
+                    mine['players'].setdefault(handle, social_url)
+
+        for mission_id, theirs in other.mission_activity.items():
+            mine = self.mission_activity.setdefault(mission_id, dict.fromkeys(PLATFORMS, 0))
+            for platform, count in theirs.items():
+                mine[platform] += count
+
+        self.count += other.count
+        return self
+
+    def top_players(self, k=TOP_PLAYERS):
+        """Top k players by points without sorting every player"""
+        return heapq.nlargest(k, self.players.values(), key=lambda p: p['points'])
+
+    def geography_payload(self):
+        """Geography in the bounty hunter shape (players as a list)"""
+        return {
+            state: {
+                city: {
+                    'count': data['count'],
+                    'players': [
+                        {'handle': handle, 'social_url': social_url}
+                        for handle, social_url in data['players'].items()
+                    ]
+                }
+                for city, data in cities.items()
+            }
+            for state, cities in self.geography.items()
+        }
+
+    def to_bounty_data(self, top_k=TOP_PLAYERS):
+        """Bounty hunter payload served by the admin /submissions route"""
+        return {
+            'topPlayers': self.top_players(top_k),
+            'geography': self.geography_payload(),
+            'missionActivity': self.mission_activity,
+            'justiceCases': [],
+            'lastUpdated': datetime.now().isoformat()
+        }
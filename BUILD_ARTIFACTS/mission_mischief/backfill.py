@@ -0,0 +1,121 @@
+"""
+Mission Mischief - posts index backfills
+Shared scan-and-update loop for the scripts that add derived index keys to
+existing mission-mischief-posts items. A script names its index and the
+attribute that marks an item as done, and supplies a key function; the
+table is read with a ParallelScan and each item missing the marker gets its
+keys with a conditional UpdateItem.
+"""
+
+import argparse
+import logging
+from datetime import datetime, timezone
+
+from mission_mischief import clients
+from mission_mischief.posts import POSTS_TABLE, written_at
+from mission_mischief.projection import projection
+from mission_mischief.scanner import ParallelScan
+from mission_mischief.timekeys import parse_timestamp
+
+logger = logging.getLogger()
+
+# Attributes item_time reads
+TIME_ATTRIBUTES = ('timestamp', 'ttl')
+
+
+def item_time(item):
+    """The item's timestamp, falling back to its write time (from ttl); None without either"""
+    parsed = parse_timestamp(item.get('timestamp'))
+    if parsed is None:
+        written = written_at(item)
+        if written is not None:
+            parsed = datetime.fromtimestamp(written, tz=timezone.utc)
+    return parsed
+
+
+def create_index(table_name, index_name, hash_key, range_key):
+    """Add a GSI (projection ALL) to the posts table; keys are (name, type) pairs"""
+    clients.client('dynamodb').update_table(
+        TableName=table_name,
+        AttributeDefinitions=[
+            {'AttributeName': name, 'AttributeType': kind} for name, kind in (hash_key, range_key)
+        ],
+        GlobalSecondaryIndexUpdates=[{
+            'Create': {
+                'IndexName': index_name,
+                'KeySchema': [
+                    {'AttributeName': hash_key[0], 'KeyType': 'HASH'},
+                    {'AttributeName': range_key[0], 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
+        }]
+    )
+    logger.info(f"Creating {index_name} on {table_name} (backfill runs in AWS)")
+
+
+def backfill(table_name, marker, keys_for_item, attributes=TIME_ATTRIBUTES, dry_run=False):
+    """
+    Scan the posts table and SET keys_for_item(item) on every item without
+    `marker`. keys_for_item receives post_id, marker and `attributes` and
+    returns {attribute: value}, or None when the item has nothing usable.
+    """
+    table = clients.table(table_name)
+    stats = {'scanned': 0, 'updated': 0, 'already_set': 0, 'skipped': 0}
+
+    for item in ParallelScan(table, **projection(('post_id', marker) + tuple(attributes))):
+        stats['scanned'] += 1
+        if item.get(marker) not in (None, ''):
+            stats['already_set'] += 1
+            continue
+
+        keys = keys_for_item(item)
+        if not keys:
+            logger.warning(f"No usable timestamp for {item['post_id']}, skipping")
+            stats['skipped'] += 1
+            continue
+
+        if dry_run:
+            stats['updated'] += 1
+            continue
+
+        names = {'#marker': marker}
+        values = {}
+        assignments = []
+        for i, (attr, value) in enumerate(keys.items()):
+            names[f"#k{i}"] = attr
+            values[f":k{i}"] = value
+            assignments.append(f"#k{i} = :k{i}")
+        try:
+            table.update_item(
+                Key={'post_id': item['post_id']},
+                UpdateExpression=f"SET {', '.join(assignments)}",
+                ConditionExpression='attribute_exists(post_id) AND attribute_not_exists(#marker)',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+            stats['updated'] += 1
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+            # Deleted or keyed by a writer since we scanned it
+            stats['already_set'] += 1
+
+    return stats
+
+
+def run_cli(description, index_name, hash_key, range_key, marker, keys_for_item):
+    """Command line for a backfill script: --create-index, --dry-run, --table"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--table', default=POSTS_TABLE)
+    parser.add_argument('--create-index', action='store_true', help=f"create {index_name} and exit")
+    parser.add_argument('--dry-run', action='store_true', help='count items without writing')
+    args = parser.parse_args()
+
+    if args.create_index:
+        create_index(args.table, index_name, hash_key, range_key)
+        return
+
+    stats = backfill(args.table, marker, keys_for_item, dry_run=args.dry_run)
+    logger.info(f"Backfill {'(dry run) ' if args.dry_run else ''}complete: {stats}")
@@ -0,0 +1,85 @@
+"""
+Mission Mischief - lazy AWS client registry
+boto3 clients, resources and DynamoDB Table objects are created on first use
+and memoized for the life of the container, so a cold start only pays for
+the services the invoked route actually touches
+"""
+
+import threading
+
+_lock = threading.Lock()
+_clients = {}
+_resources = {}
+_tables = {}
+_wire_tables = {}
+
+
+def client(service_name):
+    """Shared low-level client for a service (boto3 clients are thread safe)"""
+    found = _clients.get(service_name)
+    if found is None:
+        with _lock:
+            found = _clients.get(service_name)
+            if found is None:
+                import boto3
+                found = _clients[service_name] = boto3.client(service_name)
+    return found
+
+
+def resource(service_name):
+    """Shared service resource; only read from it (Table lookups), never mutate"""
+    found = _resources.get(service_name)
+    if found is None:
+        with _lock:
+            found = _resources.get(service_name)
+            if found is None:
+                import boto3
+                found = _resources[service_name] = boto3.resource(service_name)
+    return found
+
+
+def table(table_name):
+    """Shared DynamoDB Table resource for a table name"""
+    found = _tables.get(table_name)
+    if found is None:
+        dynamodb = resource('dynamodb')
+        with _lock:
+            found = _tables.get(table_name)
+            if found is None:
+                found = _tables[table_name] = dynamodb.Table(table_name)
+    return found
+
+
+def wire_table(table_name):
+    """
+    Shared read-only WireTable for a table name: same query/scan/get_item
+    interface as table(), numbers decoded straight to int/float
+    """
+    found = _wire_tables.get(table_name)
+    if found is None:
+        dynamodb = client('dynamodb')
+        with _lock:
+            found = _wire_tables.get(table_name)
+            if found is None:
+                from mission_mischief.wire import WireTable
+                found = _wire_tables[table_name] = WireTable(dynamodb, table_name)
+    return found
+
+
+def created():
+    """Names of everything built so far, e.g. for cold start logging"""
+    return {
+        'clients': sorted(_clients),
+        'resources': sorted(_resources),
+        'tables': sorted(_tables),
+        'wire_tables': sorted(_wire_tables)
+    }
+
+
+def reset():
+    """Forget every memoized client (tests, credential rotation)"""
+    with _lock:
+        _clients.clear()
+        _resources.clear()
+        _tables.clear()
+        _wire_tables.clear()
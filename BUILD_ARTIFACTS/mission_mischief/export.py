@@ -0,0 +1,209 @@
+"""
+Mission Mischief - bulk research export
+Streams post rows as gzip NDJSON or CSV into S3 objects partitioned by UTC
+day. Each object is gzipped incrementally and uploaded in multipart parts as
+it grows, so memory stays bounded by the buffered parts, not the export size.
+
+Layout under the export prefix:
+    day=YYYY-MM-DD/part-00000.ndjson.gz   (part-00001, ... if a day is split)
+    manifest.json                         files, row counts, completeness
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import zlib
+from decimal import Decimal
+
+from mission_mischief.timekeys import day_bucket
+
+logger = logging.getLogger()
+
+# S3 multipart parts must be at least 5 MB (except the last)
+EXPORT_PART_BYTES = int(os.environ.get('EXPORT_PART_BYTES', str(8 * 1024 * 1024)))
+# Compressed bytes held across all open files before the largest is closed early
+EXPORT_BUFFER_BYTES = int(os.environ.get('EXPORT_BUFFER_BYTES', str(64 * 1024 * 1024)))
+EXPORT_COMPRESSION_LEVEL = int(os.environ.get('EXPORT_COMPRESSION_LEVEL', '6'))
+
+FORMATS = ('ndjson', 'csv')
+
+# Plain gzip files, not Content-Encoding: gzip, so downloads stay .gz as named
+CONTENT_TYPE = 'application/gzip'
+
+EXPORT_COLUMNS = (
+    'post_id', 'timestamp', 'day_bucket', 'user', 'mission_id', 'platform',
+    'points', 'city', 'state', 'country', 'post_url', 'source'
+)
+
+# Post attributes export_row reads
+EXPORT_ATTRIBUTES = (
+    'post_id', 'timestamp', 'day_bucket', 'user_handle', 'username', 'mission_id', 'platform',
+    'points', 'city', 'state', 'country', 'post_url', 'proof_url', 'source'
+)
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def export_row(item):
+    """Flat export row for one post (scraped and direct submissions alike)"""
+    return {
+        'post_id': item.get('post_id', ''),
+        'timestamp': item.get('timestamp', ''),
+        'day_bucket': item.get('day_bucket') or day_bucket(item.get('timestamp')),
+        'user': item.get('user_handle') or item.get('username', 'Unknown'),
+        'mission_id': _plain(item.get('mission_id', 0)),
+        'platform': item.get('platform', 'unknown'),
+        'points': _plain(item.get('points', 0)),
+        'city': item.get('city', 'Unknown'),
+        'state': item.get('state', 'Unknown'),
+        'country': item.get('country', 'Unknown'),
+        'post_url': item.get('post_url') or item.get('proof_url') or '',
+        'source': item.get('source', 'scraper')
+    }
+
+
+class S3GzipObject:
+    """
+    One gzip object written incrementally. Compressed output is buffered
+    until a part is full; the first full part switches to a multipart upload,
+    and objects that never fill a part are written with a single PutObject.
+    """
+
+    def __init__(self, s3, bucket, key, part_bytes=EXPORT_PART_BYTES, level=EXPORT_COMPRESSION_LEVEL):
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.part_bytes = part_bytes
+        # wbits 31: gzip container
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = []
+        self.rows = 0
+        self.raw_bytes = 0
+        self.bytes = 0
+
+    def write(self, data):
+        self.raw_bytes += len(data)
+        self.buffer += self.compressor.compress(data)
+        if len(self.buffer) >= self.part_bytes:
+            self._upload_part()
+
+    def _upload_part(self):
+        if self.upload_id is None:
+            self.upload_id = self.s3.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=CONTENT_TYPE
+            )['UploadId']
+        number = len(self.parts) + 1
+        response = self.s3.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=bytes(self.buffer)
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': number})
+        self.bytes += len(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        """Flush the gzip trailer and finish the upload"""
+        self.buffer += self.compressor.flush()
+        if self.upload_id is None:
+            self.s3.put_object(
+                Bucket=self.bucket, Key=self.key, Body=bytes(self.buffer), ContentType=CONTENT_TYPE
+            )
+            self.bytes += len(self.buffer)
+            self.buffer.clear()
+        else:
+            self._upload_part()
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                MultipartUpload={'Parts': self.parts}
+            )
+        return self.bytes
+
+    def abort(self):
+        """Drop an unfinished multipart upload so its parts stop costing storage"""
+        if self.upload_id is not None:
+            try:
+                self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            except Exception as e:
+                logger.error(f"Failed to abort multipart upload of {self.key}: {e}")
+
+
+class PartitionedExport:
+    """
+    Routes rows to one open S3GzipObject per day. Rows arrive in scan order
+    (days interleaved), so when the compressed bytes buffered across open
+    objects pass buffer_bytes the largest is closed and that day continues
+    in its next part file.
+    """
+
+    def __init__(self, s3, bucket, prefix, fmt='ndjson', part_bytes=EXPORT_PART_BYTES,
+                 buffer_bytes=EXPORT_BUFFER_BYTES):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}")
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix.rstrip('/')
+        self.fmt = fmt
+        self.part_bytes = part_bytes
+        self.buffer_bytes = buffer_bytes
+        self.open = {}
+        self.sequence = {}
+        self.files = []
+        self.rows = 0
+        self.buffered = 0
+
+    def _encode(self, row):
+        if self.fmt == 'ndjson':
+            return (json.dumps(row, separators=(',', ':')) + '\n').encode('utf-8')
+        line = io.StringIO()
+        csv.writer(line).writerow([row[column] for column in EXPORT_COLUMNS])
+        return line.getvalue().encode('utf-8')
+
+    def _open(self, day):
+        number = self.sequence.get(day, 0)
+        self.sequence[day] = number + 1
+        key = f"{self.prefix}/day={day}/part-{number:05d}.{self.fmt}.gz"
+        obj = self.open[day] = S3GzipObject(self.s3, self.bucket, key, self.part_bytes)
+        if self.fmt == 'csv':
+            obj.write((','.join(EXPORT_COLUMNS) + '\r\n').encode('utf-8'))
+        return obj
+
+    def _close(self, day):
+        obj = self.open.pop(day)
+        self.buffered -= len(obj.buffer)
+        obj.close()
+        self.files.append({'key': obj.key, 'day': day, 'rows': obj.rows, 'bytes': obj.bytes,
+                           'uncompressed_bytes': obj.raw_bytes})
+
+    def add(self, item):
+        row = export_row(item)
+        day = row['day_bucket']
+        obj = self.open.get(day)
+        before = len(obj.buffer) if obj else 0
+        if obj is None:
+            obj = self._open(day)
+        obj.write(self._encode(row))
+        obj.rows += 1
+        self.rows += 1
+        self.buffered += len(obj.buffer) - before
+
+        if self.buffered > self.buffer_bytes:
+            largest = max(self.open, key=lambda d: len(self.open[d].buffer))
+            self._close(largest)
+
+    def finish(self):
+        """Close every open object; returns the written files sorted by key"""
+        for day in list(self.open):
+            self._close(day)
+        return sorted(self.files, key=lambda f: f['key'])
+
+    def abort(self):
+        for obj in self.open.values():
+            obj.abort()
+        self.open.clear()
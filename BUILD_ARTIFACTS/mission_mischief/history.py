@@ -0,0 +1,227 @@
+"""
+Mission Mischief - admin metric history
+Rolling time series of dashboard numbers for trend charts. One object per
+month holds a timestamp column (uint32 epoch seconds), a sample count column
+(uint16: how many raw samples a row stands for) and one float32 column per
+metric, so a row costs 6 + 4 * metrics bytes. Older samples are downsampled
+to hourly and then daily resolution on every write; 'mean' metrics are
+combined weighted by the rows' sample counts, so a collapsed row weighs as
+much as the samples it replaced.
+
+Object layout (little endian):
+    header   4s magic 'MMTS', B version, B metric count, I row count
+    names    per metric: B length, utf-8 name
+    columns  timestamps (rows x uint32), counts (rows x uint16, version 2+),
+             then each metric (rows x float32)
+Version 1 objects have no counts column and read with every count 1.
+"""
+
+import math
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+
+MAGIC = b'MMTS'
+FORMAT_VERSION = 2
+MAX_COUNT = 0xFFFF
+HEADER = struct.Struct('<4sBBI')
+
+# metric name -> how samples collapse into one when downsampling
+METRICS = {
+    'cost_month_to_date': 'last',
+    'invocations_24h': 'mean',
+    'errors_24h': 'mean',
+    'posts_today': 'max',
+    'active_players': 'max'
+}
+
+HOUR = 3600
+DAY = 86400
+
+# (max age in seconds, bucket width): raw samples for 2 days, hourly for 14, then daily
+DOWNSAMPLE_POLICY = (
+    (2 * DAY, None),
+    (14 * DAY, HOUR),
+    (None, DAY)
+)
+
+NAN = float('nan')
+
+
+def month_key(ts):
+    """'YYYY-MM' of an epoch timestamp (UTC)"""
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m')
+
+
+def bucket_width(age):
+    for max_age, width in DOWNSAMPLE_POLICY:
+        if max_age is None or age < max_age:
+            return width
+    return DAY
+
+
+def reduce_values(values, how, counts=None):
+    """
+    Collapse one metric's samples in a bucket, ignoring missing (NaN)
+    samples. counts holds how many raw samples each value stands for and
+    weights 'mean' (default 1 each).
+    """
+    if counts is None:
+        counts = [1] * len(values)
+    present = [(v, c) for v, c in zip(values, counts) if not math.isnan(v)]
+    if not present:
+        return NAN
+    if how == 'last':
+        return present[-1][0]
+    if how == 'max':
+        return max(v for v, _ in present)
+    return sum(v * c for v, c in present) / sum(c for _, c in present)
+
+
+class MetricHistory:
+    """Column-oriented samples for a fixed set of metrics, sorted by timestamp"""
+
+    def __init__(self, metrics=None):
+        self.metrics = list(metrics or METRICS)
+        self.timestamps = array('I')
+        self.counts = array('H')
+        self.columns = {metric: array('f') for metric in self.metrics}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, ts, values):
+        """Add one sample; metrics missing from values are stored as NaN"""
+        ts = int(ts)
+        if self.timestamps and ts <= self.timestamps[-1]:
+            raise ValueError(f"Sample at {ts} is not after the last sample {self.timestamps[-1]}")
+        self.timestamps.append(ts)
+        self.counts.append(1)
+        for metric in self.metrics:
+            value = values.get(metric)
+            self.columns[metric].append(NAN if value is None else float(value))
+
+    def downsample(self, now):
+        """Apply DOWNSAMPLE_POLICY in place; idempotent for already collapsed buckets"""
+        return self._collapse(lambda ts: bucket_width(now - ts))
+
+    def compact(self):
+        """Collapse everything to daily resolution (a month that will not be written again)"""
+        return self._collapse(lambda ts: DAY)
+
+    def _collapse(self, width_for):
+        timestamps = array('I')
+        counts = array('H')
+        columns = {metric: array('f') for metric in self.metrics}
+        group = []
+        group_key = None
+
+        def flush():
+            if not group:
+                return
+            group_counts = [self.counts[i] for i in group]
+            timestamps.append(group_key[1])
+            counts.append(min(sum(group_counts), MAX_COUNT))
+            for metric in self.metrics:
+                column = self.columns[metric]
+                columns[metric].append(
+                    reduce_values([column[i] for i in group], METRICS.get(metric, 'mean'), group_counts)
+                )
+
+        for i, ts in enumerate(self.timestamps):
+            width = width_for(ts)
+            key = (width, ts if width is None else ts - ts % width)
+            if key != group_key:
+                flush()
+                group = []
+                group_key = key
+            group.append(i)
+        flush()
+
+        self.timestamps = timestamps
+        self.counts = counts
+        self.columns = columns
+        return self
+
+    def series(self, metric, since=None):
+        """[(ts, value, count)] for one metric, NaN samples skipped"""
+        column = self.columns.get(metric)
+        if column is None:
+            return []
+        return [
+            (ts, value, count) for ts, value, count in zip(self.timestamps, column, self.counts)
+            if (since is None or ts >= since) and not math.isnan(value)
+        ]
+
+    def to_bytes(self):
+        parts = [HEADER.pack(MAGIC, FORMAT_VERSION, len(self.metrics), len(self.timestamps))]
+        for metric in self.metrics:
+            name = metric.encode('utf-8')
+            parts.append(struct.pack('<B', len(name)) + name)
+        for column in [self.timestamps, self.counts] + [self.columns[metric] for metric in self.metrics]:
+            if sys.byteorder == 'big':
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, metric_count, rows = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or not 1 <= version <= FORMAT_VERSION:
+            raise ValueError('Not a metric history object')
+        offset = HEADER.size
+        metrics = []
+        for _ in range(metric_count):
+            length = data[offset]
+            metrics.append(data[offset + 1:offset + 1 + length].decode('utf-8'))
+            offset += 1 + length
+
+        def column(typecode):
+            nonlocal offset
+            values = array(typecode)
+            size = values.itemsize * rows
+            values.frombytes(data[offset:offset + size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            offset += size
+            return values
+
+        history = cls(metrics)
+        history.timestamps = column('I')
+        history.counts = column('H') if version >= 2 else array('H', [1] * rows)
+        for metric in metrics:
+            history.columns[metric] = column('f')
+
+        # Metrics added since this object was written read as missing
+        for metric in METRICS:
+            if metric not in history.columns:
+                history.metrics.append(metric)
+                history.columns[metric] = array('f', [NAN] * rows)
+        return history
+
+
+def trend(histories, days, now, width=DAY):
+    """
+    Sparkline payload over the last `days` days from monthly histories:
+    one point per `width` seconds per metric (None where nothing was recorded).
+    """
+    start = now - days * DAY
+    start -= start % width
+    buckets = list(range(start, now + 1, width))
+    index = {ts: i for i, ts in enumerate(buckets)}
+    series = {}
+
+    for metric, how in METRICS.items():
+        grouped = [([], []) for _ in buckets]
+        for history in histories:
+            for ts, value, count in history.series(metric, since=start):
+                i = index.get(ts - ts % width)
+                if i is not None:
+                    grouped[i][0].append(value)
+                    grouped[i][1].append(count)
+        values = [reduce_values(values, how, counts) for values, counts in grouped]
+        series[metric] = [None if math.isnan(v) else round(v, 4) for v in values]
+
+    return {'days': days, 'resolution_seconds': width, 'timestamps': buckets, 'series': series}
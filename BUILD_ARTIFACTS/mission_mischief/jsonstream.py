@@ -0,0 +1,40 @@
+"""
+Mission Mischief - incremental JSON writer
+Encodes a response envelope whose row list comes from an iterator, yielding
+str chunks as rows arrive, so a generator pipeline (scan pages -> reshape ->
+encode -> compress) never holds the row list or the full JSON text.
+"""
+
+import json
+
+ROWS_PER_CHUNK = 500
+
+_encoder = json.JSONEncoder()
+
+
+def iter_json(envelope, rows, key='data', trailer=None, rows_per_chunk=ROWS_PER_CHUNK):
+    """
+    Chunks of the JSON text of `envelope` with `key` holding every row of
+    `rows`. `trailer` is an optional callable taking the row count and
+    returning fields only known once the rows are exhausted; they follow
+    the rows.
+    Output matches json.dumps of the equivalent dict (default separators).
+    """
+    head = _encoder.encode(envelope)
+    yield (head[:-1] + ', ' if envelope else '{') + _encoder.encode(key) + ': ['
+
+    batch = []
+    first = True
+    count = 0
+    for row in rows:
+        count += 1
+        batch.append(_encoder.encode(row))
+        if len(batch) >= rows_per_chunk:
+            yield ('' if first else ', ') + ', '.join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield ('' if first else ', ') + ', '.join(batch)
+
+    tail = _encoder.encode(trailer(count)) if trailer else '{}'
+    yield ']' + (', ' + tail[1:] if tail != '{}' else '}')
@@ -0,0 +1,171 @@
+"""
+Mission Mischief - outbound HTTP client
+One keep-alive requests.Session per container for third-party APIs
+(Bright Data, Lemon Squeezy): per-host urllib3 connection pools that survive
+warm invocations, default connect/read timeouts, retry with backoff, and
+counters for connection reuse and TCP/TLS handshake time.
+
+Import this lazily from the routes that call out; it pulls in requests.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import Retry
+
+logger = logging.getLogger()
+
+OUTBOUND_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('OUTBOUND_CONNECT_TIMEOUT_SECONDS', '3.05'))
+OUTBOUND_READ_TIMEOUT_SECONDS = float(os.environ.get('OUTBOUND_READ_TIMEOUT_SECONDS', '10'))
+OUTBOUND_RETRIES = int(os.environ.get('OUTBOUND_RETRIES', '2'))
+OUTBOUND_BACKOFF_FACTOR = float(os.environ.get('OUTBOUND_BACKOFF_FACTOR', '0.3'))
+OUTBOUND_POOL_MAXSIZE = int(os.environ.get('OUTBOUND_POOL_MAXSIZE', '4'))
+OUTBOUND_POOL_HOSTS = 10
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ConnectionStats:
+    """Per-host request/connection counters, shared by every pool in the process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _host(self, host):
+        return self._hosts.setdefault(host, {
+            'requests': 0,
+            'new_connections': 0,
+            'tcp_ms_total': 0.0,
+            'tls_ms_total': 0.0
+        })
+
+    def record_request(self, host):
+        with self._lock:
+            self._host(host)['requests'] += 1
+
+    def record_connection(self, host, tcp_ms, tls_ms):
+        with self._lock:
+            stats = self._host(host)
+            stats['new_connections'] += 1
+            stats['tcp_ms_total'] += tcp_ms
+            stats['tls_ms_total'] += tls_ms
+
+    def snapshot(self):
+        """Per-host counters with reuse rate and average handshake times"""
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                connections = stats['new_connections']
+                result[host] = {
+                    'requests': stats['requests'],
+                    'new_connections': connections,
+                    'reuse_rate': round(1 - connections / stats['requests'], 3) if stats['requests'] else None,
+                    'avg_tcp_ms': round(stats['tcp_ms_total'] / connections, 1) if connections else None,
+                    'avg_tls_ms': round(stats['tls_ms_total'] / connections, 1) if connections else None
+                }
+            return result
+
+
+connection_stats = ConnectionStats()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """Records TCP connect time for every new (non-reused) connection"""
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        sock = super()._new_conn()
+        self._tcp_ms = (time.perf_counter() - started) * 1000
+        return sock
+
+    def connect(self):
+        self._tcp_ms = 0.0
+        started = time.perf_counter()
+        super().connect()
+        total_ms = (time.perf_counter() - started) * 1000
+        tls_ms = total_ms - self._tcp_ms if isinstance(self, HTTPSConnection) else 0.0
+        connection_stats.record_connection(self.host, self._tcp_ms, tls_ms)
+        logger.info(f"New outbound connection to {self.host} (tcp {self._tcp_ms:.0f} ms, tls {tls_ms:.0f} ms)")
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    """HTTPS variant; connect() time beyond the TCP connect is the TLS handshake"""
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose PoolManager builds instrumented per-host pools"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+
+class OutboundSession(requests.Session):
+    """requests.Session that applies default timeouts and counts requests per host"""
+
+    def __init__(self, timeout=None):
+        super().__init__()
+        self.default_timeout = timeout or (OUTBOUND_CONNECT_TIMEOUT_SECONDS, OUTBOUND_READ_TIMEOUT_SECONDS)
+
+        # Connect errors are retried for any method (nothing was sent yet);
+        # read errors and retryable statuses only for idempotent methods
+        retry = Retry(
+            total=OUTBOUND_RETRIES,
+            connect=OUTBOUND_RETRIES,
+            read=OUTBOUND_RETRIES,
+            status=OUTBOUND_RETRIES,
+            backoff_factor=OUTBOUND_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = PooledAdapter(
+            pool_connections=OUTBOUND_POOL_HOSTS,
+            pool_maxsize=OUTBOUND_POOL_MAXSIZE,
+            max_retries=retry
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        response = super().request(method, url, **kwargs)
+        connection_stats.record_request(requests.utils.urlparse(response.url or url).hostname)
+        return response
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """The container-wide outbound session, created on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = OutboundSession()
+    return _session
+
+
+def get_stats():
+    """Connection reuse and handshake stats since the container started"""
+    return connection_stats.snapshot()
@@ -0,0 +1,185 @@
+"""
+Mission Mischief - posts table access
+Table/index names and paginated readers for mission-mischief-posts
+"""
+
+import base64
+import heapq
+import json
+import os
+import zlib
+from datetime import datetime
+
+from mission_mischief.timekeys import epoch_millis
+
+POSTS_TABLE = os.environ.get('POSTS_TABLE', 'mission-mischief-posts')
+
+# GSI (day_bucket HASH, timestamp RANGE) - one partition per UTC day
+DAY_BUCKET_INDEX = 'day_bucket-timestamp-index'
+
+# GSI (time_shard HASH, ts_ms RANGE) - every post in time order, spread over
+# TIME_SHARDS partitions; readers merge the shards (iter_newest_first).
+# Shards can be added (readers query every shard below the count) but never
+# removed without rewriting the items in the dropped shards.
+TIME_INDEX = 'time_shard-ts_ms-index'
+TIME_SHARDS = int(os.environ.get('POST_TIME_SHARDS', '8'))
+
+# Writers set ttl = write time + 90 days
+POST_TTL_DAYS = 90
+
+# LastEvaluatedKey of a day bucket index query: index keys plus the table key
+CURSOR_KEY_ATTRIBUTES = {'post_id', 'day_bucket', 'timestamp'}
+
+
+def written_at(item):
+    """Epoch seconds a posts item was written, derived from its ttl; None without one"""
+    if not item.get('ttl'):
+        return None
+    return int(item['ttl']) - POST_TTL_DAYS * 86400
+
+
+def time_keys(post_id, timestamp=None):
+    """Time index attributes every posts writer stores: {'time_shard', 'ts_ms'}"""
+    # crc32, not hash(): the shard must be the same in every process
+    return {
+        'time_shard': zlib.crc32(str(post_id).encode('utf-8')) % TIME_SHARDS,
+        'ts_ms': epoch_millis(timestamp)
+    }
+
+
+def query_all(table, **query_kwargs):
+    """Yield every item of a Query, following LastEvaluatedKey to completion"""
+    while True:
+        response = table.query(**query_kwargs)
+        for item in response.get('Items', []):
+            yield item
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        query_kwargs['ExclusiveStartKey'] = last_key
+
+
+def iter_day_bucket(table, bucket, newest_first=False, **query_kwargs):
+    """Yield the posts written for one UTC day via the day bucket index"""
+    from boto3.dynamodb.conditions import Key
+
+    return query_all(
+        table,
+        IndexName=DAY_BUCKET_INDEX,
+        KeyConditionExpression=Key('day_bucket').eq(bucket),
+        ScanIndexForward=not newest_first,
+        **query_kwargs
+    )
+
+
+def query_day_page(table, bucket, limit, start_key=None, newest_first=True, **query_kwargs):
+    """
+    One bounded page of a day bucket: (items, last_key). last_key is None
+    once the day is exhausted; items may be short of limit before that.
+    """
+    from boto3.dynamodb.conditions import Key
+
+    kwargs = dict(query_kwargs)
+    kwargs.update({
+        'IndexName': DAY_BUCKET_INDEX,
+        'KeyConditionExpression': Key('day_bucket').eq(bucket),
+        'ScanIndexForward': not newest_first,
+        'Limit': limit
+    })
+    if start_key:
+        kwargs['ExclusiveStartKey'] = start_key
+    response = table.query(**kwargs)
+    return response.get('Items', []), response.get('LastEvaluatedKey')
+
+
+def iter_time_shard(table, shard, newest_first=True, since_ms=None, until_ms=None, page_size=100,
+                    **query_kwargs):
+    """
+    Yield one time shard's posts in ts_ms order, optionally within
+    [since_ms, until_ms]. Pages start at page_size and double (up to 1000)
+    while the shard keeps being read, so a merge that only needs the head
+    of each shard reads little from each.
+    """
+    from boto3.dynamodb.conditions import Key
+
+    condition = Key('time_shard').eq(shard)
+    if since_ms is not None and until_ms is not None:
+        condition = condition & Key('ts_ms').between(since_ms, until_ms)
+    elif since_ms is not None:
+        condition = condition & Key('ts_ms').gte(since_ms)
+    elif until_ms is not None:
+        condition = condition & Key('ts_ms').lte(until_ms)
+
+    kwargs = dict(query_kwargs)
+    kwargs.update({
+        'IndexName': TIME_INDEX,
+        'KeyConditionExpression': condition,
+        'ScanIndexForward': not newest_first
+    })
+    while True:
+        kwargs['Limit'] = page_size
+        response = table.query(**kwargs)
+        for item in response.get('Items', []):
+            yield item
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_key
+        page_size = min(page_size * 2, 1000)
+
+
+def iter_newest_first(table, since_ms=None, until_ms=None, page_size=100, shards=TIME_SHARDS, **query_kwargs):
+    """
+    Every post newest first: a lazy k-way heapq.merge of the time shards, so
+    the stream is globally ordered by ts_ms while holding one page per shard.
+    Items must carry ts_ms (include it in any projection).
+    """
+    streams = [
+        iter_time_shard(table, shard, True, since_ms, until_ms, page_size, **query_kwargs)
+        for shard in range(shards)
+    ]
+    return heapq.merge(*streams, key=lambda item: item['ts_ms'], reverse=True)
+
+
+def encode_cursor(bucket, start_key=None):
+    """Opaque paging cursor: the day bucket to resume in and the index key to resume after"""
+    state = {'d': bucket}
+    if start_key:
+        state['k'] = start_key
+    raw = json.dumps(state, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(bucket, start_key) from encode_cursor; ValueError if it wasn't issued by us"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        bucket = state['d']
+        start_key = state.get('k')
+        datetime.strptime(bucket, '%Y-%m-%d')
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if start_key is not None and (
+        not isinstance(start_key, dict) or set(start_key) != CURSOR_KEY_ATTRIBUTES or start_key['day_bucket'] != bucket
+    ):
+        raise ValueError('Invalid cursor')
+    return bucket, start_key
+
+
+def encode_time_cursor(ts_ms, post_ids):
+    """Cursor into iter_newest_first: resume at ts_ms, skipping the posts already returned at that millisecond"""
+    raw = json.dumps({'t': ts_ms, 'p': sorted(post_ids)}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_time_cursor(cursor):
+    """(ts_ms, post_ids) from encode_time_cursor; ValueError if it wasn't issued by us"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        ts_ms = state['t']
+        post_ids = set(state['p'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(ts_ms, int) or not all(isinstance(post_id, str) for post_id in post_ids):
+        raise ValueError('Invalid cursor')
+    return ts_ms, post_ids
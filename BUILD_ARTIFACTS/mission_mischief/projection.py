@@ -0,0 +1,28 @@
+"""
+Mission Mischief - read projections
+Readers declare the attributes they use and ask for only those instead of
+whole items (e.g. the raw post text body that no API emits). This trims the
+response and the deserialization work; read capacity is still charged on
+the full item (or index item) read.
+"""
+
+
+def projection(attributes, **request_kwargs):
+    """
+    Query/Scan/GetItem kwargs returning only `attributes`. Every name goes
+    through a #p<n> placeholder (reserved words like timestamp, source and
+    count are common here) and is merged with any ExpressionAttributeNames
+    already in request_kwargs.
+    """
+    names = dict(request_kwargs.get('ExpressionAttributeNames') or {})
+    placeholders = []
+    for i, attribute in enumerate(dict.fromkeys(attributes)):
+        placeholder = f"#p{i}"
+        if placeholder in names and names[placeholder] != attribute:
+            raise ValueError(f"Placeholder {placeholder} is already bound to {names[placeholder]}")
+        names[placeholder] = attribute
+        placeholders.append(placeholder)
+
+    request_kwargs['ProjectionExpression'] = ', '.join(placeholders)
+    request_kwargs['ExpressionAttributeNames'] = names
+    return request_kwargs
@@ -0,0 +1,168 @@
+"""
+Mission Mischief - research query planning
+Parses research filters (time window, mission, state, city, platform) and
+picks the cheapest way to answer them from the maintained counters and the
+indexes the posts table actually has:
+
+    counters   sum the aggregates day# counters (count without attribute filters)
+    day_index  Query the day_bucket-timestamp-index for the days in the window,
+               attribute filters pushed down as a FilterExpression
+    scan       filtered ParallelScan (count over the whole table)
+
+Estimated reads come from the per-day counters when the read model exists.
+Ordered reads over the time shard index take the window as ts_ms bounds
+(window_millis) and may filter client side (matches).
+"""
+
+from datetime import datetime, time, timezone
+
+from mission_mischief.timekeys import epoch_millis, parse_timestamp
+
+ATTRIBUTE_FILTERS = ('mission_id', 'state', 'city', 'platform')
+
+# Direct submissions carry no platform attribute, only the proof URL
+PLATFORM_DOMAINS = {
+    'instagram': ('instagram.com',),
+    'facebook': ('facebook.com',),
+    'x': ('x.com', 'twitter.com')
+}
+
+
+def _parse_bound(value, end_of_day):
+    """since/until value: a YYYY-MM-DD day (whole day) or any timestamp timekeys accepts"""
+    if len(value) == 10:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+        return datetime.combine(day, time.max if end_of_day else time.min, tzinfo=timezone.utc)
+    parsed = parse_timestamp(value)
+    if parsed is None:
+        raise ValueError(f"Invalid time {value!r}")
+    return parsed
+
+
+def parse_filters(params):
+    """
+    Research filters from query string parameters. Raises ValueError on a
+    malformed value; returns {} when nothing is filtered.
+    """
+    filters = {}
+    for name, end_of_day in (('since', False), ('until', True)):
+        if params.get(name):
+            try:
+                filters[name] = _parse_bound(params[name], end_of_day)
+            except ValueError:
+                raise ValueError(f"{name} must be a date (YYYY-MM-DD) or ISO timestamp")
+    if 'since' in filters and 'until' in filters and filters['since'] > filters['until']:
+        raise ValueError('since is after until')
+
+    if params.get('mission_id'):
+        try:
+            filters['mission_id'] = int(params['mission_id'])
+        except ValueError:
+            raise ValueError('mission_id must be an integer')
+    for name in ('state', 'city'):
+        if params.get(name):
+            filters[name] = params[name]
+    if params.get('platform'):
+        if params['platform'] not in PLATFORM_DOMAINS:
+            raise ValueError(f"platform must be one of {', '.join(PLATFORM_DOMAINS)}")
+        filters['platform'] = params['platform']
+    return filters
+
+
+def has_attribute_filters(filters):
+    return any(name in filters for name in ATTRIBUTE_FILTERS)
+
+
+def filter_kwargs(filters):
+    """FilterExpression for the attribute filters, or {} (applied server side to every path)"""
+    from boto3.dynamodb.conditions import Attr
+
+    conditions = []
+    if 'mission_id' in filters:
+        conditions.append(Attr('mission_id').eq(filters['mission_id']))
+    for name in ('state', 'city'):
+        if name in filters:
+            conditions.append(Attr(name).eq(filters[name]))
+    if 'platform' in filters:
+        platform = Attr('platform').eq(filters['platform'])
+        for domain in PLATFORM_DOMAINS[filters['platform']]:
+            platform = platform | Attr('proof_url').contains(domain)
+        conditions.append(platform)
+
+    if not conditions:
+        return {}
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return {'FilterExpression': expression}
+
+
+def matches(item, filters):
+    """The attribute filters of filter_kwargs, checked on an item already read"""
+    if 'mission_id' in filters and item.get('mission_id') != filters['mission_id']:
+        return False
+    for name in ('state', 'city'):
+        if name in filters and item.get(name) != filters[name]:
+            return False
+    if 'platform' in filters and item.get('platform') != filters['platform']:
+        proof_url = item.get('proof_url') or ''
+        return any(domain in proof_url for domain in PLATFORM_DOMAINS[filters['platform']])
+    return True
+
+
+def window_millis(filters):
+    """(since_ms, until_ms) time index bounds of the window, None where open"""
+    return (
+        epoch_millis(filters['since']) if 'since' in filters else None,
+        epoch_millis(filters['until']) if 'until' in filters else None
+    )
+
+
+def in_window(item, filters):
+    """Exact time window check for posts read from a boundary day"""
+    if 'since' not in filters and 'until' not in filters:
+        return True
+    posted = parse_timestamp(item.get('timestamp'))
+    if posted is None:
+        return False
+    return filters.get('since', posted) <= posted <= filters.get('until', posted)
+
+
+def window_days(days, filters):
+    """The candidate day buckets (any order) that overlap the time window"""
+    first = filters['since'].strftime('%Y-%m-%d') if 'since' in filters else None
+    last = filters['until'].strftime('%Y-%m-%d') if 'until' in filters else None
+    return [day for day in days if (first is None or day >= first) and (last is None or day <= last)]
+
+
+def whole_days(filters):
+    """True if the window (if any) starts and ends on UTC day boundaries"""
+    since, until = filters.get('since'), filters.get('until')
+    return (since is None or since.time() == time.min) and (until is None or until.time() == time.max)
+
+
+def plan_query(filters, days, counts=None, ordered=True):
+    """
+    Pick the read path for a research request. `days` are the candidate day
+    buckets (from the counters, or every day inside the post TTL), `counts`
+    the read_post_counts result or None. Ordered (paged) results always walk
+    the day index newest first; counts take whichever path reads least.
+    Returns {'path', 'days', 'estimated_reads'} (estimate None without counters).
+    """
+    days = sorted(window_days(days, filters), reverse=True)
+    by_day = counts['days'] if counts is not None else None
+    index_reads = sum(by_day.get(day, 0) for day in days) if by_day is not None else None
+    windowed = 'since' in filters or 'until' in filters
+
+    if ordered:
+        path = 'day_index'
+    elif counts is not None and not has_attribute_filters(filters) and whole_days(filters):
+        return {'path': 'counters', 'days': days, 'estimated_reads': 0}
+    elif windowed and (index_reads is None or index_reads < counts['posts_total']):
+        path = 'day_index'
+    else:
+        # Nothing narrows the partitions: a parallel scan reads the same items faster
+        path = 'scan'
+
+    estimated = index_reads if path == 'day_index' else (counts['posts_total'] if counts is not None else None)
+    return {'path': path, 'days': days, 'estimated_reads': estimated}
@@ -0,0 +1,194 @@
+"""
+Mission Mischief - HTTP response helpers
+Negotiates gzip/deflate from Accept-Encoding and compresses large JSON
+bodies of API Gateway proxy responses (base64 + isBase64Encoded), either
+whole (compress_response) or as they are generated (stream_response)
+
+Compression is off unless RESPONSE_COMPRESSION=true. A REST API only
+passes base64 bodies through as binary when its binaryMediaTypes covers
+the response (e.g. '*/*'); without that the client receives the base64
+text labelled Content-Encoding: gzip. Configure the API first, then set
+the flag on the handler.
+"""
+
+import base64
+import gzip
+import logging
+import os
+import zlib
+
+logger = logging.getLogger()
+
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', 'false').lower() == 'true'
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', '6'))
+
+# API Gateway rejects proxy responses above 6 MB
+API_GATEWAY_PAYLOAD_LIMIT = 6 * 1024 * 1024
+
+# Preferred first when the client weights them equally
+SUPPORTED_ENCODINGS = ('gzip', 'deflate')
+
+
+def get_header(event, name):
+    """Case-insensitive request header lookup on a proxy event"""
+    name = name.lower()
+    for key, value in ((event or {}).get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    for key, values in ((event or {}).get('multiValueHeaders') or {}).items():
+        if key.lower() == name and values:
+            return ','.join(values)
+    return None
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick gzip or deflate from an Accept-Encoding header value, honoring
+    q-values (q=0 refuses a coding) and '*'. Returns None for identity.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress_bytes(data, encoding, level=COMPRESSION_LEVEL):
+    """gzip, or HTTP 'deflate' (zlib-wrapped) as browsers expect it"""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return zlib.compress(data, level)
+
+
+def compress_response(event, response, min_bytes=COMPRESSION_MIN_BYTES, level=COMPRESSION_LEVEL):
+    """
+    Compress a proxy response dict in place when compression is enabled,
+    the client accepts it and the body is at least min_bytes. Small bodies,
+    already-binary bodies and compressions that don't shrink the payload
+    are returned unchanged.
+    """
+    body = response.get('body')
+    if not isinstance(body, str) or response.get('isBase64Encoded'):
+        return response
+
+    raw = body.encode('utf-8')
+    encoding = negotiate_encoding(get_header(event, 'Accept-Encoding')) if RESPONSE_COMPRESSION else None
+    headers = dict(response.get('headers') or {})
+
+    if encoding and len(raw) >= min_bytes:
+        compressed = compress_bytes(raw, encoding, level)
+        if len(compressed) < len(raw):
+            headers['Content-Encoding'] = encoding
+            headers['Vary'] = 'Accept-Encoding'
+            response['headers'] = headers
+            response['body'] = base64.b64encode(compressed).decode('ascii')
+            response['isBase64Encoded'] = True
+            logger.info(f"Compressed response {len(raw)} -> {len(compressed)} bytes ({encoding})")
+
+    if len(response['body']) > API_GATEWAY_PAYLOAD_LIMIT:
+        logger.warning(f"Response body is {len(response['body'])} bytes, above the API Gateway 6 MB limit")
+    return response
+
+
+class ResponseTooLarge(Exception):
+    """A streamed body grew past the API Gateway payload limit"""
+
+
+def stream_response(event, status_code, headers, chunks, level=COMPRESSION_LEVEL, limit=API_GATEWAY_PAYLOAD_LIMIT):
+    """
+    Proxy response whose body comes from an iterator of str chunks (e.g.
+    jsonstream.iter_json). Chunks are encoded as they arrive, and compressed
+    when compression is enabled and the client accepts it, so only the
+    response body is ever held, never the full JSON text beside it. Raises
+    ResponseTooLarge as soon as the body can no longer fit under `limit`,
+    before the rest of the chunks are generated.
+    """
+    encoding = negotiate_encoding(get_header(event, 'Accept-Encoding')) if RESPONSE_COMPRESSION else None
+    compressor = None
+    if encoding:
+        # wbits 31: gzip container, 15: zlib-wrapped deflate
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31 if encoding == 'gzip' else 15)
+    # base64 grows the compressed body by 4/3
+    max_bytes = limit * 3 // 4 if compressor else limit
+
+    out = bytearray()
+    raw_bytes = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        raw_bytes += len(data)
+        out += compressor.compress(data) if compressor else data
+        if len(out) > max_bytes:
+            raise ResponseTooLarge(f"Body passed {len(out)} bytes after {raw_bytes} bytes of JSON")
+    if compressor:
+        out += compressor.flush()
+        if len(out) > max_bytes:
+            raise ResponseTooLarge(f"Body is {len(out)} bytes compressed")
+
+    response = {'statusCode': status_code, 'headers': dict(headers)}
+    if compressor:
+        response['headers']['Content-Encoding'] = encoding
+        response['headers']['Vary'] = 'Accept-Encoding'
+        response['body'] = base64.b64encode(out).decode('ascii')
+        response['isBase64Encoded'] = True
+        logger.info(f"Streamed response {raw_bytes} -> {len(out)} bytes ({encoding})")
+    else:
+        response['body'] = out.decode('utf-8')
+    return response
+
+
+def make_etag(*parts):
+    """
+    Weak validator from a cheap content version (e.g. the aggregates update
+    counter). Weak because bodies carry request timestamps, so equal
+    versions are semantically, not byte-for-byte, identical.
+    """
+    return 'W/"' + '-'.join(str(part) for part in parts) + '"'
+
+
+def etag_matches(event, etag):
+    """True if the request's If-None-Match lists this ETag (weak comparison) or '*'"""
+    header = get_header(event, 'If-None-Match')
+    if not header or not etag:
+        return False
+    wanted = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if (candidate[2:] if candidate.startswith('W/') else candidate) == wanted:
+            return True
+    return False
+
+
+def with_etag(response, etag):
+    """Attach an ETag and make clients revalidate instead of reusing blindly"""
+    if etag:
+        response['headers'] = dict(response.get('headers') or {}, ETag=etag)
+        response['headers']['Cache-Control'] = 'no-cache'
+    return response
+
+
+def not_modified(headers, etag):
+    """Bodyless 304 answering a matching If-None-Match"""
+    return with_etag({'statusCode': 304, 'headers': dict(headers), 'body': ''}, etag)
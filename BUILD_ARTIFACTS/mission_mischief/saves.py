@@ -0,0 +1,37 @@
+"""
+Mission Mischief - cloud save storage formats
+A mission-mischief-saves item holds the game state in one of two formats:
+
+    map    user_data: the state as a nested DynamoDB map (original format)
+    blob   user_blob: compact JSON compressed with zlib in one Binary
+           attribute, tagged with save_format = SAVE_BLOB_FORMAT
+
+Blobs are a fraction of the map's size (every nested name and type marker
+counts toward the item size DynamoDB bills), and skip the per-value
+Decimal conversion both ways. decode_save reads either format.
+"""
+
+import json
+import os
+import zlib
+
+SAVE_BLOB_FORMAT = 'zlib-json/1'
+SAVE_COMPRESSION_LEVEL = int(os.environ.get('SAVE_COMPRESSION_LEVEL', '6'))
+
+
+def encode_blob(state, level=SAVE_COMPRESSION_LEVEL):
+    """user_blob bytes for a state dict"""
+    return zlib.compress(json.dumps(state, separators=(',', ':')).encode('utf-8'), level)
+
+
+def decode_save(item):
+    """
+    The state stored in a saves item of either format. Raises ValueError for
+    a save_format this code doesn't know (written by a newer deploy).
+    """
+    save_format = item.get('save_format')
+    if save_format is None:
+        return item.get('user_data', {})
+    if save_format == SAVE_BLOB_FORMAT:
+        return json.loads(zlib.decompress(bytes(item['user_blob'])))
+    raise ValueError(f"Unknown save format {save_format!r}")
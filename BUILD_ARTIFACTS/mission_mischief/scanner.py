@@ -0,0 +1,123 @@
+"""
+Mission Mischief - parallel DynamoDB scanner
+Splits a Scan into Segment/TotalSegments workers, follows pagination to
+completion and streams items to the caller as pages arrive
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger()
+
+SCAN_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', '4'))
+
+_PAGE = 'page'
+_DONE = 'done'
+_ERROR = 'error'
+
+
+class ParallelScan:
+    """
+    Iterable parallel scan over a DynamoDB Table resource.
+
+    Iterating yields items in arrival order (not key order). Only a few pages
+    are buffered at a time, so callers can aggregate without holding the
+    whole table in memory. If the deadline (time.monotonic() based) passes,
+    iteration stops early and ``timed_out`` is set; ``complete`` is True only
+    when every segment was read to the end.
+
+    Workers share the table's underlying client, which is thread safe; scan
+    is a stateless action so the Table object itself is never mutated.
+    """
+
+    def __init__(self, table, total_segments=None, max_workers=None, deadline=None, **scan_kwargs):
+        self.table = table
+        self.total_segments = max(total_segments or SCAN_SEGMENTS, 1)
+        self.max_workers = max_workers or self.total_segments
+        self.deadline = deadline
+        self.scan_kwargs = scan_kwargs
+
+        self.complete = False
+        self.timed_out = False
+        self.pages = 0
+        self.scanned_count = 0
+        self.item_count = 0
+        # Items matching the FilterExpression; also set for Select='COUNT' scans, which yield nothing
+        self.matched_count = 0
+
+    def _remaining(self):
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def _scan_segment(self, segment, pages, stop):
+        """Read one segment to completion, handing each page to the consumer"""
+        try:
+            kwargs = dict(self.scan_kwargs, Segment=segment, TotalSegments=self.total_segments)
+            while not stop.is_set():
+                response = self.table.scan(**kwargs)
+                self._put(pages, stop, (_PAGE, response))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    break
+                kwargs['ExclusiveStartKey'] = last_key
+            self._put(pages, stop, (_DONE, segment))
+        except Exception as e:
+            self._put(pages, stop, (_ERROR, e))
+
+    @staticmethod
+    def _put(pages, stop, message):
+        # Bounded queue: block for backpressure, but give up once the consumer stops
+        while not stop.is_set():
+            try:
+                pages.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self):
+        pages = queue.Queue(maxsize=self.total_segments * 2)
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        segments_done = 0
+
+        try:
+            for segment in range(self.total_segments):
+                executor.submit(self._scan_segment, segment, pages, stop)
+
+            while segments_done < self.total_segments:
+                remaining = self._remaining()
+                if remaining is not None and remaining <= 0:
+                    self.timed_out = True
+                    break
+                try:
+                    kind, payload = pages.get(timeout=remaining)
+                except queue.Empty:
+                    self.timed_out = True
+                    break
+
+                if kind == _DONE:
+                    segments_done += 1
+                elif kind == _ERROR:
+                    raise payload
+                else:
+                    self.pages += 1
+                    self.scanned_count += payload.get('ScannedCount', 0)
+                    self.matched_count += payload.get('Count', 0)
+                    for item in payload.get('Items', []):
+                        self.item_count += 1
+                        yield item
+
+            self.complete = segments_done == self.total_segments
+            if self.timed_out:
+                logger.warning(
+                    f"Parallel scan of {self.table.name} hit its time budget after "
+                    f"{self.pages} pages ({segments_done}/{self.total_segments} segments done)"
+                )
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,138 @@
+"""
+Mission Mischief - secrets cache
+Keeps decoded Secrets Manager values in container memory so warm invocations
+don't pay a Secrets Manager round trip (or its per-call cost)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from mission_mischief import clients
+
+logger = logging.getLogger()
+
+SECRETS_CACHE_TTL_SECONDS = int(os.environ.get('SECRETS_CACHE_TTL_SECONDS', '900'))
+SECRETS_REFRESH_AHEAD_SECONDS = int(os.environ.get('SECRETS_REFRESH_AHEAD_SECONDS', '120'))
+SECRETS_FETCH_TIMEOUT_SECONDS = float(os.environ.get('SECRETS_FETCH_TIMEOUT_SECONDS', '2'))
+
+
+class SecretsCache:
+    """
+    TTL cache in front of Secrets Manager.
+
+    - Within the refresh-ahead window before expiry, the cached value is
+      returned and a single background refresh is started.
+    - Concurrent lookups of the same secret share one in-flight fetch.
+    - If a fetch fails or takes longer than fetch_timeout while a previous
+      value exists, the last known value is served instead.
+    """
+
+    def __init__(self, client=None, ttl=SECRETS_CACHE_TTL_SECONDS,
+                 refresh_ahead=SECRETS_REFRESH_AHEAD_SECONDS, fetch_timeout=SECRETS_FETCH_TIMEOUT_SECONDS):
+        self._client = client
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.fetch_timeout = fetch_timeout
+        self._entries = {}
+        self._decoded = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self.stats = {'hits': 0, 'misses': 0, 'refreshes': 0, 'stale_served': 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = clients.client('secretsmanager')
+        return self._client
+
+    def _fetch(self, secret_id):
+        response = self.client.get_secret_value(SecretId=secret_id)
+        value = response['SecretString']
+        with self._lock:
+            self._entries[secret_id] = (value, time.monotonic())
+        return value
+
+    def _start_fetch(self, secret_id):
+        """Start (or join) the single in-flight fetch for a secret"""
+        with self._lock:
+            future = self._inflight.get(secret_id)
+            if future is None:
+                future = self._executor.submit(self._fetch, secret_id)
+                self._inflight[secret_id] = future
+                future.add_done_callback(lambda f: self._clear_inflight(secret_id, f))
+            return future
+
+    def _clear_inflight(self, secret_id, future):
+        with self._lock:
+            if self._inflight.get(secret_id) is future:
+                del self._inflight[secret_id]
+
+    def get_string(self, secret_id):
+        """Raw SecretString for a secret, from cache when possible"""
+        with self._lock:
+            entry = self._entries.get(secret_id)
+
+        if entry:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.stats['hits'] += 1
+                if age >= self.ttl - self.refresh_ahead and secret_id not in self._inflight:
+                    self.stats['refreshes'] += 1
+                    self._start_fetch(secret_id)
+                return value
+
+        self.stats['misses'] += 1
+        future = self._start_fetch(secret_id)
+
+        if entry is None:
+            # Nothing to fall back on; wait for the real answer
+            return future.result()
+
+        try:
+            return future.result(timeout=self.fetch_timeout)
+        except FuturesTimeoutError:
+            logger.warning(f"Secrets Manager slow for {secret_id}, serving last known value")
+        except Exception as e:
+            logger.warning(f"Secrets Manager failed for {secret_id}, serving last known value: {e}")
+        self.stats['stale_served'] += 1
+        return entry[0]
+
+    def get(self, secret_id, parse_json=True):
+        """Decoded secret (JSON by default); decoded values are shared, don't mutate them"""
+        value = self.get_string(secret_id)
+        if not parse_json:
+            return value
+        decoded = self._decoded.get(secret_id)
+        if decoded is None or decoded[0] is not value:
+            decoded = (value, json.loads(value))
+            self._decoded[secret_id] = decoded
+        return decoded[1]
+
+    def invalidate(self, secret_id=None):
+        """Drop one secret (or all) so the next lookup refetches"""
+        with self._lock:
+            if secret_id is None:
+                self._entries.clear()
+                self._decoded.clear()
+            else:
+                self._entries.pop(secret_id, None)
+                self._decoded.pop(secret_id, None)
+
+
+_default_cache = SecretsCache()
+
+
+def get_secret(secret_id, parse_json=True):
+    """Process-wide cached secret lookup shared by every handler in the container"""
+    return _default_cache.get(secret_id, parse_json=parse_json)
+
+
+def invalidate_secret(secret_id=None):
+    """Force the next lookup of a secret (or all secrets) to refetch"""
+    _default_cache.invalidate(secret_id)
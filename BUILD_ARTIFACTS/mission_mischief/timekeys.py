@@ -0,0 +1,54 @@
+"""
+Mission Mischief - time keys
+Normalizes the mixed timestamp formats writers produce into index keys
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_timestamp(value):
+    """
+    Parse a post timestamp into an aware UTC datetime, or None.
+    Accepts tz-aware or naive ISO strings (naive is treated as UTC), a
+    trailing 'Z', and epoch seconds or milliseconds as numbers/strings.
+    """
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float, Decimal)) or (isinstance(value, str) and value.strip().isdigit()):
+        number = float(value)
+        # Anything past year 2286 in seconds is really milliseconds
+        if number > 1e10:
+            number /= 1000.0
+        parsed = datetime.fromtimestamp(number, tz=timezone.utc)
+    elif isinstance(value, str):
+        text = value.strip()
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    else:
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def day_bucket(value=None):
+    """UTC day bucket ('YYYY-MM-DD') for a timestamp, defaulting to now"""
+    parsed = parse_timestamp(value) or datetime.now(timezone.utc)
+    return parsed.strftime('%Y-%m-%d')
+
+
+def epoch_millis(value=None):
+    """Numeric sort key: UTC epoch milliseconds for a timestamp, defaulting to now"""
+    parsed = parse_timestamp(value) or datetime.now(timezone.utc)
+    return (parsed - EPOCH) // timedelta(milliseconds=1)
@@ -0,0 +1,171 @@
+"""
+Mission Mischief - DynamoDB wire codec
+Decodes client-level attribute maps ({'S': ...}, {'N': ...}, {'M': ...})
+straight into JSON-ready Python in one iterative pass: numbers become int or
+float instead of Decimal, sets become lists. This skips the resource layer's
+TypeDeserializer and the second pass (decimal_default, restore_from_dynamo)
+that used to turn every Decimal back into a number for the response.
+
+WireTable wraps a low-level client so the existing paginators (query_all,
+ParallelScan, query_day_page) work unchanged on decoded items, with
+resource-style conditions and keys translated on the way in.
+
+Numbers outside float precision lose digits exactly as they did when
+decimal_default converted them; use the resource layer where exact decimals
+matter (counters that are written back).
+"""
+
+from decimal import Decimal
+
+
+def _number(text):
+    # DynamoDB returns numbers normalized ('5', '-0.25', '1E+30'): no point or exponent means an integer
+    if '.' in text or 'E' in text or 'e' in text:
+        return float(text)
+    return int(text)
+
+
+def from_wire(value):
+    """Decode one attribute value without recursion (deep maps/lists included)"""
+    (kind, raw), = value.items()
+    if kind == 'S':
+        return raw
+    if kind == 'N':
+        return _number(raw)
+    if kind not in ('M', 'L'):
+        return _scalar(kind, raw)
+
+    root = {} if kind == 'M' else []
+    stack = [(root, iter(raw.items()) if kind == 'M' else enumerate(raw))]
+    while stack:
+        target, pending = stack[-1]
+        for key, child in pending:
+            (child_kind, child_raw), = child.items()
+            if child_kind == 'S':
+                decoded = child_raw
+            elif child_kind == 'N':
+                decoded = _number(child_raw)
+            elif child_kind in ('M', 'L'):
+                decoded = {} if child_kind == 'M' else []
+                _put(target, key, decoded)
+                stack.append((decoded, iter(child_raw.items()) if child_kind == 'M' else enumerate(child_raw)))
+                break
+            else:
+                decoded = _scalar(child_kind, child_raw)
+            _put(target, key, decoded)
+        else:
+            stack.pop()
+    return root
+
+
+def _put(target, key, decoded):
+    if isinstance(target, dict):
+        target[key] = decoded
+    else:
+        target.append(decoded)
+
+
+def _scalar(kind, raw):
+    if kind == 'BOOL':
+        return raw
+    if kind == 'NULL':
+        return None
+    if kind == 'B':
+        return raw
+    if kind == 'NS':
+        return [_number(n) for n in raw]
+    if kind in ('SS', 'BS'):
+        return list(raw)
+    raise ValueError(f"Unknown DynamoDB type {kind!r}")
+
+
+def item_from_wire(item, attributes=None):
+    """
+    Decode a whole item, or only `attributes` (the projection-aware variant,
+    for images that carry more than the caller reads, e.g. stream records)
+    """
+    if not item:
+        return {}
+    pairs = item.items() if attributes is None else ((name, item[name]) for name in attributes if name in item)
+    decoded = {}
+    # Flat S/N attributes are nearly every value in these tables; decode them inline
+    for name, value in pairs:
+        if 'S' in value:
+            decoded[name] = value['S']
+        elif 'N' in value:
+            decoded[name] = _number(value['N'])
+        else:
+            decoded[name] = from_wire(value)
+    return decoded
+
+
+def to_wire(value):
+    """Encode a key or expression value (str, int, bool, None, bytes) for the low-level client"""
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, (bytes, bytearray)):
+        return {'B': bytes(value)}
+    if isinstance(value, (int, float, Decimal)):
+        return {'N': str(value)}
+    raise TypeError(f"Unsupported key/expression value {value!r}")
+
+
+class WireTable:
+    """
+    Table-like reader over a low-level DynamoDB client: query/scan/get_item
+    accept the same kwargs as a Table resource (condition objects included)
+    and return items decoded by item_from_wire.
+    """
+
+    def __init__(self, client, table_name):
+        self.client = client
+        self.name = table_name
+
+    def _request(self, kwargs):
+        request = dict(kwargs, TableName=self.name)
+        names = dict(request.get('ExpressionAttributeNames') or {})
+        values = {key: to_wire(value) for key, value in (request.get('ExpressionAttributeValues') or {}).items()}
+
+        builder = None
+        for field, is_key in (('KeyConditionExpression', True), ('FilterExpression', False)):
+            condition = request.get(field)
+            if condition is None or isinstance(condition, str):
+                continue
+            if builder is None:
+                from boto3.dynamodb.conditions import ConditionExpressionBuilder
+                builder = ConditionExpressionBuilder()
+            built = builder.build_expression(condition, is_key_condition=is_key)
+            request[field] = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update({key: to_wire(value) for key, value in built.attribute_value_placeholders.items()})
+
+        if names:
+            request['ExpressionAttributeNames'] = names
+        if values:
+            request['ExpressionAttributeValues'] = values
+        for field in ('ExclusiveStartKey', 'Key'):
+            if request.get(field):
+                request[field] = {name: to_wire(value) for name, value in request[field].items()}
+        return request
+
+    def _response(self, response):
+        if 'Items' in response:
+            response['Items'] = [item_from_wire(item) for item in response['Items']]
+        if 'Item' in response:
+            response['Item'] = item_from_wire(response['Item'])
+        if response.get('LastEvaluatedKey'):
+            response['LastEvaluatedKey'] = item_from_wire(response['LastEvaluatedKey'])
+        return response
+
+    def query(self, **kwargs):
+        return self._response(self.client.query(**self._request(kwargs)))
+
+    def scan(self, **kwargs):
+        return self._response(self.client.scan(**self._request(kwargs)))
+
+    def get_item(self, **kwargs):
+        return self._response(self.client.get_item(**self._request(kwargs)))
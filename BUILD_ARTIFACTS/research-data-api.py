@@ -1,70 +1,364 @@
+import hashlib
 import json
-import boto3
-from decimal import Decimal
-from datetime import datetime
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from mission_mischief import clients
+from mission_mischief.aggregates import AGGREGATES_TABLE, read_post_counts, read_version
+from mission_mischief.jsonstream import iter_json
+from mission_mischief.posts import (
+    POSTS_TABLE, POST_TTL_DAYS, TIME_SHARDS, decode_cursor, decode_time_cursor, encode_cursor, encode_time_cursor,
+    iter_day_bucket, iter_newest_first, query_day_page
+)
+from mission_mischief.projection import projection
+from mission_mischief.research_query import (
+    filter_kwargs, has_attribute_filters, in_window, matches, parse_filters, plan_query, window_millis
+)
+from mission_mischief.responses import (
+    ResponseTooLarge, compress_response, etag_matches, make_etag, not_modified, stream_response, with_etag
+)
+from mission_mischief.scanner import ParallelScan
+from mission_mischief.timekeys import epoch_millis
 
-dynamodb = boto3.resource('dynamodb')
-posts_table = dynamodb.Table('mission-mischief-posts')
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
 
-def decimal_default(obj):
-    if isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError
+# Post attributes format_post emits; the raw text body is never read
+RESEARCH_ATTRIBUTES = (
+    'timestamp', 'user_handle', 'mission_id', 'platform', 'points', 'city', 'state', 'country', 'post_url'
+)
+# Plus the index key, so a page can end (and its cursor resume) after any post
+PAGE_ATTRIBUTES = RESEARCH_ATTRIBUTES + ('post_id', 'day_bucket')
+# Time index pages: the merge key, the cursor tie-breaker and what matches() reads
+TIME_PAGE_ATTRIBUTES = RESEARCH_ATTRIBUTES + ('post_id', 'ts_ms', 'proof_url')
+
+# Order pages and dumps by the time shard index (ts_ms) instead of the day
+# index's timestamp strings. Turn on once backfill-time-index.py has run.
+RESEARCH_TIME_INDEX = os.environ.get('RESEARCH_TIME_INDEX', 'false').lower() == 'true'
+
+# Posts per page, newest first; clients follow next_cursor for more
+RESEARCH_PAGE_SIZE = int(os.environ.get('RESEARCH_PAGE_SIZE', '200'))
+RESEARCH_MAX_PAGE_SIZE = int(os.environ.get('RESEARCH_MAX_PAGE_SIZE', '1000'))
+
+# Filtered pages: rows read before returning a short page with a cursor
+RESEARCH_PAGE_READ_BUDGET = int(os.environ.get('RESEARCH_PAGE_READ_BUDGET', '5000'))
+# Whole-table count scans stop here and report complete=false (API Gateway times out at 29 s)
+RESEARCH_COUNT_SCAN_SECONDS = float(os.environ.get('RESEARCH_COUNT_SCAN_SECONDS', '20'))
+
+def get_posts_version():
+    """Posts change counter kept by the aggregates stream, or None if unavailable"""
+    try:
+        return read_version(clients.table(AGGREGATES_TABLE))
+    except Exception as e:
+        print(f"Version lookup failed: {str(e)}")
+        return None
+
+def get_post_counts():
+    """Counters from the aggregates read model, or None if unavailable"""
+    try:
+        return read_post_counts(clients.table(AGGREGATES_TABLE))
+    except Exception as e:
+        print(f"Counter lookup failed: {str(e)}")
+        return None
+
+def candidate_days(counts):
+    """
+    Day buckets that can hold posts, newest first. With the read model only
+    days with a live count are visited; without it, every day back to the
+    post TTL (empty days cost one small Query each).
+    """
+    if counts is not None:
+        return sorted(counts['days'], reverse=True)
+    today = datetime.now(timezone.utc)
+    return [(today - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(POST_TTL_DAYS + 1)]
+
+def index_key(item, day):
+    """Day bucket index key of a post, used to resume right after it"""
+    return {'post_id': item['post_id'], 'day_bucket': item.get('day_bucket', day), 'timestamp': item['timestamp']}
+
+def read_page(posts_table, days, limit, cursor=None, filters=None):
+    """
+    Up to `limit` posts newest first, resuming at cursor. Returns
+    (items, next_cursor); next_cursor is None after the oldest post.
+
+    Attribute filters run server side as a FilterExpression, so a Query may
+    read many posts to return few: while matches are sparse each Query asks
+    for twice as many rows as the last, and a page stops after
+    RESEARCH_PAGE_READ_BUDGET rows read (short, with a cursor) so one
+    request never walks the whole table.
+    """
+    filters = filters or {}
+    query_kwargs = projection(PAGE_ATTRIBUTES, **filter_kwargs(filters))
+    filtered = has_attribute_filters(filters)
+
+    start_day, start_key = decode_cursor(cursor) if cursor else (None, None)
+    if start_day:
+        days = [day for day in days if day <= start_day]
+        if days and days[0] != start_day:
+            start_key = None
+
+    items = []
+    reads = 0
+    batch = limit
+    for i, day in enumerate(days):
+        key = start_key if i == 0 else None
+        while True:
+            if reads >= RESEARCH_PAGE_READ_BUDGET:
+                return items, encode_cursor(day, key)
+            wanted = limit - len(items)
+            if filtered:
+                wanted = min(max(wanted, batch), RESEARCH_PAGE_READ_BUDGET - reads)
+                batch *= 2
+            page, key = query_day_page(posts_table, day, wanted, key, **query_kwargs)
+            reads += wanted
+
+            for n, item in enumerate(page):
+                if not in_window(item, filters):
+                    continue
+                items.append(item)
+                if len(items) >= limit:
+                    if n + 1 < len(page) or key:
+                        return items, encode_cursor(day, index_key(item, day))
+                    return items, encode_cursor(days[i + 1]) if i + 1 < len(days) else None
+            if not key:
+                break
+    return items, None
+
+def read_time_page(posts_table, limit, cursor=None, filters=None):
+    """
+    read_page over the time shard index: up to `limit` posts newest first by
+    ts_ms, merged across shards. Returns (items, next_cursor).
+
+    The window becomes ts_ms key bounds. Attribute filters are checked here
+    rather than as a FilterExpression (the same read units either way) so
+    the cursor can resume after the last post read, not just the last kept,
+    and a sparse filter stops at RESEARCH_PAGE_READ_BUDGET like read_page.
+    """
+    filters = filters or {}
+    since_ms, until_ms = window_millis(filters)
+    cursor_ms, skip = decode_time_cursor(cursor) if cursor else (None, set())
+    if cursor_ms is not None:
+        until_ms = cursor_ms if until_ms is None else min(until_ms, cursor_ms)
+
+    # Each shard's first page is about its share of the page; later pages double
+    page_size = limit // TIME_SHARDS + 2
+    stream = iter_newest_first(posts_table, since_ms, until_ms, page_size, **projection(TIME_PAGE_ATTRIBUTES))
+
+    items = []
+    reads = 0
+    last_ms, at_last = None, set()
+    for item in stream:
+        if item['ts_ms'] == cursor_ms and item['post_id'] in skip:
+            continue
+        reads += 1
+        if item['ts_ms'] != last_ms:
+            last_ms, at_last = item['ts_ms'], set()
+        at_last.add(item['post_id'])
+        if matches(item, filters):
+            items.append(item)
+        if len(items) >= limit or reads >= RESEARCH_PAGE_READ_BUDGET:
+            if next(stream, None) is None:
+                return items, None
+            # Posts sharing a millisecond can straddle pages: carry every one returned so far
+            if last_ms == cursor_ms:
+                at_last |= skip
+            return items, encode_time_cursor(last_ms, at_last)
+    return items, None
+
+def format_post(item):
+    """Row shape the research page renders"""
+    return {
+        'timestamp': item.get('timestamp', ''),
+        'user': item.get('user_handle', 'Unknown'),
+        'mission_id': item.get('mission_id', 0),
+        'platform': item.get('platform', 'unknown'),
+        'points': item.get('points', 0),
+        'city': item.get('city', 'Unknown'),
+        'state': item.get('state', 'Unknown'),
+        'country': item.get('country', 'Unknown'),
+        'post_url': item.get('post_url', '#')
+    }
+
+def iter_research_rows(posts_table, days, filters):
+    """
+    Every matching post as a format_post row, newest first, for all=1. Days
+    come newest first and the index orders posts within a day (or the time
+    shards are merged by ts_ms), so rows are generated in order straight from
+    Query pages (one page per shard resident at a time) instead of collected
+    and sorted.
+    """
+    if RESEARCH_TIME_INDEX:
+        since_ms, until_ms = window_millis(filters)
+        query_kwargs = projection(RESEARCH_ATTRIBUTES + ('ts_ms',), **filter_kwargs(filters))
+        for item in iter_newest_first(posts_table, since_ms, until_ms, **query_kwargs):
+            yield format_post(item)
+        return
+
+    query_kwargs = projection(RESEARCH_ATTRIBUTES, **filter_kwargs(filters))
+    for day in days:
+        for item in iter_day_bucket(posts_table, day, newest_first=True, **query_kwargs):
+            if in_window(item, filters):
+                yield format_post(item)
+
+def all_response(event, filters, counts, etag):
+    """
+    Legacy "everything" mode: the full (filtered) dump in one body, piped
+    rows -> iter_json -> stream_response so neither the rows nor the JSON
+    text are held. Bodies that cannot fit in a proxy response fail fast with
+    413; page with limit/cursor or use the research export job instead.
+    """
+    plan = plan_query(filters, candidate_days(counts), counts)
+    rows = iter_research_rows(clients.wire_table(POSTS_TABLE), plan['days'], filters)
+    try:
+        response = stream_response(event, 200, CORS_HEADERS, iter_json(
+            {'success': True}, rows, trailer=lambda count: {'count': count, 'next_cursor': None}
+        ))
+    except ResponseTooLarge as e:
+        print(f"Full dump too large: {str(e)}")
+        return error_response(413, 'Too many posts for one response; page with limit/cursor or use the research export')
+    return with_etag(response, etag)
+
+def parse_limit(value):
+    if value in (None, ''):
+        return RESEARCH_PAGE_SIZE
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, RESEARCH_MAX_PAGE_SIZE)
+
+def count_posts(plan, filters, counts):
+    """Matching post count via the planned path: (count, complete)"""
+    if plan['path'] == 'counters':
+        if 'since' in filters or 'until' in filters:
+            return sum(counts['days'].get(day, 0) for day in plan['days']), True
+        return counts['posts_total'], True
+
+    posts_table = clients.wire_table(POSTS_TABLE)
+    if plan['path'] == 'day_index':
+        total = 0
+        query_kwargs = projection(('timestamp',), **filter_kwargs(filters))
+        for day in plan['days']:
+            total += sum(1 for item in iter_day_bucket(posts_table, day, **query_kwargs) if in_window(item, filters))
+        return total, True
+
+    scan = ParallelScan(
+        posts_table,
+        deadline=time.monotonic() + RESEARCH_COUNT_SCAN_SECONDS,
+        Select='COUNT',
+        **filter_kwargs(filters)
+    )
+    for _ in scan:
+        pass
+    return scan.matched_count, scan.complete
+
+def count_response(event, filters, counts, etag):
+    """count mode: maintained counters where they answer, otherwise the cheapest read path"""
+    plan = plan_query(filters, candidate_days(counts), counts, ordered=False)
+    count, complete = count_posts(plan, filters, counts)
+    body = {
+        'success': True,
+        'count': count,
+        'complete': complete,
+        'plan': {'path': plan['path'], 'days': len(plan['days']), 'estimated_reads': plan['estimated_reads']}
+    }
+    if counts is not None and not filters:
+        body['direct_submissions'] = counts['direct_submissions']
+        body['by_day'] = counts['days']
+
+    return with_etag(compress_response(event, {
+        'statusCode': 200,
+        'headers': CORS_HEADERS,
+        'body': json.dumps(body)
+    }), etag)
+
+def error_response(status_code, message):
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({
+            'success': False,
+            'error': message
+        })
+    }
+
+def request_key(params, limit, cursor, filters):
+    """
+    Short digest of the normalized request (mode, filters and, for pages,
+    limit and cursor), folded into the ETag so a validator only matches the
+    same query at the same data version
+    """
+    if params.get('count') in ('1', 'true'):
+        mode = 'count'
+    elif params.get('all') in ('1', 'true'):
+        mode = 'all'
+    else:
+        mode = 'page'
+    normalized = {
+        'mode': mode,
+        'index': 'time' if RESEARCH_TIME_INDEX else 'day',
+        'filters': {
+            name: epoch_millis(value) if name in ('since', 'until') else value
+            for name, value in filters.items()
+        }
+    }
+    if mode == 'page':
+        normalized['limit'] = limit
+        normalized['cursor'] = cursor
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()[:16]
 
 def lambda_handler(event, context):
+    params = (event or {}).get('queryStringParameters') or {}
     try:
-        # Scan all posts from DynamoDB
-        response = posts_table.scan()
-        items = response.get('Items', [])
-        
-        # Handle pagination if needed
-        while 'LastEvaluatedKey' in response:
-            response = posts_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
-        
-        # Format data for frontend
-        research_data = []
-        for item in items:
-            research_data.append({
-                'timestamp': item.get('timestamp', ''),
-                'user': item.get('user_handle', 'Unknown'),
-                'mission_id': item.get('mission_id', 0),
-                'platform': item.get('platform', 'unknown'),
-                'points': item.get('points', 0),
-                'city': item.get('city', 'Unknown'),
-                'state': item.get('state', 'Unknown'),
-                'country': item.get('country', 'Unknown'),
-                'post_url': item.get('post_url', '#')
-            })
-        
-        # Sort by timestamp descending
-        research_data.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        return {
+        limit = parse_limit(params.get('limit'))
+        filters = parse_filters(params)
+        cursor = params.get('cursor') or None
+        if cursor:
+            (decode_time_cursor if RESEARCH_TIME_INDEX else decode_cursor)(cursor)
+    except ValueError as e:
+        return error_response(400, str(e))
+
+    try:
+        # One Query over the meta partition gives the version (ETag), the
+        # per-day counts that steer paging and the totals for count mode
+        counts = get_post_counts()
+        version = counts['version'] if counts is not None else get_posts_version()
+        etag = None
+        if version is not None:
+            etag = make_etag('research', version, request_key(params, limit, cursor, filters))
+        if etag_matches(event, etag):
+            return not_modified(CORS_HEADERS, etag)
+
+        if params.get('count') in ('1', 'true'):
+            return count_response(event, filters, counts, etag)
+        if params.get('all') in ('1', 'true'):
+            return all_response(event, filters, counts, etag)
+
+        posts_table = clients.wire_table(POSTS_TABLE)
+        if RESEARCH_TIME_INDEX:
+            items, next_cursor = read_time_page(posts_table, limit, cursor, filters)
+        else:
+            plan = plan_query(filters, candidate_days(counts), counts)
+            items, next_cursor = read_page(posts_table, plan['days'], limit, cursor, filters)
+        research_data = [format_post(item) for item in items]
+
+        return with_etag(compress_response(event, {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
+            'headers': CORS_HEADERS,
             'body': json.dumps({
                 'success': True,
                 'data': research_data,
-                'count': len(research_data)
-            }, default=decimal_default)
-        }
+                'count': len(research_data),
+                'next_cursor': next_cursor
+            })
+        }), etag)
         
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': False,
-                'error': 'Failed to load research data'
-            })
-        }
+        return error_response(500, 'Failed to load research data')
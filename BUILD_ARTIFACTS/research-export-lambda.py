@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Mission Mischief - Research Export Lambda
+Bulk export of the posts table for researchers: a parallel scan streamed
+into the raw-data bucket as gzip NDJSON or CSV partitioned by day, plus a
+manifest with presigned links. Replaces pulling the full dataset through
+research-data-api / API Gateway.
+
+Invoke directly (asynchronously for large tables):
+    aws lambda invoke --function-name mission-mischief-research-export \\
+        --payload '{"format": "csv"}' out.json
+Returns the export id, row counts and a presigned URL for manifest.json.
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+from mission_mischief import clients
+from mission_mischief.export import EXPORT_ATTRIBUTES, EXPORT_COLUMNS, FORMATS, PartitionedExport
+from mission_mischief.posts import POSTS_TABLE
+from mission_mischief.projection import projection
+from mission_mischief.scanner import ParallelScan
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+RAW_DATA_BUCKET = os.environ.get('RAW_DATA_BUCKET')
+EXPORT_PREFIX = os.environ.get('EXPORT_PREFIX', 'research-exports')
+EXPORT_URL_TTL_SECONDS = int(os.environ.get('EXPORT_URL_TTL_SECONDS', '86400'))
+EXPORT_SCAN_SEGMENTS = int(os.environ.get('EXPORT_SCAN_SEGMENTS', '8'))
+# Stop scanning this long before the Lambda timeout to close files and write the manifest
+EXPORT_SAFETY_MARGIN_MS = int(os.environ.get('EXPORT_SAFETY_MARGIN_MS', '60000'))
+EXPORT_DEFAULT_BUDGET_MS = 14 * 60 * 1000
+
+def get_export_deadline(context):
+    """Monotonic deadline for the scan, leaving time to finish uploads"""
+    remaining_ms = EXPORT_DEFAULT_BUDGET_MS
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        remaining_ms = context.get_remaining_time_in_millis()
+    return time.monotonic() + max(remaining_ms - EXPORT_SAFETY_MARGIN_MS, 0) / 1000.0
+
+def presign(key):
+    return clients.client('s3').generate_presigned_url(
+        'get_object',
+        Params={'Bucket': RAW_DATA_BUCKET, 'Key': key},
+        ExpiresIn=EXPORT_URL_TTL_SECONDS
+    )
+
+def run_export(fmt, deadline):
+    """Scan posts into a new export prefix; returns the manifest (already written)"""
+    started = datetime.now(timezone.utc)
+    export_id = f"{started.strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:8]}"
+    prefix = f"{EXPORT_PREFIX}/{export_id}"
+    s3 = clients.client('s3')
+
+    posts = ParallelScan(
+        clients.table(POSTS_TABLE),
+        total_segments=EXPORT_SCAN_SEGMENTS,
+        deadline=deadline,
+        **projection(EXPORT_ATTRIBUTES)
+    )
+    export = PartitionedExport(s3, RAW_DATA_BUCKET, prefix, fmt)
+    try:
+        for item in posts:
+            export.add(item)
+        files = export.finish()
+    except Exception:
+        export.abort()
+        raise
+
+    for entry in files:
+        entry['url'] = presign(entry['key'])
+
+    manifest = {
+        'export_id': export_id,
+        'format': fmt,
+        'compression': 'gzip',
+        'columns': None if fmt == 'ndjson' else list(EXPORT_COLUMNS),
+        'created_at': started.isoformat(),
+        'finished_at': datetime.now(timezone.utc).isoformat(),
+        'complete': posts.complete,
+        'rows': export.rows,
+        'bytes': sum(entry['bytes'] for entry in files),
+        'url_expires_in': EXPORT_URL_TTL_SECONDS,
+        'files': files
+    }
+    manifest_key = f"{prefix}/manifest.json"
+    s3.put_object(
+        Bucket=RAW_DATA_BUCKET,
+        Key=manifest_key,
+        Body=json.dumps(manifest, indent=2).encode('utf-8'),
+        ContentType='application/json'
+    )
+    manifest['manifest_key'] = manifest_key
+    return manifest
+
+def lambda_handler(event, context):
+    event = event or {}
+    fmt = event.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return {'success': False, 'error': f"format must be one of {', '.join(FORMATS)}"}
+    if not RAW_DATA_BUCKET:
+        return {'success': False, 'error': 'RAW_DATA_BUCKET is not set'}
+
+    try:
+        manifest = run_export(fmt, get_export_deadline(context))
+    except Exception as e:
+        logger.error(f"Research export failed: {e}")
+        return {'success': False, 'error': 'Research export failed'}
+
+    if not manifest['complete']:
+        logger.warning(f"Export {manifest['export_id']} hit the time limit after {manifest['rows']} rows")
+    logger.info(f"Exported {manifest['rows']} rows in {len(manifest['files'])} files to "
+                f"s3://{RAW_DATA_BUCKET}/{manifest['manifest_key']}")
+    return {
+        'success': True,
+        'export_id': manifest['export_id'],
+        'complete': manifest['complete'],
+        'rows': manifest['rows'],
+        'files': len(manifest['files']),
+        'bytes': manifest['bytes'],
+        'manifest_url': presign(manifest['manifest_key'])
+    }
@@ -3,12 +3,16 @@
  */
 
 const AWSSync = {
+  endpoint: 'https://4q1ybupwm0.execute-api.us-east-1.amazonaws.com/prod/admin',
+  pendingKey: 'mm_pending_aws_sync',
+  batchSize: 50,
+
   // Sync submissions to existing DynamoDB table
   async syncSubmission(submission) {
     try {
       console.log('🚀 Attempting AWS sync with data:', submission);
       
-      const response = await fetch('https://4q1ybupwm0.execute-api.us-east-1.amazonaws.com/prod/admin', {
+      const response = await fetch(this.endpoint, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -27,9 +31,78 @@ const AWSSync = {
         return false;
       }
     } catch (error) {
-      console.log('⚠️ AWS sync failed, using localStorage only:', error.message);
+      // Offline or network failure: keep it and send it with the next batch
+      console.log('⚠️ AWS sync failed, queued for batch sync:', error.message);
+      this.queuePending(submission);
       return false;
     }
+  },
+
+  getPending() {
+    try {
+      return JSON.parse(localStorage.getItem(this.pendingKey)) || [];
+    } catch (error) {
+      return [];
+    }
+  },
+
+  setPending(submissions) {
+    if (submissions.length) {
+      localStorage.setItem(this.pendingKey, JSON.stringify(submissions));
+    } else {
+      localStorage.removeItem(this.pendingKey);
+    }
+  },
+
+  // The server builds post_id from this, so a resent submission is saved once
+  newSubmissionId() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+  },
+
+  queuePending(submission) {
+    const pending = this.getPending();
+    pending.push(submission);
+    this.setPending(pending);
+  },
+
+  // Send queued submissions with one direct_submit_batch request per batchSize
+  async flushPending() {
+    let pending = this.getPending();
+    if (!pending.length || this.flushing) return 0;
+    this.flushing = true;
+    let synced = 0;
+
+    try {
+      while (pending.length) {
+        const batch = pending.slice(0, this.batchSize);
+        const response = await fetch(this.endpoint, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ action: 'direct_submit_batch', submissions: batch })
+        });
+        if (!response.ok) {
+          console.log('❌ AWS batch sync failed with status:', response.status);
+          break;
+        }
+
+        // Keep only items the server says are worth retrying (throttled)
+        const result = await response.json();
+        const retry = result.results
+          .filter(item => !item.success && item.retryable)
+          .map(item => batch[item.index]);
+        synced += result.written;
+        pending = retry.concat(pending.slice(batch.length));
+        this.setPending(pending);
+        if (retry.length) break;
+      }
+      console.log(`✅ AWS batch sync: ${synced} queued submissions saved`);
+    } catch (error) {
+      console.log('⚠️ AWS batch sync failed, will retry when online:', error.message);
+    } finally {
+      this.flushing = false;
+    }
+    return synced;
   }
 };
 
@@ -46,6 +119,7 @@ function enhanceDirectSubmission() {
       if (result.success) {
         const user = Storage.getUser();
         const syncData = {
+          submissionId: AWSSync.newSubmissionId(),
           missionId,
           points,
           proofUrl,
@@ -73,6 +147,10 @@ enhanceDirectSubmission();
 
 window.AWSSync = AWSSync;
 
+// Flush submissions queued while offline
+window.addEventListener('online', () => AWSSync.flushPending());
+AWSSync.flushPending();
+
 // Also try enhancement when DOM is ready
 if (document.readyState === 'loading') {
   document.addEventListener('DOMContentLoaded', enhanceDirectSubmission);
@@ -2,6 +2,10 @@
  * Mission Mischief - localStorage Management
  */
 
+const CLOUD_API = 'https://4q1ybupwm0.execute-api.us-east-1.amazonaws.com/prod';
+// Above this many changes a full save is about as small as the patch
+const CLOUD_PATCH_MAX_OPS = 100;
+
 const Storage = {
   // Default user data structure
   defaultUser: {
@@ -263,16 +267,83 @@ const Storage = {
     return updated;
   },
 
-  // Push full user state to AWS cloud save
+  // Last state the cloud acknowledged ({ key, version, data }): patches are diffs against it
+  getCloudBase() {
+    const base = localStorage.getItem('missionMischiefCloudBase');
+    return base ? JSON.parse(base) : null;
+  },
+
+  setCloudBase(key, version, data) {
+    if (version === undefined || version === null) return;
+    localStorage.setItem('missionMischiefCloudBase', JSON.stringify({ key, version, data }));
+  },
+
+  // State as stored in the cloud (the QR code image stays on the device)
+  cloudState(user) {
+    const { qrCodeData, ...state } = user;
+    return state;
+  },
+
+  // Patch ops turning base into next; paths are segment lists, '-' appends to a list
+  diffState(base, next, path = [], ops = []) {
+    const isMap = v => v !== null && typeof v === 'object' && !Array.isArray(v);
+    const same = (a, b) => JSON.stringify(a) === JSON.stringify(b);
+    for (const key of Object.keys(base)) {
+      if (!(key in next)) ops.push({ op: 'remove', path: [...path, key] });
+    }
+    for (const [key, value] of Object.entries(next)) {
+      const old = base[key];
+      if (!(key in base)) {
+        ops.push({ op: 'add', path: [...path, key], value });
+      } else if (same(old, value)) {
+        continue;
+      } else if (isMap(old) && isMap(value)) {
+        this.diffState(old, value, [...path, key], ops);
+      } else if (Array.isArray(old) && Array.isArray(value) && value.length > old.length &&
+                 old.every((item, i) => same(item, value[i]))) {
+        value.slice(old.length).forEach(item => ops.push({ op: 'add', path: [...path, key, '-'], value: item }));
+      } else {
+        ops.push({ op: 'replace', path: [...path, key], value });
+      }
+    }
+    return ops;
+  },
+
+  async postSave(body) {
+    return fetch(`${CLOUD_API}/save`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body)
+    });
+  },
+
+  // Push user state to AWS cloud save: a patch against the last synced
+  // version when one is known, the full state otherwise or when another
+  // device saved since (409)
   async syncToCloud() {
     const user = this.getUser();
     if (!user.licenseKey) return;
+    const state = this.cloudState(user);
+    const base = this.getCloudBase();
     try {
-      await fetch('https://4q1ybupwm0.execute-api.us-east-1.amazonaws.com/prod/save', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ key: user.licenseKey, data: user })
-      });
+      if (base && base.key === user.licenseKey) {
+        const patch = this.diffState(base.data, state);
+        if (patch.length === 0) return;
+        if (patch.length <= CLOUD_PATCH_MAX_OPS && JSON.stringify(patch).length < JSON.stringify(state).length / 2) {
+          const response = await this.postSave({ key: user.licenseKey, base_version: base.version, patch });
+          if (response.ok) {
+            const result = await response.json();
+            this.setCloudBase(user.licenseKey, result.version, state);
+            return;
+          }
+          if (response.status !== 409) return;
+        }
+      }
+      const response = await this.postSave({ key: user.licenseKey, data: user });
+      if (response.ok) {
+        const result = await response.json();
+        this.setCloudBase(user.licenseKey, result.version, state);
+      }
     } catch (e) {
       console.log('Cloud sync offline — will retry');
     }
@@ -281,11 +352,10 @@ const Storage = {
   // Load user data from AWS by license key
   async loadFromCloud(key) {
     try {
-      const response = await fetch(
-        `https://4q1ybupwm0.execute-api.us-east-1.amazonaws.com/prod/load?key=${encodeURIComponent(key)}`
-      );
+      const response = await fetch(`${CLOUD_API}/load?key=${encodeURIComponent(key)}`);
       if (!response.ok) return null;
       const data = await response.json();
+      if (data.success && data.user) this.setCloudBase(key, data.version, data.user);
       return data.success ? data.user : null;
     } catch {
       return null;
@@ -295,6 +365,7 @@ const Storage = {
   // Clear all data
   clearData() {
     localStorage.removeItem('missionMischiefUser');
+    localStorage.removeItem('missionMischiefCloudBase');
   },
 
   // Get user stats for dashboard